@@ -4,6 +4,13 @@ from discord import app_commands
 from core.config import env
 from core.logger import logger
 from services.database import add_chat_channel, delete_chat_channel, get_chat_channels
+from services.chat_scheduler import chat_scheduler
+from services.http_client import http_client
+from services.search_cache import page_cache, query_cache
+from services.extract_pool import extraction_pool
+from services.audio_cache import audio_cache
+from services.youtube_search import youtube_search_cache
+from services.tts_service import tts_service
 
 class AdminCommands(commands.Cog):
     def __init__(self, bot):
@@ -80,5 +87,100 @@ class AdminCommands(commands.Cog):
         )
         await interaction.followup.send(embed=embed)
 
+    @app_commands.command(name="queuestats", description="채팅 응답 대기열 상태를 표시합니다")
+    @app_commands.guild_only()
+    async def queue_stats(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+
+        # 관리자 또는 봇 소유자 권한 확인
+        if not (interaction.user.guild_permissions.administrator or str(interaction.user.id) in env.DISCORD_OWNER_IDS):
+            await interaction.followup.send("관리자 권한이 필요합니다.")
+            return
+
+        stats = chat_scheduler.get_stats()
+        lines = [
+            f"처리 중: {stats['running']} / {chat_scheduler.max_concurrency}",
+            f"대기 중: {stats['queued']} (이 서버 {stats['queued_by_guild'].get(interaction.guild.id, 0)})",
+            f"평균 대기: {stats['avg_wait']:.2f}초, 최대 대기: {stats['max_wait']:.2f}초",
+            f"접수 {stats.get('submitted', 0)}, 합침 {stats.get('coalesced', 0)}, 실행 {stats.get('started', 0)}, 완료 {stats.get('completed', 0)}, "
+            f"실패 {stats.get('failed', 0)}, 거절 {stats.get('shed', 0)}",
+        ]
+        embed = discord.Embed(
+            title="채팅 대기열 상태",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="httpstats", description="공용 HTTP 커넥션 풀과 검색 캐시 상태를 표시합니다")
+    @app_commands.guild_only()
+    async def http_stats(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+
+        # 관리자 또는 봇 소유자 권한 확인
+        if not (interaction.user.guild_permissions.administrator or str(interaction.user.id) in env.DISCORD_OWNER_IDS):
+            await interaction.followup.send("관리자 권한이 필요합니다.")
+            return
+
+        stats = http_client.get_stats()
+        lines = [
+            f"요청 {stats.get('requests', 0)}, 오류 {stats.get('errors', 0)}",
+            f"새 연결 {stats.get('connections_created', 0)}, 재사용 {stats.get('connections_reused', 0)} "
+            f"(재사용률 {stats['reuse_ratio']:.0%})",
+            f"DNS 캐시 적중 {stats.get('dns_cache_hits', 0)}, 미스 {stats.get('dns_cache_misses', 0)}",
+        ]
+        search = query_cache.stats()
+        pages = page_cache.get_stats()
+        lines += [
+            f"검색 캐시 적중 {search['hits']}, 미스 {search['misses']} ({search['size']}개)",
+            f"페이지 캐시 적중 {pages.get('hits', 0)}, 재검증 {pages.get('revalidated', 0)}, 미스 {pages.get('misses', 0)} "
+            f"({pages['urls']}개 URL, {pages['bytes'] / 1024 / 1024:.1f}MB)",
+        ]
+        extract = extraction_pool.get_stats()
+        lines.append(
+            f"HTML 추출: 인라인 {extract.get('inline', 0)}, 프로세스 풀 {extract.get('pooled', 0)} "
+            f"(워커 {extract['workers']}), 대체 처리 {extract.get('fallback', 0)}"
+        )
+        embed = discord.Embed(
+            title="HTTP 커넥션 풀 상태",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="musicstats", description="음악 오디오 캐시와 검색 할당량 상태를 표시합니다")
+    @app_commands.guild_only()
+    async def music_stats(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+
+        # 관리자 또는 봇 소유자 권한 확인
+        if not (interaction.user.guild_permissions.administrator or str(interaction.user.id) in env.DISCORD_OWNER_IDS):
+            await interaction.followup.send("관리자 권한이 필요합니다.")
+            return
+
+        stats = audio_cache.get_stats()
+        lines = [
+            f"오디오 캐시: {stats['tracks']}곡, {stats['bytes'] / 1024 / 1024:.1f}MB / {audio_cache.max_bytes / 1024 / 1024:.0f}MB",
+            f"적중 {stats.get('hits', 0)}, 미스 {stats.get('misses', 0)} (적중률 {stats['hit_ratio']:.0%})",
+            f"저장 {stats.get('stores', 0)}, 제거 {stats.get('evictions', 0)}, 거부 {stats.get('rejected', 0)}",
+        ]
+        search = youtube_search_cache.get_stats()
+        lines += [
+            f"검색 캐시: {search['size']}개, 적중 {search.get('hits', 0)}, 미스 {search.get('misses', 0)}",
+            f"YouTube API 할당량: 오늘 {search['quota_used']} 사용, {search['quota_remaining']} 남음 "
+            f"(API 호출 {search.get('api_calls', 0)}, yt-dlp 검색 {search.get('fallback_searches', 0)})",
+        ]
+        tts = tts_service.get_stats()
+        lines.append(
+            f"TTS: 합성 {tts.get('synthesized', 0)}, 캐시 적중 {tts.get('cache_hits', 0)}, "
+            f"재생 {tts.get('played', 0)}, 오류 {tts.get('errors', 0)}, 버림 {tts.get('dropped', 0)}"
+        )
+        embed = discord.Embed(
+            title="음악 상태",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        await interaction.followup.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(AdminCommands(bot)) 
\ No newline at end of file
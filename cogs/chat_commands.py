@@ -4,8 +4,12 @@ from discord import app_commands
 from services.openai_mcp import chat_with_openai_mcp
 from services.openai_mcp import is_message_for_bot
 from mcp_server import call_tool
+from mcp_server.tools.message import is_conversation_ending
 from core.config import env
-from services.database import get_chat_channels, get_setting
+from services.database import is_chat_channel, get_int_setting
+from services.addressee import addressee_classifier
+from services.history_cache import history_cache
+from services.chat_scheduler import ChatRequest, chat_scheduler
 from core.logger import logger
 
 class ChatCommands(commands.Cog):
@@ -17,6 +21,9 @@ class ChatCommands(commands.Cog):
     @commands.Cog.listener()
     async def on_message(self, message):
         logger.log(f"메시지 수신: {message.content}", logger.INFO)
+        # 대화 기록 캐시 갱신 (봇 메시지 포함)
+        history_cache.record(message)
+
         # 봇의 메시지는 무시
         if message.author.bot:
             logger.log(f"봇의 메시지이므로 무시: {message.content}", logger.INFO)
@@ -25,12 +32,8 @@ class ChatCommands(commands.Cog):
         # 채팅 채널이 아닌 경우 무시
         channel = message.channel
 
-        # 채팅 채널 확인
-        chat_channels = get_chat_channels()
-        is_chat_channel = channel.id in chat_channels
-        
         # 채팅 채널이 아닌 경우, 멘션이 없으면 무시
-        if not is_chat_channel:
+        if not is_chat_channel(channel.id):
             if not self.bot.user in message.mentions:
                 logger.log(f"채팅 채널이 아니고 멘션도 아니므로 무시: {channel.name}", logger.INFO)
                 return
@@ -43,8 +46,8 @@ class ChatCommands(commands.Cog):
             logger.log(f"빈 메시지이므로 무시: {text}", logger.INFO)
             return
             
-        # 시스템 메시지인 경우 무시
-        if message.type != discord.MessageType.default:
+        # 시스템 메시지인 경우 무시 (답장은 일반 메시지로 처리해 답장 판단 단계까지 전달)
+        if message.type not in (discord.MessageType.default, discord.MessageType.reply):
             logger.log(f"시스템 메시지이므로 무시: {message.type}", logger.INFO)
             return
             
@@ -71,74 +74,99 @@ class ChatCommands(commands.Cog):
         if server_name is None:
             server_name = user.name
                 
-        # 최근 메시지 5개 가져오기
-        recent_messages = []
+        # 메시지가 봇에게 보내는 것인지 단계적으로 판단
+        # 멘션/답장/이름/대화 상태/단어 모델로 판단이 애매할 때만 OpenAI 호출
+        async def ask_llm():
+            recent_messages = await self._get_recent_messages(message)
+            is_for_bot, confidence = await is_message_for_bot(
+                message_content=text,
+                username=server_name,
+                bot_name=self.bot.user.name,
+                recent_messages=recent_messages
+            )
+            return is_for_bot or confidence >= self.confidence_threshold, confidence
+
+        decision = await addressee_classifier.classify(message, self.bot.user, ask_llm)
+        should_respond = decision.is_for_bot
+
+        if should_respond:
+            # 바로 실행하지 않고 스케줄러 대기열에 넣음 (동시 처리 수 제한, 서버/채널 간 공정 분배, 연속 메시지 합치기)
+            chat_scheduler.submit(ChatRequest(
+                message, server_name, text, image_mode, image_url,
+                handler=self._respond,
+                on_shed=self._reply_busy,
+            ))
+
+    async def _respond(self, request: ChatRequest):
+        message = request.message
+        channel = message.channel
+
+        # 메시지가 대화를 종료하는 내용인지 판단
         try:
-            # 현재 채널에서 최근 메시지 6개 가져오기 (현재 메시지 포함)
-            async for msg in channel.history(limit=6):
-                # 현재 메시지는 제외
-                if msg.id == message.id:
-                    continue
-                
-                # 시스템 메시지 제외
-                if msg.type != discord.MessageType.default:
-                    continue
-                
-                # 메시지 정보 저장
-                recent_messages.append({
-                    "message_id": msg.id,
-                    "content": msg.content,
-                    "author": msg.author.nick if msg.author.nick else msg.author.name,
-                    "is_bot": msg.author.bot
-                })
-                
-                # 최대 5개만 저장
-                if len(recent_messages) >= get_setting("history_num"):
-                    break
-            
-            # 시간 순서대로 정렬 (오래된 메시지가 먼저 오도록)
-            recent_messages.reverse()
+            await call_tool(
+                "judge_conversation_ending",
+                {
+                    "message_content": request.text,
+                    "channel_id": str(channel.id),
+                    "message_id": str(message.id),
+                },
+            )
+        except Exception as e:
+            # MCP 도구 호출 실패 시 로그 남기고 계속 진행
+            logger.log(f"judge_conversation_ending 툴 호출 실패: {str(e)}", logger.ERROR)
+        
+        async with channel.typing():
+            try:
+                # OpenAI MCP를 사용하여 메시지 응답 (이미지 URL도 전달)
+                await chat_with_openai_mcp(message, request.username, request.text, request.image_mode, request.image_url)
+                # 대화 종료 신호를 보냈으면 대화 중 상태를 지워 이후 메시지는 처음부터 다시 판단
+                if is_conversation_ending(request.text):
+                    addressee_classifier.end_conversation(channel.id, message.author.id)
+                else:
+                    addressee_classifier.note_bot_reply(channel.id, message.author.id)
+            except Exception as err:
+                await message.reply(f"에러입니다.\n{str(err)}")
+                logger.log(f"채팅 처리 중 오류 발생: {str(err)}", logger.ERROR)
+
+    async def _reply_busy(self, request: ChatRequest):
+        await request.message.reply("지금은 요청이 많아서 바로 답하기 어려워요. 잠시 후에 다시 말씀해주세요!")
+    
+    @commands.Cog.listener()
+    async def on_message_edit(self, before, after):
+        history_cache.update(after)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        history_cache.remove(payload.channel_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # 새 세션으로 재연결되면 놓친 이벤트가 있을 수 있으므로 캐시를 비움
+        history_cache.invalidate_all()
+
+    async def _get_recent_messages(self, message):
+        """판단용 최근 메시지를 가져옵니다 (현재 메시지 제외, 오래된 순)."""
+        channel = message.channel
+        history_num = get_int_setting("history_num", env.HISTORY_NUM, guild_id=message.guild.id if message.guild else None)
+        try:
+            # 최근 메시지 6개 (현재 메시지 포함) 중 현재 메시지와 시스템 메시지 제외
+            records = await history_cache.get_recent(channel, 6, exclude_id=message.id)
+            records = [r for r in records if r.is_default][-history_num:]
+            # 시간 순서대로 정렬된 상태 (오래된 메시지가 먼저)
+            recent_messages = [
+                {
+                    "message_id": r.id,
+                    "content": r.content,
+                    "author": r.author_name,
+                    "is_bot": r.is_bot
+                }
+                for r in records
+            ]
         except Exception as e:
             # 메시지 히스토리 가져오기 실패 시 무시하고 진행
             recent_messages = []
-            
-        # 메시지가 봇에게 보내는 것인지 판단 (OpenAI)
-        is_for_bot, confidence = await is_message_for_bot(
-            message_content=text,
-            username=server_name,
-            bot_name=self.bot.user.name,
-            recent_messages=recent_messages
-        )
-                
-        # 봇에게 보내는 메시지로 판단된 경우
-        # 멘션이 있으면 무조건 응답 대상으로 간주
-        should_respond = is_for_bot or confidence >= self.confidence_threshold
-        if self.bot.user in message.mentions:
-            should_respond = True
+        return recent_messages
 
-        if should_respond:
-            # 메시지가 대화를 종료하는 내용인지 판단
-            try:
-                await call_tool(
-                    "judge_conversation_ending",
-                    {
-                        "message_content": text,
-                        "channel_id": str(channel.id),
-                        "message_id": str(message.id),
-                    },
-                )
-            except Exception as e:
-                # MCP 도구 호출 실패 시 로그 남기고 계속 진행
-                logger.log(f"judge_conversation_ending 툴 호출 실패: {str(e)}", logger.ERROR)
-            
-            async with channel.typing():
-                try:
-                    # OpenAI MCP를 사용하여 메시지 응답 (이미지 URL도 전달)
-                    await chat_with_openai_mcp(message, server_name, text, image_mode, image_url)
-                except Exception as err:
-                    await message.reply(f"에러입니다.\n{str(err)}")
-                    logger.log(f"채팅 처리 중 오류 발생: {str(err)}", logger.ERROR)
-    
     @app_commands.command(name="clear", description="채팅 방을 청소합니다")
     @app_commands.guild_only()
     async def clear_chat(self, interaction: discord.Interaction, amount: int = 100):
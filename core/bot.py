@@ -0,0 +1,125 @@
+import discord
+from discord.ext import commands
+import asyncio
+from core.logger import logger
+from core.config import env
+from mcp_server.server import MCPServer
+from mcp_server.context import global_context
+from services.http_client import http_client
+from services.extract_pool import extraction_pool
+from services.audio_cache import audio_cache
+from services.youtube_search import youtube_search_cache
+from services.search_cache import page_cache
+from services.token_budget import token_counter
+
+# 봇 클래스 정의
+class InteractiveGPTBot(commands.Bot):
+    def __init__(self):
+        intents = discord.Intents.all()
+        super().__init__(command_prefix=[], intents=intents)
+        self.logger = logger
+        self.initial_extensions = [
+            'cogs.app_commands',
+            'cogs.chat_commands',
+            'cogs.ai_commands'
+        ]
+        
+        # MCP 서버 인스턴스 생성
+        self.mcp_server = MCPServer()
+
+        # 봇 소유자 ID 설정
+        self.owner_ids = env.DISCORD_OWNER_IDS
+        if self.owner_ids:
+            self.logger.log(f'봇 소유자 ID 설정: {self.owner_ids}')
+        else:
+            self.logger.log('DISCORD_OWNER_IDS가 설정되지 않았습니다.', self.logger.WARNING)
+
+    async def setup_hook(self):
+        # 공용 HTTP 세션 시작 (검색, 크롤링, TTS가 커넥션 풀을 공유)
+        await http_client.start()
+        # 큰 페이지용 HTML 추출 워커를 미리 띄워 둠
+        await extraction_pool.start()
+        # 오디오 캐시 색인과 파일 무결성 확인
+        await self.loop.run_in_executor(None, audio_cache.verify)
+        # 토크나이저는 다운로드가 필요할 수 있어 백그라운드에서 불러오고, 그 전에는 근사치로 계산
+        self.loop.run_in_executor(None, token_counter.load)
+
+        # 확장 기능(Cogs) 로드
+        for extension in self.initial_extensions:
+            try:
+                await self.load_extension(extension)
+                self.logger.log(f'확장 기능 로드: {extension}')
+            except Exception as e:
+                self.logger.log(f'확장 기능 로드 실패: {extension}\n{str(e)}', self.logger.ERROR)
+        
+        # MCP 서버 시작 (백그라운드 태스크)
+        self.logger.log('MCP 서버 시작 준비...')
+        self.loop.create_task(self.mcp_server.start())
+        
+        # 글로벌 명령어 동기화
+        try:
+            self.logger.log('글로벌 명령어 동기화 시작')
+            synced_commands = await self.tree.sync()
+            self.logger.log(f'글로벌 명령어 동기화 완료: {len(synced_commands)}개 명령어 동기화됨')
+        except Exception as e:
+            self.logger.log(f'글로벌 명령어 동기화 실패: {str(e)}', self.logger.ERROR)
+        
+
+    async def close(self):
+        await super().close()
+        await http_client.close()
+        await extraction_pool.close()
+        audio_cache.close()
+        await youtube_search_cache.flush()
+        # 마지막 지연 저장 전에 캐시된 페이지 색인도 저장
+        await page_cache.flush()
+
+    async def on_ready(self):
+        self.logger.log(f'{self.user} 로그인 완료')
+        
+        # MCP 컨텍스트에 디스코드 클라이언트 주입
+        global_context.set_client(self)
+        
+        await self.change_presence(activity=discord.Activity(
+            type=discord.ActivityType.listening,
+            name="대화 요청"
+        ))
+
+    # 게이트웨이 변경 이벤트로 MCP REST 캐시 무효화
+    async def on_guild_channel_update(self, before, after):
+        global_context.invalidate("channel", after.id)
+
+    async def on_guild_channel_delete(self, channel):
+        global_context.invalidate("channel", channel.id)
+
+    async def on_thread_update(self, before, after):
+        global_context.invalidate("channel", after.id)
+
+    async def on_thread_delete(self, thread):
+        global_context.invalidate("channel", thread.id)
+
+    async def on_guild_update(self, before, after):
+        global_context.invalidate("guild", after.id)
+
+    async def on_guild_remove(self, guild):
+        global_context.invalidate("guild", guild.id)
+
+    async def on_user_update(self, before, after):
+        global_context.invalidate("user", after.id)
+
+    async def on_connect(self):
+        self.logger.log(f"{self.user} 연결 완료")
+
+    async def on_error(self, event, *args, **kwargs):
+        self.logger.log(f'이벤트 처리 중 오류 발생: {event}', self.logger.ERROR)
+
+def run():
+    """봇을 실행합니다. 루트의 bot.py에서 호출합니다."""
+    bot = InteractiveGPTBot()
+    bot_key = env.DISCORD_BOT_KEY
+    
+    if not bot_key:
+        logger.log("DISCORD_BOT_KEY가 설정되지 않았습니다. 봇을 실행할 수 없습니다.", logger.CRITICAL)
+    else:
+        logger.log(f"봇 실행 시작", logger.INFO)
+        bot.run(bot_key)
@@ -26,11 +26,96 @@ class Settings:
         self.HISTORY_NUM = self._get_int_config("HISTORY_NUM", 5)
         self.MAX_HISTORY_COUNT = self._get_int_config("MAX_HISTORY_COUNT", 5)
         self.MAX_RESPONSE_TOKENS = self._get_int_config("MAX_RESPONSE_TOKENS", 2000)
+        self.HISTORY_CACHE_SIZE = self._get_int_config("HISTORY_CACHE_SIZE", 50)
+        # 토큰 예산 (대화 기록, 요청 전체, 이전 라운드 툴 결과)
+        self.TOKENIZER_NAME = self._get_config("TOKENIZER_NAME", "Xenova/gpt-4o")
+        self.TOKENIZER_PATH = self._get_config("TOKENIZER_PATH")
+        self.HISTORY_TOKEN_BUDGET = self._get_int_config("HISTORY_TOKEN_BUDGET", 3000)
+        self.CONTEXT_TOKEN_BUDGET = self._get_int_config("CONTEXT_TOKEN_BUDGET", 24000)
+        self.STALE_TOOL_OUTPUT_TOKENS = self._get_int_config("STALE_TOOL_OUTPUT_TOKENS", 400)
+        # 스트리밍 응답 메시지 편집 간격(초), 지연/429에 따라 최소~최대 사이에서 조절
+        self.STREAM_EDIT_MIN_INTERVAL = self._get_float_config("STREAM_EDIT_MIN_INTERVAL", 1.0)
+        self.STREAM_EDIT_MAX_INTERVAL = self._get_float_config("STREAM_EDIT_MAX_INTERVAL", 5.0)
+        # 채팅 응답 스케줄러 (동시 처리 수, 대기열 크기, 연속 메시지 합치기, 최대 대기 시간)
+        self.CHAT_CONCURRENCY = self._get_int_config("CHAT_CONCURRENCY", 4)
+        self.CHAT_QUEUE_SIZE = self._get_int_config("CHAT_QUEUE_SIZE", 50)
+        self.CHAT_CHANNEL_QUEUE_SIZE = self._get_int_config("CHAT_CHANNEL_QUEUE_SIZE", 5)
+        self.CHAT_COALESCE_SECONDS = self._get_float_config("CHAT_COALESCE_SECONDS", 1.0)
+        self.CHAT_MAX_WAIT_SECONDS = self._get_int_config("CHAT_MAX_WAIT_SECONDS", 120)
+        # 한 라운드에서 동시에 실행할 툴 호출 수
+        self.TOOL_CONCURRENCY = self._get_int_config("TOOL_CONCURRENCY", 4)
+        # 메시지 의도에 맞는 툴 그룹만 모델에 전달할지 여부
+        # 툴 목록은 캐시되는 프롬프트 앞부분에 들어가므로, 요청마다 바뀌지 않도록 기본으로는 전체 툴을 전달
+        self.TOOL_SUBSETTING = self._get_config("TOOL_SUBSETTING", False)
+        # 디스코드 REST 조회 결과 캐시
+        self.REST_CACHE_TTL = self._get_int_config("REST_CACHE_TTL", 300)
+        self.REST_CACHE_SIZE = self._get_int_config("REST_CACHE_SIZE", 1024)
+        # 공용 HTTP 커넥션 풀 (검색, 크롤링, TTS)
+        self.HTTP_POOL_SIZE = self._get_int_config("HTTP_POOL_SIZE", 100)
+        self.HTTP_POOL_PER_HOST = self._get_int_config("HTTP_POOL_PER_HOST", 8)
+        self.HTTP_DNS_CACHE_TTL = self._get_int_config("HTTP_DNS_CACHE_TTL", 300)
+        self.HTTP_KEEPALIVE_SECONDS = self._get_float_config("HTTP_KEEPALIVE_SECONDS", 30.0)
+        # 검색 결과(검색어 -> URL 목록)와 크롤링 본문(URL -> 텍스트, 디스크) 캐시
+        self.SEARCH_CACHE_TTL = self._get_int_config("SEARCH_CACHE_TTL", 600)
+        self.SEARCH_CACHE_SIZE = self._get_int_config("SEARCH_CACHE_SIZE", 256)
+        self.PAGE_CACHE_DIR = self._get_config("PAGE_CACHE_DIR", "cache/pages")
+        self.PAGE_CACHE_MAX_BYTES = self._get_int_config("PAGE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        self.PAGE_CACHE_FRESH_SECONDS = self._get_int_config("PAGE_CACHE_FRESH_SECONDS", 3600)
+        # 크롤링 시 페이지 하나에서 읽을 최대 바이트 수
+        self.CRAWL_MAX_BYTES = self._get_int_config("CRAWL_MAX_BYTES", 2 * 1024 * 1024)
+        # 검색 결과 크롤링 (후보 수, 돌려줄 페이지 수, 전체 마감 시간, "as_completed" 또는 "gather")
+        self.SEARCH_RESULT_COUNT = self._get_int_config("SEARCH_RESULT_COUNT", 5)
+        self.CRAWL_RESULT_COUNT = self._get_int_config("CRAWL_RESULT_COUNT", 3)
+        self.CRAWL_DEADLINE_SECONDS = self._get_float_config("CRAWL_DEADLINE_SECONDS", 6.0)
+        self.CRAWL_MODE = self._get_config("CRAWL_MODE", "as_completed")
+        # 페이지 하나에서 추출할 최대 글자 수, 검색 결과 문단의 토큰 예산과 문단 크기(글자)
+        self.CRAWL_MAX_TEXT_CHARS = self._get_int_config("CRAWL_MAX_TEXT_CHARS", 60000)
+        self.SEARCH_TOKEN_BUDGET = self._get_int_config("SEARCH_TOKEN_BUDGET", 3000)
+        self.SEARCH_PASSAGE_CHARS = self._get_int_config("SEARCH_PASSAGE_CHARS", 600)
+        # HTML 추출 프로세스 풀 (워커 수, 0이면 사용 안 함)과 인라인으로 파싱할 최대 페이지 크기
+        self.EXTRACT_WORKERS = self._get_int_config("EXTRACT_WORKERS", 2)
+        self.EXTRACT_INLINE_BYTES = self._get_int_config("EXTRACT_INLINE_BYTES", 256 * 1024)
+        
+        # 음악: 재생 중 미리 받을 다음 곡 수와 다운로드 워커 수
+        self.MUSIC_PREFETCH_AHEAD = self._get_int_config("MUSIC_PREFETCH_AHEAD", 2)
+        self.MUSIC_PREFETCH_WORKERS = self._get_int_config("MUSIC_PREFETCH_WORKERS", 2)
+        # 재생 방식 ("stream": 다운로드 없이 Opus로 바로 재생, "download": mp3로 받아서 재생)
+        self.MUSIC_PLAYBACK_MODE = self._get_config("MUSIC_PLAYBACK_MODE", "stream")
+        # 여러 곡을 한 번에 넣을 때 동시에 조회할 곡 수와 재생목록에서 가져올 최대 곡 수
+        self.MUSIC_RESOLVE_CONCURRENCY = self._get_int_config("MUSIC_RESOLVE_CONCURRENCY", 4)
+        self.MUSIC_PLAYLIST_LIMIT = self._get_int_config("MUSIC_PLAYLIST_LIMIT", 50)
+        
+        # TTS: 동시에 합성할 문장 수, 음악 뒤에 기다릴 수 있는 최대 문장 수, 구문 캐시
+        self.TTS_CONCURRENCY = self._get_int_config("TTS_CONCURRENCY", 3)
+        self.TTS_MAX_PENDING = self._get_int_config("TTS_MAX_PENDING", 30)
+        self.TTS_CACHE_SIZE = self._get_int_config("TTS_CACHE_SIZE", 256)
+        self.TTS_CACHE_TTL = self._get_int_config("TTS_CACHE_TTL", 24 * 3600)
+        # 음악 검색어 -> 영상 ID 캐시와 YouTube Data API 일일 할당량
+        self.YOUTUBE_SEARCH_CACHE_PATH = self._get_config("YOUTUBE_SEARCH_CACHE_PATH", "cache/youtube_search.json")
+        self.YOUTUBE_SEARCH_CACHE_TTL = self._get_int_config("YOUTUBE_SEARCH_CACHE_TTL", 7 * 24 * 3600)
+        self.YOUTUBE_SEARCH_CACHE_SIZE = self._get_int_config("YOUTUBE_SEARCH_CACHE_SIZE", 5000)
+        self.YOUTUBE_DAILY_QUOTA = self._get_int_config("YOUTUBE_DAILY_QUOTA", 10000)
+        # 자주 재생되는 곡의 Opus 파일 캐시 (최대 크기 0이면 사용 안 함)
+        self.AUDIO_CACHE_DIR = self._get_config("AUDIO_CACHE_DIR", "cache/audio")
+        self.AUDIO_CACHE_MAX_BYTES = self._get_int_config("AUDIO_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024)
+        # 이 횟수만큼 재생된 곡부터 캐시에 받음 (한 번만 듣는 곡은 스트리밍만 함)
+        self.AUDIO_CACHE_ADMIT_PLAYS = self._get_int_config("AUDIO_CACHE_ADMIT_PLAYS", 2)
+        
+        # 저장소 백엔드 ("json" 또는 "sqlite")
+        self.STORAGE_BACKEND = self._get_config("STORAGE_BACKEND", "json")
+        self.SQLITE_PATH = self._get_config("SQLITE_PATH", "data.db")
         
         self.BOT_NAME = self._get_config("BOT_NAME", "괴상한 봇")
         self.BOT_IDENTITY = self._get_config("BOT_IDENTITY", "당신은 괴상한 개발자 모임인 괴상한 괴발자 디스코드 채널의 봇입니다. 당신은 괴상한 개발자 모임의 일원이며, 디스코드 서버를 관리하고, 개발자들을 돕습니다.")
         self.BOT_START_MESSAGE = self._get_config("BOT_START_MESSAGE", "앗! 안녕하세요! 저는 괴상한 봇입니다! 무엇이든 물어봐주세요! U3U~ <3")
         
+        # 봇 호출 판단 (이름 외에 부를 수 있는 별칭, 판단용 모델)
+        self.BOT_ALIASES = self._get_config("BOT_ALIASES", [])
+        if isinstance(self.BOT_ALIASES, str):
+            self.BOT_ALIASES = [x.strip() for x in self.BOT_ALIASES.split(",") if x.strip()]
+        self.CLASSIFIER_MODEL = self._get_config("CLASSIFIER_MODEL", "gpt-4.1-mini")
+        self.ACTIVE_CONVERSATION_SECONDS = self._get_int_config("ACTIVE_CONVERSATION_SECONDS", 90)
+        
         logger.log("설정 로드 완료", logger.INFO)
 
     def _load_json_config(self):
@@ -59,5 +144,16 @@ class Settings:
             logger.log(f"설정 오류: {key}의 값이 정수가 아닙니다 ({val}). 기본값 {default}를 사용합니다.", logger.WARNING)
             return default
 
+    def _get_float_config(self, key, default=None):
+        """설정값을 실수로 가져옵니다."""
+        val = self._config.get(key)
+        if val is None:
+            return default
+        try:
+            return float(val)
+        except ValueError:
+            logger.log(f"설정 오류: {key}의 값이 숫자가 아닙니다 ({val}). 기본값 {default}를 사용합니다.", logger.WARNING)
+            return default
+
 # 전역 설정 인스턴스
 env = Settings()
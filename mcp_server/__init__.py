@@ -1,5 +1,6 @@
 from mcp_server.registry import tool_registry
 from mcp_server.context import global_context
+from typing import Iterable, List, Optional
 from mcp.types import TextContent
 
 # 외부 모듈 호환성을 위한 인터페이스 제공
@@ -8,7 +9,14 @@ def set_discord_client(client):
     global_context.set_client(client)
 
 def set_current_message(message):
-    global_context.set_current_message(message)
+    return global_context.set_current_message(message)
+
+def request_scope(message):
+    return global_context.request_scope(message)
+
+def is_read_only_tool(name: str) -> bool:
+    """부작용이 없어 다른 툴과 동시에 실행해도 되는 툴인지 확인합니다."""
+    return tool_registry.is_read_only(name)
 
 async def call_tool(name: str, arguments: dict):
     handler = tool_registry.get_handler(name)
@@ -17,6 +25,9 @@ async def call_tool(name: str, arguments: dict):
     
     return await handler(arguments)
 
+# 변환된 OpenAI 툴 스키마 캐시 (레지스트리 버전이 바뀔 때만 다시 만듦)
+_openai_tools_cache = {"version": None, "all": [], "subsets": {}}
+
 def _convert_tools_to_openai_format():
     """내부 헬퍼: 툴 레지스트리를 OpenAI Function 포맷으로 변환"""
     tools = tool_registry.get_all_tools()
@@ -37,11 +48,38 @@ def _convert_tools_to_openai_format():
         })
     return openai_tools
 
-async def get_openai_mcp_tools():
+def freeze_openai_tools():
+    """현재 레지스트리 기준으로 OpenAI 툴 스키마를 미리 변환해 둡니다."""
+    _openai_tools_cache["all"] = _convert_tools_to_openai_format()
+    _openai_tools_cache["subsets"] = {}
+    _openai_tools_cache["version"] = tool_registry.version
+    return _openai_tools_cache["all"]
+
+def get_cached_openai_tools(groups: Optional[Iterable[str]] = None) -> List[dict]:
+    """
+    캐시된 OpenAI 툴 스키마를 반환합니다. groups를 주면 해당 그룹의 툴만 반환합니다.
+    반환된 리스트는 공유되므로 수정하지 마세요.
+    """
+    if _openai_tools_cache["version"] != tool_registry.version:
+        freeze_openai_tools()
+    if groups is None:
+        return _openai_tools_cache["all"]
+
+    key = frozenset(groups)
+    subset = _openai_tools_cache["subsets"].get(key)
+    if subset is None:
+        subset = [
+            tool for tool in _openai_tools_cache["all"]
+            if tool_registry.get_group(tool["function"]["name"]) in key
+        ]
+        _openai_tools_cache["subsets"][key] = subset
+    return subset
+
+async def get_openai_mcp_tools(groups: Optional[Iterable[str]] = None):
     """OpenAI Function 호출에 사용할 MCP 툴 스키마 반환 (비동기)"""
     # 레거시 코드 호환성을 위해 비동기로 유지
-    return _convert_tools_to_openai_format()
+    return get_cached_openai_tools(groups)
 
 def get_gpt_functions():
     """GPT 모듈용 툴 스키마 반환 (동기)"""
-    return _convert_tools_to_openai_format()
+    return get_cached_openai_tools()
@@ -1,15 +1,31 @@
+import contextvars
+from contextlib import contextmanager
 import discord
-from typing import Optional, Tuple
+from typing import Optional
+from core.cache import TTLCache
+from core.config import env
 from core.logger import logger
 
+# 요청(대화)마다 독립적인 현재 메시지. asyncio 태스크별로 컨텍스트가 복사되므로
+# 동시에 진행되는 대화끼리 서로의 메시지를 덮어쓰지 않습니다.
+_current_message: contextvars.ContextVar[Optional[discord.Message]] = contextvars.ContextVar(
+    "mcp_current_message", default=None
+)
+
 class MCPContext:
     """
     MCP 서비스 전반에서 공유되는 상태(봇 클라이언트, 현재 메시지 등)를 관리합니다.
     싱글톤 패턴과 유사하게 동작하지만, 명시적으로 주입하여 사용합니다.
+    클라이언트는 프로세스 전역이고, 현재 메시지는 요청 범위(contextvars)입니다.
     """
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 300.0, cache_size: int = 1024):
         self._client: Optional[discord.Client] = None
-        self._current_message: Optional[discord.Message] = None
+        self._rest_cache = {
+            kind: TTLCache(maxsize=cache_size, ttl=cache_ttl) for kind in ("guild", "channel", "user")
+        }
+        self._lookup_stats = {
+            kind: {"gateway": 0, "cache": 0, "rest": 0} for kind in ("guild", "channel", "user")
+        }
 
     def set_client(self, client: discord.Client):
         self._client = client
@@ -20,33 +36,122 @@ class MCPContext:
             raise RuntimeError("디스코드 클라이언트가 초기화되지 않았습니다.")
         return self._client
 
-    def set_current_message(self, message: discord.Message):
-        self._current_message = message
-        # logger.log(f"MCP Context: 현재 메시지 컨텍스트 업데이트 ({message.id})", logger.DEBUG)
+    def set_current_message(self, message: discord.Message) -> contextvars.Token:
+        """현재 실행 컨텍스트에만 메시지를 설정합니다. 되돌릴 때 쓸 토큰을 반환합니다."""
+        return _current_message.set(message)
+
+    def reset_current_message(self, token: contextvars.Token):
+        _current_message.reset(token)
 
     def get_current_message(self) -> Optional[discord.Message]:
-        return self._current_message
+        return _current_message.get()
+
+    @contextmanager
+    def request_scope(self, message: discord.Message):
+        """with 블록 안에서만 message를 현재 메시지로 사용합니다."""
+        token = _current_message.set(message)
+        try:
+            yield
+        finally:
+            _current_message.reset(token)
 
     def get_guild_from_id(self, guild_id: int) -> Optional[discord.Guild]:
         if not self._client:
             return None
         return self._client.get_guild(guild_id)
 
-    async def fetch_guild(self, guild_id: int) -> discord.Guild:
+    async def _resolve(self, kind: str, object_id: int, get_cached, fetch_remote):
+        """
+        게이트웨이 캐시 → REST 결과 캐시(TTL+LRU) → REST 순서로 객체를 찾습니다.
+        """
         if not self._client:
             raise RuntimeError("Client not ready")
-        return await self._client.fetch_guild(guild_id)
+        stats = self._lookup_stats[kind]
+
+        obj = get_cached(object_id)
+        if obj is not None:
+            stats["gateway"] += 1
+            return obj
+
+        cache = self._rest_cache[kind]
+        obj = cache.get(object_id)
+        if obj is not None:
+            stats["cache"] += 1
+            return obj
+
+        stats["rest"] += 1
+        obj = await fetch_remote(object_id)
+        cache.set(object_id, obj)
+        return obj
+
+    async def fetch_guild(self, guild_id: int) -> discord.Guild:
+        return await self._resolve(
+            "guild", guild_id,
+            lambda i: self._client.get_guild(i), lambda i: self._client.fetch_guild(i)
+        )
 
     async def fetch_channel(self, channel_id: int):
-        if not self._client:
-            raise RuntimeError("Client not ready")
-        return await self._client.fetch_channel(channel_id)
+        return await self._resolve(
+            "channel", channel_id,
+            lambda i: self._client.get_channel(i), lambda i: self._client.fetch_channel(i)
+        )
     
     async def fetch_user(self, user_id: int):
-        if not self._client:
-            raise RuntimeError("Client not ready")
-        return await self._client.fetch_user(user_id)
+        return await self._resolve(
+            "user", user_id,
+            lambda i: self._client.get_user(i), lambda i: self._client.fetch_user(i)
+        )
+
+    def invalidate(self, kind: str, object_id: int):
+        """게이트웨이 update/delete 이벤트로 바뀐 객체를 REST 캐시에서 제거합니다."""
+        cache = self._rest_cache.get(kind)
+        if cache is not None:
+            cache.pop(object_id)
+
+    def get_cache_stats(self) -> dict:
+        """종류별 조회 경로 횟수와 REST를 피한 비율을 반환합니다."""
+        result = {}
+        for kind, stats in self._lookup_stats.items():
+            total = sum(stats.values())
+            result[kind] = dict(
+                stats,
+                hit_ratio=(stats["gateway"] + stats["cache"]) / total if total else 0.0,
+                cached=len(self._rest_cache[kind]),
+            )
+        return result
 
 # 전역 컨텍스트 인스턴스 (필요시 모듈 레벨에서 접근)
-global_context = MCPContext()
+global_context = MCPContext(cache_ttl=env.REST_CACHE_TTL, cache_size=env.REST_CACHE_SIZE)
+
+
+# 예제: 겹쳐 실행되는 대화들이 각자 자신의 메시지만 보는지 확인
+#   python -m mcp_server.context [대화 수]
+if __name__ == "__main__":
+    import asyncio
+    import random
+    import sys
+    from types import SimpleNamespace
+
+    conversations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    async def fake_tool():
+        await asyncio.sleep(random.random() * 0.01)
+        return global_context.get_current_message()
+
+    async def conversation(index: int):
+        message = SimpleNamespace(id=index, guild=SimpleNamespace(id=index % 7))
+        with global_context.request_scope(message):
+            for _ in range(5):
+                # 한 라운드의 툴들을 동시에 실행 (태스크로 컨텍스트가 복사됨)
+                seen = await asyncio.gather(*(fake_tool() for _ in range(3)))
+                if any(m is not message for m in seen):
+                    return False
+        return global_context.get_current_message() is None
+
+    async def main():
+        results = await asyncio.gather(*(conversation(i) for i in range(conversations)))
+        failures = results.count(False)
+        print(f"{conversations}개 대화 중 잘못된 메시지를 본 대화: {failures}개")
+        return failures
 
+    sys.exit(1 if asyncio.run(main()) else 0)
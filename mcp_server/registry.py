@@ -1,4 +1,4 @@
-from typing import Callable, Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Set
 from mcp.types import Tool
 import inspect
 from functools import wraps
@@ -11,10 +11,15 @@ class ToolRegistry:
     def __init__(self):
         self._tools: Dict[str, Tool] = {}
         self._handlers: Dict[str, Callable] = {}
+        self._read_only: Set[str] = set()
+        self._groups: Dict[str, str] = {}
+        # 툴이 등록/변경될 때마다 증가 (스키마 캐시 무효화용)
+        self.version = 0
 
-    def register(self, name: str, description: str, input_schema: Dict[str, Any]):
+    def register(self, name: str, description: str, input_schema: Dict[str, Any], read_only: bool = False):
         """
         데코레이터로 사용할 툴 등록 함수입니다.
+        read_only=True인 툴은 부작용이 없어 다른 툴과 동시에 실행할 수 있습니다.
         """
         def decorator(func: Callable):
             # 툴 메타데이터 생성
@@ -26,6 +31,13 @@ class ToolRegistry:
             
             self._tools[name] = tool
             self._handlers[name] = func
+            if read_only:
+                self._read_only.add(name)
+            else:
+                self._read_only.discard(name)
+            # mcp_server.tools.music → "music"
+            self._groups[name] = func.__module__.rsplit(".", 1)[-1]
+            self.version += 1
             
             logger.log(f"MCP 툴 등록됨: {name}", logger.DEBUG)
             
@@ -41,6 +53,13 @@ class ToolRegistry:
     def get_handler(self, name: str) -> Optional[Callable]:
         return self._handlers.get(name)
 
+    def is_read_only(self, name: str) -> bool:
+        return name in self._read_only
+
+    def get_group(self, name: str) -> Optional[str]:
+        """툴이 정의된 모듈 이름(music, role, channel 등)을 그룹으로 반환합니다."""
+        return self._groups.get(name)
+
 # 전역 레지스트리 인스턴스
 tool_registry = ToolRegistry()
 
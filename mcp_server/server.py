@@ -8,6 +8,7 @@ from mcp.types import Tool, TextContent
 from core.logger import logger
 from mcp_server.registry import tool_registry
 from mcp_server.context import global_context
+from mcp_server import freeze_openai_tools
 import mcp_server.tools
 
 class MCPServer:
@@ -28,6 +29,10 @@ class MCPServer:
             except Exception as e:
                 logger.log(f"MCP 툴 모듈 로드 실패 ({name}): {e}", logger.ERROR)
 
+        # 모든 툴이 등록된 시점에 OpenAI 툴 스키마를 한 번만 변환
+        tools = freeze_openai_tools()
+        logger.log(f"OpenAI 툴 스키마 준비 완료: {len(tools)}개", logger.INFO)
+
     def setup_handlers(self):
         @self.app.list_tools()
         async def list_tools() -> list[Tool]:
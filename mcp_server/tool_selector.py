@@ -0,0 +1,87 @@
+import re
+from typing import Any, Dict, Optional, Set
+
+# 툴 그룹(mcp_server/tools 모듈 이름)별 의도 키워드
+GROUP_KEYWORDS = {
+    "music": ["노래", "음악", "틀어", "재생", "곡", "플레이리스트", "대기열", "스킵", "넘겨", "멈춰", "꺼줘",
+              "음성", "보이스", "통화방", "들어와", "나가", "play", "music", "song", "queue", "skip", "voice"],
+    "role": ["역할", "롤", "권한", "role"],
+    "channel": ["채널", "카테고리", "스레드", "쓰레드", "방 만들", "방 삭제", "channel", "category", "thread"],
+    "member": ["멤버", "유저", "사용자", "회원", "닉네임", "별명", "추방", "차단", "강퇴", "킥", "밴",
+               "member", "user", "nickname", "kick", "ban"],
+    "message": ["메시지", "메세지", "반응", "이모지", "리액션", "수정", "고쳐", "되돌", "임베드", "공지", "보내",
+                "읽어", "삭제", "타임아웃", "message", "react", "emoji", "embed", "edit"],
+    "search": ["검색", "찾아봐", "알아봐", "조사", "최신", "뉴스", "날씨", "search", "google"],
+    "image": ["그림", "이미지", "그려", "사진", "image", "draw", "dall"],
+    "server": ["서버", "초대", "슬로우", "server", "guild", "invite", "slowmode"],
+}
+
+# 다른 툴의 매개변수(server_id 등)를 채우는 데 필요해 항상 포함하는 그룹
+ALWAYS_GROUPS = {"server"}
+
+# 고른 그룹에 없는 툴이 필요할 때 모델이 그룹을 더 요청하는 로컬 툴
+MORE_TOOLS_NAME = "request_more_tools"
+
+
+def _keyword_pattern(keyword: str) -> str:
+    """
+    단어 경계에서만 맞도록 키워드 패턴을 만듭니다.
+    영어는 단어 전체(복수형 허용)로, 한국어는 조사가 뒤에 붙으므로 단어 시작에서만 맞춥니다.
+    ('곡'이 '부곡'에, '롤'이 '컨트롤'에 맞는 것을 막음)
+    """
+    escaped = re.escape(keyword)
+    if keyword.isascii():
+        return rf"\b{escaped}(?:e?s)?\b"
+    return rf"(?<!\w){escaped}"
+
+
+_PATTERNS = {
+    group: re.compile("|".join(_keyword_pattern(k) for k in keywords), re.IGNORECASE)
+    for group, keywords in GROUP_KEYWORDS.items()
+}
+
+
+def select_tool_groups(text: str) -> Optional[Set[str]]:
+    """
+    메시지 내용으로 필요한 툴 그룹을 고릅니다.
+    어떤 그룹에도 해당하지 않으면 None을 반환해 전체 툴을 사용하게 합니다.
+    """
+    if not text:
+        return None
+    groups = {group for group, pattern in _PATTERNS.items() if pattern.search(text)}
+    if not groups:
+        return None
+    return groups | ALWAYS_GROUPS
+
+
+def more_tools_schema(selected: Set[str]) -> Optional[Dict[str, Any]]:
+    """아직 고르지 않은 그룹을 요청할 수 있는 request_more_tools 툴 스키마. 더 고를 그룹이 없으면 None."""
+    remaining = sorted(set(GROUP_KEYWORDS) - selected)
+    if not remaining:
+        return None
+    return {
+        "type": "function",
+        "function": {
+            "name": MORE_TOOLS_NAME,
+            "description": "지금 있는 툴로 요청을 처리할 수 없을 때 필요한 툴 그룹을 추가로 요청합니다. 다음 단계부터 해당 툴을 사용할 수 있습니다.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "groups": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": remaining},
+                        "description": "추가할 툴 그룹",
+                    }
+                },
+                "required": ["groups"],
+            },
+        },
+    }
+
+
+def expand_tool_groups(selected: Set[str], arguments: Dict[str, Any]) -> Set[str]:
+    """request_more_tools 호출 인자로 고른 그룹을 넓힙니다. 알 수 없는 그룹 이름은 무시합니다."""
+    requested = arguments.get("groups") or []
+    if isinstance(requested, str):
+        requested = [requested]
+    return selected | {group for group in requested if group in GROUP_KEYWORDS}
@@ -13,7 +13,7 @@ LIST_MEMBERS_SCHEMA = {
     "required": ["server_id"]
 }
 
-@tool_registry.register("list_members", "서버 멤버 목록 조회", LIST_MEMBERS_SCHEMA)
+@tool_registry.register("list_members", "서버 멤버 목록 조회", LIST_MEMBERS_SCHEMA, read_only=True)
 async def list_members(arguments: dict):
     guild = await global_context.fetch_guild(int(arguments["server_id"]))
     limit = min(int(arguments.get("limit", 100)), 1000)
@@ -138,7 +138,7 @@ GET_USER_INFO_SCHEMA = {
     "required": ["user_id"]
 }
 
-@tool_registry.register("get_user_info", "디스코드 사용자 정보 조회", GET_USER_INFO_SCHEMA)
+@tool_registry.register("get_user_info", "디스코드 사용자 정보 조회", GET_USER_INFO_SCHEMA, read_only=True)
 async def get_user_info(arguments: dict):
     user = await global_context.fetch_user(int(arguments["user_id"]))
     user_info = {
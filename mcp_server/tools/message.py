@@ -80,7 +80,7 @@ READ_MESSAGES_SCHEMA = {
     "required": ["channel_id"]
 }
 
-@tool_registry.register("read_messages", "채널에서 최근 메시지 읽기", READ_MESSAGES_SCHEMA)
+@tool_registry.register("read_messages", "채널에서 최근 메시지 읽기", READ_MESSAGES_SCHEMA, read_only=True)
 async def read_messages(arguments: dict):
     channel = await global_context.fetch_channel(int(arguments["channel_id"]))
     limit = min(int(arguments.get("limit", 10)), 100)
@@ -159,7 +159,7 @@ GET_IMAGE_FROM_MESSAGE_SCHEMA = {
     "required": ["channel_id", "message_id"]
 }
 
-@tool_registry.register("get_image_from_message", "특정 메시지에서 이미지를 가져옵니다.", GET_IMAGE_FROM_MESSAGE_SCHEMA)
+@tool_registry.register("get_image_from_message", "특정 메시지에서 이미지를 가져옵니다.", GET_IMAGE_FROM_MESSAGE_SCHEMA, read_only=True)
 async def get_image_from_message(arguments: dict):
     try:
         channel = await global_context.fetch_channel(int(arguments["channel_id"]))
@@ -204,17 +204,22 @@ JUDGE_CONVERSATION_ENDING_SCHEMA = {
     "required": ["message_content", "channel_id", "message_id"]
 }
 
+ENDING_KEYWORDS = [
+    "알겠어", "알겠습니다", "알았어", "알았습니다", "고마워", "감사합니다", "감사해요",
+    "ㄱㅅ", "ㄱㅅㅇ", "ㄱㅅㅎㄴㄷ", "땡큐", "ㅌㅋ", "ok", "오케이", "ㅇㅋ", "ㅇㅋㅇㅋ",
+    "멋있다", "잘했어", "수고해", "수고했어", "그래", "그렇구나", "응", "넵", "네"
+]
+
+def is_conversation_ending(message_content: str) -> bool:
+    """메시지에 대화 종료 신호가 들어 있는지 확인합니다."""
+    text = message_content.lower()
+    return any(keyword in text for keyword in ENDING_KEYWORDS)
+
 @tool_registry.register("judge_conversation_ending", "메시지가 대화를 종료하는 내용인지 판단하고 적절한 이모지로 응답합니다", JUDGE_CONVERSATION_ENDING_SCHEMA)
 async def judge_conversation_ending(arguments: dict):
     try:
         message_content = arguments["message_content"]
-        ending_keywords = [
-            "알겠어", "알겠습니다", "알았어", "알았습니다", "고마워", "감사합니다", "감사해요",
-            "ㄱㅅ", "ㄱㅅㅇ", "ㄱㅅㅎㄴㄷ", "땡큐", "ㅌㅋ", "OK", "오케이", "ㅇㅋ", "ㅇㅋㅇㅋ",
-            "멋있다", "잘했어", "수고해", "수고했어", "그래", "그렇구나", "응", "넵", "네"
-        ]
-        
-        is_ending = any(keyword in message_content.lower() for keyword in ending_keywords)
+        is_ending = is_conversation_ending(message_content)
         suggested_emoji = "👍" if is_ending else None
         
         if is_ending and suggested_emoji:
@@ -332,6 +337,7 @@ LIST_RECENT_BOT_MESSAGES_SCHEMA = {
     "list_recent_bot_messages",
     "현재 채널에서 최근 봇 메시지 목록을 조회하여 메시지 ID와 함께 요약을 제공합니다.",
     LIST_RECENT_BOT_MESSAGES_SCHEMA,
+    read_only=True,
 )
 async def list_recent_bot_messages(arguments: dict):
     """최근 봇 메시지들을 요약해서 보여줘서, 사용자가 편집할 메시지를 고를 수 있게 해주는 툴."""
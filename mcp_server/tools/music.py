@@ -2,7 +2,10 @@ from mcp_server.registry import tool_registry
 from mcp_server.context import global_context
 from mcp.types import TextContent
 import discord
-from services.music_service import music_service
+from services.music_service import music_service, format_duration
+
+# get_queue에서 보여 줄 최대 곡 수
+QUEUE_DISPLAY_LIMIT = 30
 
 JOIN_VOICE_SCHEMA = {
     "type": "object",
@@ -66,15 +69,24 @@ async def leave_voice_channel(arguments: dict):
 PLAY_MUSIC_SCHEMA = {
     "type": "object",
     "properties": {
-        "query": {"type": "string", "description": "노래 제목 또는 유튜브 URL"},
+        "query": {"type": "string", "description": "노래 제목, 유튜브 URL 또는 유튜브 재생목록 URL"},
+        "queries": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "여러 곡을 한 번에 추가할 때 노래 제목/URL 목록 (순서대로 추가)"
+        },
         "server_id": {"type": "string", "description": "서버 ID (생략 시 현재 컨텍스트)"}
     },
-    "required": ["query"]
+    "required": []
 }
 
-@tool_registry.register("play_music", "음악을 검색하여 재생 목록에 추가하고 재생합니다.", PLAY_MUSIC_SCHEMA)
+@tool_registry.register("play_music", "음악을 검색하여 재생 목록에 추가하고 재생합니다. 재생목록 URL이나 여러 곡도 한 번에 추가할 수 있습니다.", PLAY_MUSIC_SCHEMA)
 async def play_music(arguments: dict):
-    query = arguments["query"]
+    queries = list(arguments.get("queries") or [])
+    if arguments.get("query"):
+        queries.insert(0, arguments["query"])
+    if not queries:
+        return [TextContent(type="text", text="query 또는 queries를 지정해주세요.")]
     server_id = arguments.get("server_id")
     
     if server_id:
@@ -94,16 +106,21 @@ async def play_music(arguments: dict):
         else:
              return [TextContent(type="text", text="먼저 음성 채널에 입장시켜주세요 (join_voice_channel).")]
 
-    video_url = await music_service.search_video(query)
-    if not video_url:
+    msg = global_context.get_current_message()
+    requester = msg.author.display_name if msg else None
+    tracks = await music_service.enqueue(guild.id, queries, requester)
+    if not tracks:
          return [TextContent(type="text", text="음악을 찾을 수 없습니다.")]
-
-    await music_service.add_to_queue(guild.id, video_url)
     
     # 재생 시작 (이미 재생 중이면 큐에만 추가됨)
     await music_service.play_next(guild)
     
-    return [TextContent(type="text", text=f"'{query}' 검색 결과({video_url})를 재생 목록에 추가했습니다.")]
+    if len(tracks) == 1:
+        track = tracks[0]
+        return [TextContent(type="text", text=f"'{track.display_title}' ({track.display_duration}, {track.url})를 재생 목록에 추가했습니다.")]
+    lines = "\n".join(f"- {track.display_title} ({track.display_duration})" for track in tracks[:10])
+    more = f"\n... 외 {len(tracks) - 10}곡" if len(tracks) > 10 else ""
+    return [TextContent(type="text", text=f"{len(tracks)}곡을 재생 목록에 추가했습니다.\n{lines}{more}")]
 
 STOP_MUSIC_SCHEMA = {
     "type": "object",
@@ -163,7 +180,7 @@ GET_QUEUE_SCHEMA = {
     "required": []
 }
 
-@tool_registry.register("get_queue", "음악 재생 대기열을 확인합니다.", GET_QUEUE_SCHEMA)
+@tool_registry.register("get_queue", "음악 재생 대기열을 확인합니다.", GET_QUEUE_SCHEMA, read_only=True)
 async def get_queue(arguments: dict):
     server_id = arguments.get("server_id")
     if server_id:
@@ -177,9 +194,23 @@ async def get_queue(arguments: dict):
     queue = music_service.get_queue(guild.id)
     items = queue.get_list()
     
+    lines = []
+    if queue.current:
+        lines.append(f"재생 중: {_describe_track(queue.current)}")
     if not items:
-        return [TextContent(type="text", text="대기열이 비어있습니다.")]
-        
-    text = "\n".join([f"{i+1}. {url}" for i, url in enumerate(items)])
-    return [TextContent(type="text", text=f"현재 대기열:\n{text}")]
+        lines.append("대기열이 비어있습니다.")
+        return [TextContent(type="text", text="\n".join(lines))]
+
+    lines.append(f"현재 대기열 ({len(items)}곡, 총 {format_duration(queue.total_duration())}):")
+    lines.extend(f"{i+1}. {_describe_track(track)}" for i, track in enumerate(items[:QUEUE_DISPLAY_LIMIT]))
+    if len(items) > QUEUE_DISPLAY_LIMIT:
+        lines.append(f"... 외 {len(items) - QUEUE_DISPLAY_LIMIT}곡")
+    return [TextContent(type="text", text="\n".join(lines))]
+
+
+def _describe_track(track):
+    text = f"{track.display_title} ({track.display_duration})"
+    if track.requester:
+        text += f" - 요청: {track.requester}"
+    return text
 
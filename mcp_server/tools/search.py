@@ -14,7 +14,7 @@ SEARCH_SCHEMA = {
     "required": ["keyword"]
 }
 
-@tool_registry.register("search_and_crawl", "구글 검색 후 크롤링한 결과를 반환합니다", SEARCH_SCHEMA)
+@tool_registry.register("search_and_crawl", "구글 검색 후 크롤링한 결과를 반환합니다", SEARCH_SCHEMA, read_only=True)
 async def search_tool(arguments: dict):
     keyword = arguments["keyword"]
     
@@ -22,10 +22,7 @@ async def search_tool(arguments: dict):
     result = await search_and_crawl(keyword)
     
     if result:
-        # 결과가 너무 길면 자름
-        if len(result) > 12000:
-            result = result[:12000] + "..."
-        
+        # 결과 길이는 search_and_crawl에서 토큰 예산으로 제한됨
         return [TextContent(
             type="text",
             text=f"검색 결과: {keyword}\n\n{result}"
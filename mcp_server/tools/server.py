@@ -11,7 +11,7 @@ GET_SERVER_INFO_SCHEMA = {
     "required": ["server_id"]
 }
 
-@tool_registry.register("get_server_info", "디스코드 서버 정보 조회", GET_SERVER_INFO_SCHEMA)
+@tool_registry.register("get_server_info", "디스코드 서버 정보 조회", GET_SERVER_INFO_SCHEMA, read_only=True)
 async def get_server_info(arguments: dict):
     guild = await global_context.fetch_guild(int(arguments["server_id"]))
     info = {
@@ -37,7 +37,7 @@ LIST_CATEGORIES_SCHEMA = {
     "required": ["server_id"]
 }
 
-@tool_registry.register("list_categories", "서버의 카테고리 목록 조회", LIST_CATEGORIES_SCHEMA)
+@tool_registry.register("list_categories", "서버의 카테고리 목록 조회", LIST_CATEGORIES_SCHEMA, read_only=True)
 async def list_categories(arguments: dict):
     cache_guild = global_context.get_guild_from_id(int(arguments["server_id"]))
     
@@ -137,7 +137,7 @@ GET_SERVER_ID_FROM_MESSAGE_SCHEMA = {
     "required": []
 }
 
-@tool_registry.register("get_server_id_from_message", "메시지에서 서버 ID를 자동으로 추출합니다.", GET_SERVER_ID_FROM_MESSAGE_SCHEMA)
+@tool_registry.register("get_server_id_from_message", "메시지에서 서버 ID를 자동으로 추출합니다.", GET_SERVER_ID_FROM_MESSAGE_SCHEMA, read_only=True)
 async def get_server_id_from_message(arguments: dict):
     message_id = arguments.get("message_id")
     
@@ -182,7 +182,7 @@ SEARCH_CHANNEL_SCHEMA = {
     "required": ["server_id", "channel_name"]
 }
 
-@tool_registry.register("search_channel", "서버 내에서 채널 이름으로 채널을 검색합니다.", SEARCH_CHANNEL_SCHEMA)
+@tool_registry.register("search_channel", "서버 내에서 채널 이름으로 채널을 검색합니다.", SEARCH_CHANNEL_SCHEMA, read_only=True)
 async def search_channel(arguments: dict):
     cache_guild = global_context.get_guild_from_id(int(arguments["server_id"]))
     if not cache_guild:
@@ -224,7 +224,7 @@ GET_CHANNEL_INFO_SCHEMA = {
     "required": ["channel_id"]
 }
 
-@tool_registry.register("get_channel_info", "채널 ID로 채널의 상세 정보를 조회합니다.", GET_CHANNEL_INFO_SCHEMA)
+@tool_registry.register("get_channel_info", "채널 ID로 채널의 상세 정보를 조회합니다.", GET_CHANNEL_INFO_SCHEMA, read_only=True)
 async def get_channel_info(arguments: dict):
     channel = await global_context.fetch_channel(int(arguments["channel_id"]))
     info = {
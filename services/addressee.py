@@ -0,0 +1,234 @@
+import math
+import re
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import discord
+from core.config import env
+from core.logger import logger
+
+# 단계별 판단 결과 이름
+TIER_MENTION = "mention"
+TIER_REPLY = "reply"
+TIER_NAME = "name"
+TIER_OTHER_MENTION = "other_mention"
+TIER_ACTIVE = "active_conversation"
+TIER_MODEL = "bag_of_words"
+TIER_LLM = "llm"
+# 단어 모델을 쓰기 전에 클래스마다 필요한 최소 학습 예시 수
+MIN_CLASS_SAMPLES = 5
+# 대화 중인 사용자의 메시지가 봇에게 보내는 것일 사전 확률 (단어 모델 확률에 곱하는 오즈로 사용)
+ACTIVE_PRIOR = 0.75
+# 자모/기호/이모지뿐인 메시지 ("ㅋㅋ", "ㅇㅇ" 등)는 대화 중이어도 봇에게 보낸다고 볼 근거가 없음
+_LOW_SIGNAL = re.compile(r"^[\sㄱ-ㅎㅏ-ㅣ\W_]*$")
+
+# 학습 전 기본 예시 (True: 봇에게 보내는 메시지)
+SEED_EXAMPLES = [
+    ("이거 검색해줘", True), ("노래 틀어줘", True), ("채널 만들어줘", True),
+    ("역할 추가해줘", True), ("알려줘", True), ("설명해줄래?", True),
+    ("이미지 그려줘", True), ("번역해줘", True), ("요약해줘", True),
+    ("다음 곡 넘겨줘", True), ("어떻게 해야 돼?", True), ("뭐야 이거 알려줘", True),
+    ("ㅋㅋㅋㅋ", False), ("ㅇㅇ", False), ("나 밥 먹으러 감", False),
+    ("오늘 회의 몇 시였지 다들", False), ("ㄹㅇ", False), ("아 배고프다", False),
+    ("님들 퇴근함?", False), ("ㅎㅎ 그러게요", False), ("내일 봐요", False),
+    ("저도 그거 봤어요", False),
+]
+
+
+class Decision:
+    __slots__ = ("is_for_bot", "confidence", "tier")
+
+    def __init__(self, is_for_bot: bool, confidence: float, tier: str):
+        self.is_for_bot = is_for_bot
+        self.confidence = confidence
+        self.tier = tier
+
+    def __repr__(self):
+        return f"Decision(is_for_bot={self.is_for_bot}, confidence={self.confidence:.2f}, tier={self.tier})"
+
+
+class BagOfWordsModel:
+    """
+    단어와 글자 2-gram을 특징으로 쓰는 작은 나이브 베이즈 분류기입니다.
+    로컬 규칙으로 판단하지 못한 애매한 메시지의 LLM 판단 결과로만 점진적으로 학습합니다.
+    """
+    def __init__(self):
+        self.counts = {True: Counter(), False: Counter()}
+        self.totals = {True: 0, False: 0}
+        self.docs = {True: 0, False: 0}
+        self.vocab = set()
+        self.trained = 0
+        self.trained_by_label = {True: 0, False: 0}
+
+    @staticmethod
+    def features(text: str) -> List[str]:
+        text = text.lower()
+        words = re.findall(r"\w+", text)
+        compact = re.sub(r"\s+", "", text)
+        bigrams = [compact[i:i + 2] for i in range(len(compact) - 1)]
+        return [f"w:{w}" for w in words] + [f"c:{b}" for b in bigrams]
+
+    def train(self, text: str, label: bool, seed: bool = False):
+        feats = self.features(text)
+        self.counts[label].update(feats)
+        self.totals[label] += len(feats)
+        self.docs[label] += 1
+        self.vocab.update(feats)
+        if not seed:
+            self.trained += 1
+            self.trained_by_label[label] += 1
+
+    def is_ready(self, min_samples: int) -> bool:
+        """학습 예시가 충분하고 두 클래스 모두 어느 정도 모였는지 확인합니다."""
+        return self.trained >= min_samples and min(self.trained_by_label.values()) >= MIN_CLASS_SAMPLES
+
+    def predict(self, text: str) -> float:
+        """봇에게 보내는 메시지일 확률을 반환합니다."""
+        if not self.docs[True] or not self.docs[False]:
+            return 0.5
+        feats = self.features(text)
+        vocab_size = len(self.vocab) + 1
+        total_docs = self.docs[True] + self.docs[False]
+        scores = {}
+        for label in (True, False):
+            score = math.log(self.docs[label] / total_docs)
+            denominator = self.totals[label] + vocab_size
+            for feat in feats:
+                score += math.log((self.counts[label][feat] + 1) / denominator)
+            scores[label] = score
+        diff = max(min(scores[False] - scores[True], 50.0), -50.0)
+        return 1.0 / (1.0 + math.exp(diff))
+
+
+class AddresseeClassifier:
+    """
+    메시지가 봇에게 보내는 것인지 단계적으로 판단합니다.
+    멘션/답장 → 이름·별칭 → 단어 모델 순으로 확인하고, 그래도 애매할 때만 LLM에 물어봅니다.
+    대화 진행 상태는 그 자체로 결정하지 않고 단어 모델 확률을 봇 쪽으로 옮기는 사전 확률로만 씁니다.
+    """
+    def __init__(
+        self,
+        active_window: float = 90.0,
+        model_threshold: float = 0.9,
+        model_min_samples: int = 30,
+    ):
+        self.active_window = active_window
+        self.model_threshold = model_threshold
+        self.model_min_samples = model_min_samples
+        self.model = BagOfWordsModel()
+        for text, label in SEED_EXAMPLES:
+            self.model.train(text, label, seed=True)
+        # channel_id -> {user_id: 마지막으로 봇이 답한 시각}
+        self._active: Dict[int, Dict[int, float]] = {}
+        self.stats = Counter()
+
+    # ---- 대화 상태 ----
+
+    def note_bot_reply(self, channel_id: int, user_id: int):
+        """봇이 사용자에게 답했음을 기록해 짧은 시간 동안 대화 중 상태로 둡니다."""
+        self._active.setdefault(channel_id, {})[user_id] = time.monotonic()
+
+    def end_conversation(self, channel_id: int, user_id: Optional[int] = None):
+        """대화 종료 신호를 받은 사용자(없으면 채널 전체)의 대화 중 상태를 지웁니다."""
+        if user_id is None:
+            self._active.pop(channel_id, None)
+        else:
+            self._active.get(channel_id, {}).pop(user_id, None)
+
+    def _is_active(self, channel_id: int, user_id: int) -> bool:
+        participants = self._active.get(channel_id)
+        if not participants:
+            return False
+        now = time.monotonic()
+        for uid, last in list(participants.items()):
+            if now - last > self.active_window:
+                del participants[uid]
+        if not participants:
+            del self._active[channel_id]
+            return False
+        return user_id in participants
+
+    # ---- 로컬 판단 ----
+
+    def _names(self, bot_user: discord.abc.User) -> List[str]:
+        names = [bot_user.name, getattr(bot_user, "display_name", None), env.BOT_NAME, *env.BOT_ALIASES]
+        return list({self._normalize(n) for n in names if n and len(self._normalize(n)) >= 2})
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return re.sub(r"\s+", "", text or "").lower()
+
+    def classify_local(self, message: discord.Message, bot_user: discord.abc.User) -> Optional[Decision]:
+        """네트워크 호출 없이 판단할 수 있으면 결과를, 애매하면 None을 반환합니다."""
+        if bot_user in message.mentions:
+            return Decision(True, 1.0, TIER_MENTION)
+
+        reference = message.reference
+        resolved = getattr(reference, "resolved", None) if reference else None
+        if isinstance(resolved, discord.Message) and resolved.author.id == bot_user.id:
+            return Decision(True, 0.98, TIER_REPLY)
+
+        text = self._normalize(message.content)
+        if any(name in text for name in self._names(bot_user)):
+            return Decision(True, 0.9, TIER_NAME)
+
+        # 다른 사람을 지목한 메시지는 봇에게 보내는 것이 아님
+        if message.mentions or message.role_mentions or (isinstance(resolved, discord.Message) and not resolved.author.bot):
+            return Decision(False, 0.9, TIER_OTHER_MENTION)
+
+        # 대화 중이라는 사실만으로는 결정하지 않음 (옆 사람과의 잡담이나 "ㅋㅋ"도 있으므로)
+        active = (
+            self._is_active(message.channel.id, message.author.id)
+            and not _LOW_SIGNAL.match(message.content or "")
+        )
+        if self.model.is_ready(self.model_min_samples):
+            probability = self.model.predict(message.content)
+            tier = TIER_MODEL
+            if active:
+                odds = probability / max(1 - probability, 1e-9) * ACTIVE_PRIOR / (1 - ACTIVE_PRIOR)
+                probability = odds / (1 + odds)
+                tier = TIER_ACTIVE
+            if probability >= self.model_threshold:
+                return Decision(True, probability, tier)
+            if probability <= 1 - self.model_threshold:
+                return Decision(False, 1 - probability, tier)
+
+        return None
+
+    async def classify(
+        self,
+        message: discord.Message,
+        bot_user: discord.abc.User,
+        ask_llm: Callable[[], Awaitable[Tuple[bool, float]]],
+    ) -> Decision:
+        """
+        로컬 판단이 애매할 때만 ask_llm을 호출합니다.
+        ask_llm은 (is_for_bot, confidence)를 반환하는 코루틴 함수입니다.
+        """
+        self.stats["total"] += 1
+        decision = self.classify_local(message, bot_user)
+        if decision is not None:
+            self.stats[decision.tier] += 1
+            self.stats["llm_avoided"] += 1
+        else:
+            self.stats["llm_calls"] += 1
+            is_for_bot, confidence = await ask_llm()
+            decision = Decision(bool(is_for_bot), float(confidence or 0), TIER_LLM)
+            self.stats[TIER_LLM] += 1
+            # 멘션/답장/이름처럼 확실한 메시지는 긍정 쪽으로만 치우치므로 학습하지 않고,
+            # 모델이 실제로 판단해야 하는 애매한 메시지의 LLM 판단만 학습
+            if message.content:
+                self.model.train(message.content, decision.is_for_bot)
+
+        logger.log(f"봇 호출 판단: {decision}", logger.DEBUG)
+        return decision
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        total = stats.get("total", 0)
+        stats["llm_avoided_ratio"] = (stats.get("llm_avoided", 0) / total) if total else 0.0
+        stats["model_trained"] = self.model.trained
+        return stats
+
+
+addressee_classifier = AddresseeClassifier(active_window=env.ACTIVE_CONVERSATION_SECONDS)
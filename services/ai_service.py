@@ -3,6 +3,7 @@ from typing import Optional, Tuple, List, Dict, Any
 from openai import AsyncOpenAI
 from core.config import env
 from core.logger import logger
+from services.usage_metrics import usage_tracker
 
 class AIService:
     _instance = None
@@ -47,13 +48,14 @@ class AIService:
                     context += f"{author}: {msg['content']}\n"
             
             response = await self.client.chat.completions.create(
-                model="gpt-4.1-mini",
+                model=env.CLASSIFIER_MODEL,
                 messages=[
                     {"role": "system", "content": f"당신은 메시지가 봇에게 보내는 것인지 판단하는 AI입니다. 최근 대화 맥락과 메시지 내용을 분석하여 메시지가 '{bot_name}'에게 보내는 것인지 판단하세요."},
                     {"role": "user", "content": f"최근 대화 맥락:\n{context}\n\n사용자 '{username}'의 새 메시지: {message_content}\n\n이 메시지가 봇('{bot_name}')에게 보내는 것인지 판단하세요. JSON 형식으로 다음을 반환하세요: {{\"is_for_bot\": true/false, \"confidence\": 0~1, \"reason\": \"판단 이유\"}}"}
                 ],
             )
             
+            usage_tracker.record(response.usage, model=env.CLASSIFIER_MODEL, label="classifier")
             result_text = response.choices[0].message.content
             try:
                 result = json.loads(result_text)
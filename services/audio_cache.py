@@ -0,0 +1,259 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+from core.config import env
+from core.logger import logger
+
+# Ogg 컨테이너 파일의 시작 바이트 (Opus 파일 무결성 확인용)
+OGG_MAGIC = b"OggS"
+
+# 재생 횟수를 기억해 둘 최대 영상 수 (캐시 입장 판단용)
+SEEN_IDS_MAX = 4096
+
+_VIDEO_ID = re.compile(r"(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})")
+
+
+def parse_video_id(url: str) -> Optional[str]:
+    """유튜브 주소에서 영상 ID를 꺼냅니다. 알 수 없는 주소면 None."""
+    match = _VIDEO_ID.search(url or "")
+    return match.group(1) if match else None
+
+
+class AudioCache:
+    """
+    자주 재생되는 곡을 영상 ID별 Opus(.opus) 파일로 보관하는 디스크 캐시입니다.
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 재생하지 않은 곡부터 지웁니다.
+    - 시작할 때 verify()로 색인과 파일 크기, Ogg 헤더를 확인해 깨진 항목과 색인에 없는 파일을 정리합니다.
+    - 한 번만 재생되는 곡까지 받지 않도록 admit_plays번째 재생부터 캐시에 넣습니다.
+    - 재생 중인 곡은 pin()으로 고정해 정리 대상에서 뺍니다.
+    재생 준비는 워커 스레드에서 하므로 모든 접근은 락으로 보호합니다.
+    """
+    def __init__(self, directory: str, max_bytes: int, admit_plays: int = 2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.admit_plays = max(1, admit_plays)
+        self._plays: "OrderedDict[str, int]" = OrderedDict()  # video_id -> 캐시 밖에서 재생된 횟수
+        self._pinned = Counter()  # video_id -> 재생 중인 수
+        self._index_path = os.path.join(directory, "index.json")
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()  # video_id -> {"file", "size", "last_used"}
+        self._bytes = 0
+        self._loaded = False
+        self._dirty = False
+        self.stats = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ---- 색인 ----
+
+    def verify(self):
+        """색인을 읽고 파일을 검사합니다. 봇 시작 시 한 번 호출합니다."""
+        with self._lock:
+            self._loaded = True
+            if not self.enabled:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                with open(self._index_path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+            except FileNotFoundError:
+                raw = {}
+            except (OSError, json.JSONDecodeError) as e:
+                logger.log(f"오디오 캐시 색인 로드 실패, 파일을 다시 검사합니다: {e}", logger.WARNING)
+                raw = {}
+
+            self._entries.clear()
+            self._bytes = 0
+            broken = 0
+            for video_id, entry in sorted(raw.items(), key=lambda item: item[1].get("last_used", 0)):
+                if self._is_intact(entry):
+                    self._entries[video_id] = entry
+                    self._bytes += entry["size"]
+                else:
+                    broken += 1
+                    self._remove_file(entry.get("file"))
+
+            # 색인에 없는 파일(중단된 저장 등) 정리
+            known = {entry["file"] for entry in self._entries.values()}
+            orphans = 0
+            for name in os.listdir(self.directory):
+                if name != "index.json" and name not in known:
+                    self._remove_file(name)
+                    orphans += 1
+
+            self._dirty = bool(broken or orphans)
+            self._evict()
+            self._flush()
+            logger.log(
+                f"오디오 캐시 확인: {len(self._entries)}곡, {self._bytes / 1024 / 1024:.1f}MB "
+                f"(손상 {broken}, 정리한 파일 {orphans})",
+                logger.INFO,
+            )
+
+    def _is_intact(self, entry: dict) -> bool:
+        try:
+            path = self._path(entry["file"])
+            if os.path.getsize(path) != entry["size"] or entry["size"] == 0:
+                return False
+            with open(path, "rb") as f:
+                return f.read(len(OGG_MAGIC)) == OGG_MAGIC
+        except (KeyError, TypeError, OSError):
+            return False
+
+    def _flush(self):
+        if not self._dirty:
+            return
+        fd, tmp_path = tempfile.mkstemp(prefix=".index-", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(dict(self._entries), f)
+            os.replace(tmp_path, self._index_path)
+            self._dirty = False
+        except OSError as e:
+            logger.log(f"오디오 캐시 색인 저장 실패: {e}", logger.ERROR)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def close(self):
+        with self._lock:
+            if self._loaded and self.enabled:
+                self._flush()
+
+    # ---- 조회/저장 ----
+
+    def get(self, video_id: Optional[str]) -> Optional[str]:
+        """캐시된 파일 경로를 반환합니다. 없으면 None."""
+        if not video_id or not self.enabled:
+            return None
+        with self._lock:
+            if not self._loaded:
+                self.verify()
+            entry = self._entries.get(video_id)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            path = self._path(entry["file"])
+            if not os.path.exists(path):
+                self._drop(video_id)
+                self.stats["misses"] += 1
+                return None
+            entry["last_used"] = time.time()
+            self._entries.move_to_end(video_id)
+            self._dirty = True
+            self.stats["hits"] += 1
+            return path
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            return video_id in self._entries
+
+    def admit(self, video_id: str) -> bool:
+        """캐시 밖에서 재생된 횟수를 세고, 캐시에 넣을 만큼 자주 재생됐으면 True를 반환합니다."""
+        with self._lock:
+            plays = self._plays.pop(video_id, 0) + 1
+            if plays >= self.admit_plays:
+                return True
+            self._plays[video_id] = plays
+            while len(self._plays) > SEEN_IDS_MAX:
+                self._plays.popitem(last=False)
+            self.stats["deferred"] += 1
+            return False
+
+    def pin(self, video_id: str):
+        """재생 중인 곡 파일이 정리되거나 교체되지 않도록 고정합니다."""
+        with self._lock:
+            self._pinned[video_id] += 1
+
+    def unpin(self, video_id: str):
+        with self._lock:
+            self._pinned[video_id] -= 1
+            if self._pinned[video_id] <= 0:
+                del self._pinned[video_id]
+            self._evict()
+
+    def put(self, video_id: str, source_path: str) -> Optional[str]:
+        """받아 둔 Opus 파일을 캐시로 옮깁니다. 캐시에 넣지 못하면 원본을 지우고 None을 반환합니다."""
+        if not self.enabled:
+            self._remove_path(source_path)
+            return None
+        with self._lock:
+            if not self._loaded:
+                self.verify()
+            size = os.path.getsize(source_path)
+            with open(source_path, "rb") as f:
+                intact = f.read(len(OGG_MAGIC)) == OGG_MAGIC
+            if not intact or size > self.max_bytes:
+                self._remove_path(source_path)
+                self.stats["rejected"] += 1
+                return None
+            if video_id in self._entries:
+                if video_id in self._pinned:
+                    # 재생 중인 파일은 교체하지 않음
+                    self._remove_path(source_path)
+                    return self._path(self._entries[video_id]["file"])
+                self._drop(video_id)
+            name = f"{video_id}.opus"
+            shutil.move(source_path, self._path(name))
+            self._entries[video_id] = {"file": name, "size": size, "last_used": time.time()}
+            self._bytes += size
+            self._dirty = True
+            self.stats["stores"] += 1
+            self._evict()
+            self._flush()
+            return self._path(name)
+
+    def _drop(self, video_id: str):
+        entry = self._entries.pop(video_id, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+            self._remove_file(entry["file"])
+            self._dirty = True
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        # 오래 재생하지 않은 곡부터 지우되, 재생 중인 곡은 건너뜀
+        for video_id in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                break
+            if video_id in self._pinned:
+                continue
+            self._drop(video_id)
+            self.stats["evictions"] += 1
+        self._flush()
+
+    def _remove_file(self, name: Optional[str]):
+        if name:
+            self._remove_path(self._path(name))
+
+    @staticmethod
+    def _remove_path(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            hits = self.stats.get("hits", 0)
+            total = hits + self.stats.get("misses", 0)
+            return {
+                **self.stats,
+                "tracks": len(self._entries),
+                "bytes": self._bytes,
+                "hit_ratio": hits / total if total else 0.0,
+            }
+
+
+audio_cache = AudioCache(env.AUDIO_CACHE_DIR, env.AUDIO_CACHE_MAX_BYTES, env.AUDIO_CACHE_ADMIT_PLAYS)
@@ -0,0 +1,248 @@
+import asyncio
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+from core.config import env
+from core.logger import logger
+
+
+class ChatRequest:
+    """대기열에 들어가는 응답 요청 하나. 같은 사용자의 연속 메시지는 하나로 합쳐집니다."""
+    __slots__ = (
+        "message", "username", "text", "image_mode", "image_url",
+        "handler", "on_shed", "enqueued_at", "ready_at", "coalesced",
+    )
+
+    def __init__(
+        self,
+        message,
+        username: str,
+        text: str,
+        image_mode: bool,
+        image_url: Optional[str],
+        handler: Callable[["ChatRequest"], Awaitable[None]],
+        on_shed: Callable[["ChatRequest"], Awaitable[None]],
+    ):
+        self.message = message
+        self.username = username
+        self.text = text
+        self.image_mode = image_mode
+        self.image_url = image_url
+        self.handler = handler
+        self.on_shed = on_shed
+        self.enqueued_at = time.monotonic()
+        self.ready_at = self.enqueued_at
+        self.coalesced = 0
+
+    @property
+    def guild_id(self) -> int:
+        return self.message.guild.id if self.message.guild else 0
+
+    @property
+    def channel_id(self) -> int:
+        return self.message.channel.id
+
+    @property
+    def user_id(self) -> int:
+        return self.message.author.id
+
+    def merge(self, other: "ChatRequest"):
+        """뒤이어 온 메시지를 합칩니다. 답장과 툴 컨텍스트는 마지막 메시지를 기준으로 합니다."""
+        self.text = f"{self.text}\n{other.text}"
+        self.message = other.message
+        if other.image_mode:
+            self.image_mode, self.image_url = other.image_mode, other.image_url
+        self.coalesced += 1
+
+
+class ChatScheduler:
+    """
+    on_message 응답 처리를 제한된 동시성으로 실행하는 스케줄러입니다.
+    - 전체 동시 실행 수를 max_concurrency로 제한하고, 채널마다 한 번에 하나씩만 실행합니다.
+    - 서버(길드)끼리, 같은 서버 안에서는 채널끼리 라운드 로빈으로 번갈아 꺼내 한 곳이 독점하지 못하게 합니다.
+    - 새 요청은 coalesce_seconds 동안 기다렸다가 실행하고, 그동안 같은 사용자가 다시 보낸 메시지는 대기 중인 요청에 합칩니다.
+    - 대기열이 가득 차거나 max_wait 이상 기다린 요청은 on_shed로 "바쁨" 안내만 하고 버립니다.
+    """
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        max_channel_queue: int,
+        coalesce_seconds: float,
+        max_wait: float,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.max_channel_queue = max_channel_queue
+        self.coalesce_seconds = coalesce_seconds
+        self.max_wait = max_wait
+
+        # guild_id -> (channel_id -> 대기 요청)
+        self._queues: "OrderedDict[int, OrderedDict[int, deque]]" = OrderedDict()
+        # (channel_id, user_id) -> 아직 시작하지 않은 요청 (합치기 대상)
+        self._pending: Dict[Tuple[int, int], ChatRequest] = {}
+        self._active_channels: Set[int] = set()
+        self._running = 0
+        self._queued = 0
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        # 실행 중인 태스크 참조 (가비지 컬렉션 방지 및 예외 기록)
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.stats = Counter()
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def submit(self, request: ChatRequest) -> bool:
+        """요청을 대기열에 넣습니다. 대기 중인 요청과 합쳤거나 넣었으면 True, 버렸으면 False."""
+        self._ensure_dispatcher()
+        self.stats["submitted"] += 1
+
+        key = (request.channel_id, request.user_id)
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.merge(request)
+            # 연속 입력이 이어지는 동안 조금 더 기다리되, 처음 요청 이후 coalesce_seconds의 3배까지만
+            pending.ready_at = min(time.monotonic() + self.coalesce_seconds, pending.enqueued_at + self.coalesce_seconds * 3)
+            self.stats["coalesced"] += 1
+            self._wakeup.set()
+            return True
+
+        channels = self._queues.setdefault(request.guild_id, OrderedDict())
+        queue = channels.setdefault(request.channel_id, deque())
+        if self._queued >= self.max_queue or len(queue) >= self.max_channel_queue:
+            if not queue:
+                del channels[request.channel_id]
+            if not channels:
+                del self._queues[request.guild_id]
+            self._shed(request, "대기열 가득 참")
+            return False
+
+        # 한가한 채널이라도 바로 실행하면 곧이어 온 메시지가 별도 요청이 되므로 연속 입력을 잠시 기다림
+        request.ready_at = request.enqueued_at + self.coalesce_seconds
+        queue.append(request)
+        self._pending[key] = request
+        self._queued += 1
+        self._wakeup.set()
+        return True
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = self._spawn(self._dispatch_loop())
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.log(f"채팅 스케줄러 태스크 오류: {task.exception()!r}", logger.ERROR)
+
+    def _next_ready(self) -> Tuple[Optional[ChatRequest], Optional[float]]:
+        """라운드 로빈 순서로 실행 가능한 요청을 꺼냅니다. 없으면 가장 가까운 준비 시각까지 남은 시간을 반환합니다."""
+        now = time.monotonic()
+        soonest = None
+        for guild_id, channels in list(self._queues.items()):
+            for channel_id, queue in list(channels.items()):
+                if channel_id in self._active_channels:
+                    continue
+                head = queue[0]
+                if head.ready_at > now:
+                    delay = head.ready_at - now
+                    soonest = delay if soonest is None else min(soonest, delay)
+                    continue
+
+                queue.popleft()
+                self._queued -= 1
+                self._pending.pop((channel_id, head.user_id), None)
+                # 꺼낸 채널과 서버는 맨 뒤로 보내 다음 차례를 양보
+                if queue:
+                    channels.move_to_end(channel_id)
+                else:
+                    del channels[channel_id]
+                if channels:
+                    self._queues.move_to_end(guild_id)
+                else:
+                    del self._queues[guild_id]
+                return head, None
+        return None, soonest
+
+    async def _dispatch_loop(self):
+        while True:
+            self._wakeup.clear()
+            timeout = None
+            while self._running < self.max_concurrency:
+                request, timeout = self._next_ready()
+                if request is None:
+                    break
+                self._start(request)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _start(self, request: ChatRequest):
+        waited = time.monotonic() - request.ready_at
+        if waited > self.max_wait:
+            self._shed(request, f"{waited:.0f}초 대기")
+            return
+
+        self._running += 1
+        self._active_channels.add(request.channel_id)
+        self.stats["started"] += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        task = self._spawn(self._run(request))
+        task.add_done_callback(lambda _: self._finish(request))
+
+    async def _run(self, request: ChatRequest):
+        try:
+            await request.handler(request)
+            self.stats["completed"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.log(f"채팅 요청 처리 오류: {e}", logger.ERROR)
+
+    def _finish(self, request: ChatRequest):
+        self._running -= 1
+        self._active_channels.discard(request.channel_id)
+        self._wakeup.set()
+
+    def _shed(self, request: ChatRequest, reason: str):
+        self.stats["shed"] += 1
+        logger.log(f"채팅 요청을 처리하지 못하고 안내만 보냅니다 ({reason}): 채널 {request.channel_id}", logger.WARNING)
+        self._spawn(self._notify_shed(request))
+
+    async def _notify_shed(self, request: ChatRequest):
+        try:
+            await request.on_shed(request)
+        except Exception as e:
+            logger.log(f"바쁨 안내 전송 실패: {e}", logger.WARNING)
+
+    def get_stats(self) -> dict:
+        started = self.stats.get("started", 0)
+        return {
+            **self.stats,
+            "running": self._running,
+            "queued": self._queued,
+            "queued_by_guild": {
+                guild_id: sum(len(q) for q in channels.values())
+                for guild_id, channels in self._queues.items()
+            },
+            "avg_wait": self._wait_total / started if started else 0.0,
+            "max_wait": self._wait_max,
+        }
+
+
+chat_scheduler = ChatScheduler(
+    max_concurrency=env.CHAT_CONCURRENCY,
+    max_queue=env.CHAT_QUEUE_SIZE,
+    max_channel_queue=env.CHAT_CHANNEL_QUEUE_SIZE,
+    coalesce_seconds=env.CHAT_COALESCE_SECONDS,
+    max_wait=env.CHAT_MAX_WAIT_SECONDS,
+)
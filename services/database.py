@@ -1,77 +1,316 @@
+import atexit
 import json
 import os
+import tempfile
+import threading
+import time
+from typing import Optional
+from core.config import env
 from core.logger import logger
 
 DATA_FILE = "data.json"
 
-def _load_data():
-    if not os.path.exists(DATA_FILE):
-        default_data = {"chat_channels": [], "settings": {}}
-        _save_data(default_data)
-        logger.log(f"데이터 파일 생성: {DATA_FILE}", logger.INFO)
-        return default_data
-    try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
-        logger.log(f"데이터 로드 오류 ({DATA_FILE}): {e}", logger.ERROR)
-        default_data = {"chat_channels": [], "settings": {}}
-        _save_data(default_data)
-        return default_data
-
-def _save_data(data):
-    try:
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-    except IOError as e:
-        logger.log(f"데이터 저장 오류 ({DATA_FILE}): {e}", logger.ERROR)
+_KNOWN_KEYS = ("chat_channels", "channel_guilds", "settings", "guild_settings")
+
+# 변경 사항을 모아서 저장하기까지 기다리는 시간 (초)
+FLUSH_DELAY = 1.0
+# 디스크 파일 변경 여부를 확인하는 최소 간격 (초)
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+class DataStore:
+    """
+    data.json 내용을 메모리에 유지하는 프로세스 전역 저장소입니다.
+    읽기는 메모리(set/dict)에서 처리하고, 쓰기는 모아서 지연 저장(write-behind)합니다.
+    """
+    def __init__(self, path: str = DATA_FILE, flush_delay: float = FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._channels = []          # 등록 순서 유지용
+        self._channel_set = set()    # O(1) 포함 여부 확인용
+        self._channel_guilds = {}    # channel_id -> guild_id
+        self._settings = {}
+        self._guild_settings = {}    # guild_id -> {name: value}
+        self._extra = {}             # 알 수 없는 최상위 키 보존
+        self._loaded = False
+        self._dirty = False
+        self._timer = None
+        self._mtime = None
+        self._last_check = 0.0
+        self.stats = {"reads": 0, "writes": 0, "disk_loads": 0, "mutations": 0}
+
+    # ---- 디스크 입출력 ----
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            self._apply({"chat_channels": [], "settings": {}})
+            self._dirty = True
+            self._flush_locked()
+            logger.log(f"데이터 파일 생성: {self.path}", logger.INFO)
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._apply(data)
+            self._mtime = os.stat(self.path).st_mtime_ns
+        except (json.JSONDecodeError, OSError) as e:
+            logger.log(f"데이터 로드 오류 ({self.path}): {e}", logger.ERROR)
+            self._apply({"chat_channels": [], "settings": {}})
+            self._dirty = True
+            self._flush_locked()
+        self.stats["disk_loads"] += 1
+
+    def _apply(self, data: dict):
+        self._channels = list(data.get("chat_channels", []))
+        self._channel_set = set(self._channels)
+        # JSON 키는 문자열이므로 정수 ID로 되돌립니다.
+        self._channel_guilds = {int(k): v for k, v in data.get("channel_guilds", {}).items()}
+        self._settings = dict(data.get("settings", {}))
+        self._guild_settings = {int(k): dict(v) for k, v in data.get("guild_settings", {}).items()}
+        self._extra = {k: v for k, v in data.items() if k not in _KNOWN_KEYS}
+        self._loaded = True
+
+    def _snapshot(self) -> dict:
+        data = dict(self._extra)
+        data["chat_channels"] = list(self._channels)
+        data["channel_guilds"] = {str(k): v for k, v in self._channel_guilds.items()}
+        data["settings"] = dict(self._settings)
+        data["guild_settings"] = {str(k): dict(v) for k, v in self._guild_settings.items()}
+        return data
+
+    def _flush_locked(self):
+        if not self._dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".data-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self._snapshot(), f, indent=4, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._mtime = os.stat(self.path).st_mtime_ns
+            self._dirty = False
+            self.stats["writes"] += 1
+        except OSError as e:
+            logger.log(f"데이터 저장 오류 ({self.path}): {e}", logger.ERROR)
+
+    def _ensure_fresh(self):
+        """최초 접근 시 로드하고, 이후에는 주기적으로 외부 변경을 감지해 다시 읽습니다."""
+        if not self._loaded:
+            self._load()
+            return
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return
+        self._last_check = now
+        # 아직 저장하지 않은 변경이 있으면 메모리 상태를 우선합니다.
+        if self._dirty:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            logger.log(f"데이터 파일 변경 감지, 다시 로드합니다: {self.path}", logger.INFO)
+            self._load()
+
+    def _schedule_flush(self):
+        self._dirty = True
+        self.stats["mutations"] += 1
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """대기 중인 변경 사항을 즉시 저장합니다."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._flush_locked()
+
+    # ---- 조회 ----
+
+    def get_chat_channels(self, guild_id: Optional[int] = None) -> list:
+        with self._lock:
+            self._ensure_fresh()
+            self.stats["reads"] += 1
+            if guild_id is None:
+                return list(self._channels)
+            return [c for c in self._channels if self._channel_guilds.get(c) == guild_id]
+
+    def is_chat_channel(self, channel_id) -> bool:
+        with self._lock:
+            self._ensure_fresh()
+            self.stats["reads"] += 1
+            return channel_id in self._channel_set
+
+    def get_setting(self, name, default=None, guild_id: Optional[int] = None):
+        """길드 설정이 없으면 전역 설정을 반환합니다."""
+        with self._lock:
+            self._ensure_fresh()
+            self.stats["reads"] += 1
+            if guild_id is not None:
+                guild_settings = self._guild_settings.get(guild_id)
+                if guild_settings and name in guild_settings:
+                    return guild_settings[name]
+            return self._settings.get(name, default)
+
+    # ---- 변경 ----
+
+    def add_chat_channel(self, channel_id, guild_id: Optional[int] = None, name: Optional[str] = None) -> bool:
+        with self._lock:
+            self._ensure_fresh()
+            if channel_id in self._channel_set:
+                return False
+            self._channels.append(channel_id)
+            self._channel_set.add(channel_id)
+            if guild_id:
+                self._channel_guilds[channel_id] = guild_id
+            self._schedule_flush()
+            return True
+
+    def delete_chat_channel(self, channel_id) -> bool:
+        with self._lock:
+            self._ensure_fresh()
+            if channel_id not in self._channel_set:
+                return False
+            self._channels.remove(channel_id)
+            self._channel_set.discard(channel_id)
+            self._channel_guilds.pop(channel_id, None)
+            self._schedule_flush()
+            return True
 
-def get_chat_channels():
-    data = _load_data()
-    return data.get("chat_channels", [])
+    def set_setting(self, name, value, guild_id: Optional[int] = None):
+        with self._lock:
+            self._ensure_fresh()
+            if guild_id:
+                self._guild_settings.setdefault(guild_id, {})[name] = value
+            else:
+                self._settings[name] = value
+            self._schedule_flush()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats, pending=self._dirty)
+
+
+def _create_store():
+    """설정(STORAGE_BACKEND)에 따라 저장소 백엔드를 생성합니다."""
+    backend = (env.STORAGE_BACKEND or "json").lower()
+    if backend == "sqlite":
+        from services.sqlite_store import SQLiteStore
+        sqlite_store = SQLiteStore(env.SQLITE_PATH)
+        # 기존 data.json이 있으면 최초 1회만 가져옵니다.
+        sqlite_store.migrate_from_json(DATA_FILE)
+        logger.log(f"SQLite 저장소 사용: {env.SQLITE_PATH}", logger.INFO)
+        return sqlite_store
+    if backend != "json":
+        logger.log(f"알 수 없는 STORAGE_BACKEND({backend}), JSON 저장소를 사용합니다.", logger.WARNING)
+    return DataStore()
+
+# 프로세스 전역 저장소 인스턴스
+store = _create_store()
+atexit.register(store.flush)
+
+def get_chat_channels(guild_id=None):
+    return store.get_chat_channels(guild_id)
+
+def is_chat_channel(channel_id):
+    return store.is_chat_channel(channel_id)
 
 def add_chat_channel(channel_id, guild_id, name):
-    data = _load_data()
-    if "chat_channels" not in data:
-        data["chat_channels"] = []
-        
-    if channel_id not in data["chat_channels"]:
-        data["chat_channels"].append(channel_id)
-        _save_data(data)
+    if store.add_chat_channel(channel_id, guild_id, name):
         logger.log(f"채널 추가됨: {channel_id} ({name})", logger.INFO)
-        return True
     else:
         logger.log(f"채널 {channel_id}는 이미 존재합니다.", logger.WARNING)
-        return True # 이미 존재해도 성공으로 간주
+    return True # 이미 존재해도 성공으로 간주
 
 def delete_chat_channel(channel_id):
-    data = _load_data()
-    if "chat_channels" in data and channel_id in data["chat_channels"]:
-        data["chat_channels"].remove(channel_id)
-        _save_data(data)
+    if store.delete_chat_channel(channel_id):
         logger.log(f"채널 삭제됨: {channel_id}", logger.INFO)
         return True
     else:
         logger.log(f"삭제할 채널 {channel_id}를 찾을 수 없습니다.", logger.WARNING)
         return False
 
-def get_setting(name, default=None):
-    data = _load_data()
-    return data.get("settings", {}).get(name, default)
-
-def set_setting(name, value):
-    data = _load_data()
-    if "settings" not in data:
-        data["settings"] = {}
-    data["settings"][name] = value
-    _save_data(data)
-    logger.log(f"설정값 저장됨: {name}={value}", logger.INFO)
+def get_setting(name, default=None, guild_id=None):
+    return store.get_setting(name, default, guild_id)
+
+def get_int_setting(name, default, guild_id=None):
+    """정수 설정값을 읽습니다. 저장소에 따라 문자열, 정수 또는 None으로 오므로 여기서 한 번에 변환합니다."""
+    value = get_setting(name, guild_id=guild_id)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def set_setting(name, value, guild_id=None):
+    store.set_setting(name, value, guild_id)
+    logger.log(f"설정값 저장됨: {name}={value} (guild: {guild_id or '전역'})", logger.INFO)
     return True
 
+def get_store_stats():
+    """저장소 읽기/쓰기 카운터를 반환합니다."""
+    return store.get_stats()
+
 __all__ = [
     "get_chat_channels",
+    "is_chat_channel",
     "add_chat_channel",
     "delete_chat_channel",
     "get_setting",
-    "set_setting"
-] 
\ No newline at end of file
+    "set_setting",
+    "get_store_stats"
+]
+
+
+# 예제: 백엔드 비교 벤치마크 / 마이그레이션
+#   python -m services.database bench [개수]
+#   python -m services.database migrate [data.json] [data.db]
+if __name__ == "__main__":
+    import sys
+    import shutil
+    from services.sqlite_store import SQLiteStore
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "bench"
+
+    if command == "migrate":
+        json_path = sys.argv[2] if len(sys.argv) > 2 else DATA_FILE
+        sqlite_path = sys.argv[3] if len(sys.argv) > 3 else env.SQLITE_PATH
+        SQLiteStore(sqlite_path).migrate_from_json(json_path, force=True)
+        sys.exit(0)
+
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    workdir = tempfile.mkdtemp(prefix="db-bench-")
+
+    def timed(label, func):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<28} {elapsed * 1000:9.1f} ms  ({elapsed / count * 1e6:7.2f} us/op)")
+
+    try:
+        backends = [
+            ("json", DataStore(os.path.join(workdir, "bench.json"), flush_delay=3600)),
+            ("sqlite", SQLiteStore(os.path.join(workdir, "bench.db"))),
+        ]
+        for label, bench_store in backends:
+            print(f"[{label}] {count}개 채널/설정")
+            timed("add_chat_channel", lambda: [bench_store.add_chat_channel(i, i % 50 + 1, f"ch{i}") for i in range(count)])
+            timed("set_setting", lambda: [bench_store.set_setting(f"key{i}", i, i % 50 + 1) for i in range(count)])
+            timed("flush", bench_store.flush)
+            timed("is_chat_channel", lambda: [bench_store.is_chat_channel(i) for i in range(count)])
+            timed("get_setting", lambda: [bench_store.get_setting(f"key{i}", None, i % 50 + 1) for i in range(count)])
+            timed("get_chat_channels(guild)", lambda: [bench_store.get_chat_channels(i % 50 + 1) for i in range(count // 100)])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
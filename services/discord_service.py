@@ -1,5 +1,6 @@
 import discord
 from core.logger import logger
+from services.stream_renderer import StreamRenderer
 
 class DiscordService:
     @staticmethod
@@ -24,6 +25,11 @@ class DiscordService:
 
         return last_update_length
 
+    @staticmethod
+    def open_stream(message: discord.Message) -> StreamRenderer:
+        """스트리밍 응답용 렌더 태스크를 시작합니다. 끝나면 close()로 최종 상태를 반영해야 합니다."""
+        return StreamRenderer(message).start()
+
     @staticmethod
     def create_image_embed(title: str, description: str, url: str) -> discord.Embed:
         if len(title) > 250:
@@ -0,0 +1,155 @@
+import asyncio
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from core.config import env
+from core.logger import logger
+from services.html_extract import extract_text, ping, warm_up
+
+
+def _mp_context():
+    """
+    forkserver를 쓸 수 있으면 services.html_extract만 미리 불러 둔 서버 프로세스에서 워커를 fork합니다.
+    봇 프로세스의 이벤트 루프와 소켓을 복제하지 않으면서 워커마다 인터프리터를 새로 띄우는 비용을 줄입니다.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["services.html_extract"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class ExtractionPool:
+    """
+    HTML 텍스트 추출을 별도 프로세스에서 실행하는 풀입니다.
+    파싱은 CPU를 쓰고 GIL을 잡고 있으므로 큰 페이지는 프로세스 풀로 보내 이벤트 루프와 다른 크롤링이 막히지 않게 합니다.
+    워커에는 원본 바이트만 보내고 추출된 텍스트만 돌려받습니다.
+    inline_bytes 이하의 작은 페이지는 전송 비용이 더 크므로 루프에서 받는 대로 바로 파싱합니다.
+    workers가 0이면 풀 없이 모두 인라인으로 처리합니다.
+    """
+    def __init__(self, workers: int, inline_bytes: int):
+        self.workers = max(0, workers)
+        self.inline_bytes = inline_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    async def start(self):
+        if not self.enabled or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=_mp_context(),
+            initializer=warm_up,
+        )
+        # 워커는 처음 작업을 받을 때 생성되므로 미리 작업을 보내 첫 크롤링이 프로세스 시작을 기다리지 않게 합니다.
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(self._executor, ping) for _ in range(self.workers)))
+            logger.log(f"HTML 추출 프로세스 풀 시작 ({self.workers}개 워커)", logger.INFO)
+        except Exception as e:
+            logger.log(f"HTML 추출 프로세스 풀 시작 실패, 인라인으로 처리합니다: {e}", logger.ERROR)
+            self._shutdown()
+            self.workers = 0
+
+    async def close(self):
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.get_running_loop().run_in_executor(None, lambda: executor.shutdown(wait=True, cancel_futures=True))
+
+    def _shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def should_offload(self, size: int) -> bool:
+        return self.enabled and size > self.inline_bytes
+
+    async def extract(self, raw: bytes, charset: Optional[str], max_chars: int) -> str:
+        """워커 프로세스에서 텍스트를 추출합니다. 풀을 쓸 수 없으면 기본 스레드 풀에서 처리합니다."""
+        loop = asyncio.get_running_loop()
+        if self._executor is None and self.enabled:
+            await self.start()
+        if self._executor is not None:
+            try:
+                text = await loop.run_in_executor(self._executor, extract_text, raw, charset, max_chars)
+                self.stats["pooled"] += 1
+                self.stats["pooled_bytes"] += len(raw)
+                return text
+            except BrokenProcessPool as e:
+                # 워커가 비정상 종료되면 풀을 버리고 다음 요청에서 다시 만듭니다.
+                logger.log(f"HTML 추출 프로세스 풀 손상, 다시 시작합니다: {e}", logger.ERROR)
+                self._shutdown()
+                self.stats["restarts"] += 1
+        self.stats["fallback"] += 1
+        return await loop.run_in_executor(None, extract_text, raw, charset, max_chars)
+
+    def record_inline(self, size: int):
+        self.stats["inline"] += 1
+        self.stats["inline_bytes"] += size
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "workers": self.workers if self._executor is not None else 0}
+
+
+extraction_pool = ExtractionPool(
+    workers=env.EXTRACT_WORKERS,
+    inline_bytes=env.EXTRACT_INLINE_BYTES,
+)
+
+
+if __name__ == "__main__":
+    import glob
+    import os
+    import sys
+    import time
+
+    async def _loop_lag(stop: asyncio.Event) -> float:
+        """추출 중 이벤트 루프가 얼마나 오래 막혔는지 측정합니다."""
+        worst = 0.0
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            worst = max(worst, time.perf_counter() - started - 0.005)
+        return worst
+
+    async def _run(pages, workers: int):
+        pool = ExtractionPool(workers=workers, inline_bytes=0)
+        await pool.start()
+        stop = asyncio.Event()
+        lag = asyncio.create_task(_loop_lag(stop))
+        started = time.perf_counter()
+        if workers:
+            await asyncio.gather(*(pool.extract(raw, None, 20000) for raw in pages))
+        else:
+            for raw in pages:
+                extract_text(raw, None, 20000)
+                await asyncio.sleep(0)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        worst_lag = await lag
+        await pool.close()
+        return elapsed, worst_lag
+
+    async def _bench():
+        corpus = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bench', 'html')
+        copies = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+        pages = []
+        for path in sorted(glob.glob(os.path.join(corpus, '*.html'))):
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+        pages *= copies
+        total = sum(len(raw) for raw in pages)
+        print(f"페이지 {len(pages)}개, {total / 1024 / 1024:.1f}MB, CPU {os.cpu_count()}개")
+        for workers in (0, 1, 2, 4, 8):
+            elapsed, worst_lag = await _run(pages, workers)
+            name = "inline" if workers == 0 else f"{workers} workers"
+            print(f"{name:>10}: {elapsed:.2f}s, {len(pages) / elapsed:.0f} pages/s, {total / elapsed / 1024 / 1024:.1f}MB/s, 최대 루프 지연 {worst_lag * 1000:.0f}ms")
+
+    asyncio.run(_bench())
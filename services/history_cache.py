@@ -0,0 +1,176 @@
+import asyncio
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+import discord
+from core.config import env
+from core.logger import logger
+
+
+class MessageRecord:
+    """대화 기록 조립에 필요한 필드만 담은 메시지 요약입니다."""
+    __slots__ = ("id", "author_id", "author_name", "is_bot", "content", "has_attachments", "is_default")
+
+    def __init__(self, id, author_id, author_name, is_bot, content, has_attachments, is_default):
+        self.id = id
+        self.author_id = author_id
+        self.author_name = author_name
+        self.is_bot = is_bot
+        self.content = content
+        self.has_attachments = has_attachments
+        self.is_default = is_default
+
+    @classmethod
+    def from_message(cls, message: discord.Message) -> "MessageRecord":
+        author = message.author
+        return cls(
+            id=message.id,
+            author_id=author.id,
+            author_name=getattr(author, "nick", None) or author.name,
+            is_bot=author.bot,
+            content=message.content,
+            has_attachments=bool(message.attachments),
+            is_default=message.type == discord.MessageType.default,
+        )
+
+
+class HistoryCache:
+    """
+    채널별 최근 메시지를 고정 크기 deque로 유지합니다.
+    게이트웨이 이벤트(on_message/edit/delete)로 갱신하고,
+    처음 읽을 때나 연결이 끊겼던 뒤에만 REST로 다시 채웁니다.
+    """
+    def __init__(self, size: int = 50, max_channels: int = 500):
+        self.size = size
+        self.max_channels = max_channels
+        self._channels: "OrderedDict[int, Deque[MessageRecord]]" = OrderedDict()
+        self._complete = set()   # 채널 전체 기록이 size보다 적어 모두 보유한 채널
+        self._backfilling: Dict[int, List[MessageRecord]] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self.stats = {"hits": 0, "misses": 0, "backfills": 0, "events": 0}
+
+    # ---- 게이트웨이 이벤트 ----
+
+    def record(self, message: discord.Message):
+        channel_id = message.channel.id
+        record = MessageRecord.from_message(message)
+        if channel_id in self._backfilling:
+            self._backfilling[channel_id].append(record)
+            return
+        records = self._channels.get(channel_id)
+        if records is None:
+            # 아직 읽은 적 없는 채널은 첫 조회 때 REST로 채움
+            return
+        self.stats["events"] += 1
+        if len(records) == records.maxlen:
+            # 오래된 기록이 밀려나므로 더 이상 채널 전체를 보유한 상태가 아님
+            self._complete.discard(channel_id)
+        if records and records[-1].id > record.id:
+            self._insert_sorted(records, record)
+        else:
+            records.append(record)
+
+    def update(self, message: discord.Message):
+        records = self._channels.get(message.channel.id)
+        if not records:
+            return
+        self.stats["events"] += 1
+        for index in range(len(records) - 1, -1, -1):
+            if records[index].id == message.id:
+                records[index] = MessageRecord.from_message(message)
+                return
+
+    def remove(self, channel_id: int, message_id: int):
+        records = self._channels.get(channel_id)
+        if not records:
+            return
+        self.stats["events"] += 1
+        for record in records:
+            if record.id == message_id:
+                # 남은 개수가 요청보다 적어지면 get_recent에서 다시 채움
+                records.remove(record)
+                return
+
+    def invalidate(self, channel_id: int):
+        self._channels.pop(channel_id, None)
+        self._complete.discard(channel_id)
+
+    def invalidate_all(self):
+        """연결이 끊겨 이벤트를 놓쳤을 수 있을 때 모든 채널을 다시 채우도록 합니다."""
+        self._channels.clear()
+        self._complete.clear()
+
+    @staticmethod
+    def _insert_sorted(records: Deque[MessageRecord], record: MessageRecord):
+        for index, existing in enumerate(records):
+            if existing.id == record.id:
+                return
+            if existing.id > record.id:
+                if len(records) == records.maxlen:
+                    if index == 0:
+                        # 보유 범위보다 오래된 메시지
+                        return
+                    records.popleft()
+                    index -= 1
+                records.insert(index, record)
+                return
+        records.append(record)
+
+    # ---- 조회 ----
+
+    async def get_recent(self, channel, limit: int, exclude_id: Optional[int] = None) -> List[MessageRecord]:
+        """
+        최근 limit개 메시지 중 exclude_id를 제외한 기록을 오래된 순으로 반환합니다.
+        channel.history(limit=limit)를 돌면서 현재 메시지를 건너뛰는 것과 같은 결과입니다.
+        """
+        limit = max(0, min(limit, self.size))
+        records = self._channels.get(channel.id)
+        if records is not None and (len(records) >= limit or channel.id in self._complete):
+            self.stats["hits"] += 1
+            self._channels.move_to_end(channel.id)
+        else:
+            self.stats["misses"] += 1
+            records = await self._backfill(channel, limit)
+
+        recent = list(records)[-limit:] if limit else []
+        return [r for r in recent if r.id != exclude_id]
+
+    async def _backfill(self, channel, limit: int) -> Deque[MessageRecord]:
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            # 대기하는 동안 다른 요청이 이미 채웠으면 그대로 사용
+            records = self._channels.get(channel.id)
+            if records is not None and (len(records) >= limit or channel.id in self._complete):
+                return records
+
+            self._backfilling[channel.id] = []
+            try:
+                fetched = [MessageRecord.from_message(msg) async for msg in channel.history(limit=self.size)]
+            except Exception as e:
+                logger.log(f"메시지 기록 가져오기 실패 ({channel.id}): {e}", logger.WARNING)
+                self._backfilling.pop(channel.id, None)
+                return deque(maxlen=self.size)
+
+            pending = self._backfilling.pop(channel.id, [])
+            by_id = {r.id: r for r in reversed(fetched)}
+            for record in pending:
+                by_id[record.id] = record
+            records = deque(sorted(by_id.values(), key=lambda r: r.id), maxlen=self.size)
+
+            self._channels[channel.id] = records
+            if len(fetched) < self.size:
+                self._complete.add(channel.id)
+            while len(self._channels) > self.max_channels:
+                old_id, _ = self._channels.popitem(last=False)
+                self._complete.discard(old_id)
+            self.stats["backfills"] += 1
+            return records
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / total if total else 0.0
+        stats["channels"] = len(self._channels)
+        return stats
+
+
+history_cache = HistoryCache(size=env.HISTORY_CACHE_SIZE)
@@ -0,0 +1,126 @@
+import asyncio
+from collections import Counter
+from typing import Optional
+import aiohttp
+from core.config import env
+from core.logger import logger
+
+try:
+    import brotli  # noqa: F401  aiohttp이 설치되어 있으면 br 응답을 자동으로 풀어 줍니다
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+class HttpClient:
+    """
+    봇 전체가 함께 쓰는 aiohttp 세션입니다.
+    검색, 크롤링, TTS 요청이 같은 커넥션 풀을 쓰므로 keep-alive 연결과 DNS 캐시를 재사용해
+    매 요청마다 DNS 조회와 TCP/TLS 핸드셰이크를 다시 하지 않습니다.
+    setup_hook에서 start(), 봇 종료 시 close()를 호출합니다. 시작 전에 session을 쓰면 그 자리에서 엽니다.
+    """
+    def __init__(
+        self,
+        limit: int,
+        limit_per_host: int,
+        dns_ttl: int,
+        keepalive_timeout: float,
+        total_timeout: float,
+        connect_timeout: float,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.stats = Counter()
+
+    async def start(self):
+        if self._session is not None and not self._session.closed:
+            return
+        self._open()
+        logger.log(
+            f"HTTP 클라이언트 시작 (전체 {self.limit}, 호스트당 {self.limit_per_host}, DNS 캐시 {self.dns_ttl}초)",
+            logger.INFO,
+        )
+
+    async def close(self):
+        if self._session is None or self._session.closed:
+            return
+        await self._session.close()
+        # 커넥터가 SSL 연결을 마저 닫을 시간을 줍니다 (aiohttp 권장)
+        await asyncio.sleep(0.25)
+        self._session = None
+        logger.log(f"HTTP 클라이언트 종료: {self.get_stats()}", logger.INFO)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            # 봇 수명 주기 밖(스크립트 등)에서 호출된 경우를 위한 지연 생성
+            self._open()
+        return self._session
+
+    def _open(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={"Accept-Encoding": ACCEPT_ENCODING},
+            trace_configs=[self._trace_config()],
+        )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.stats["requests"] += 1
+
+        async def on_request_exception(session, ctx, params):
+            self.stats["errors"] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self.stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.stats["connections_reused"] += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self.stats["dns_cache_hits"] += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self.stats["dns_cache_misses"] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    def get_stats(self) -> dict:
+        created = self.stats.get("connections_created", 0)
+        reused = self.stats.get("connections_reused", 0)
+        total = created + reused
+        return {
+            **self.stats,
+            "reuse_ratio": reused / total if total else 0.0,
+            "open": self._session is not None and not self._session.closed,
+        }
+
+
+http_client = HttpClient(
+    limit=env.HTTP_POOL_SIZE,
+    limit_per_host=env.HTTP_POOL_PER_HOST,
+    dns_ttl=env.HTTP_DNS_CACHE_TTL,
+    keepalive_timeout=env.HTTP_KEEPALIVE_SECONDS,
+    total_timeout=30,
+    connect_timeout=10,
+)
@@ -1,32 +1,299 @@
 import os
 import asyncio
-import base64
-import json
-import requests
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List
+from urllib.parse import parse_qs, urlparse
 import discord
-from discord import FFmpegPCMAudio
+from discord import FFmpegOpusAudio, FFmpegPCMAudio
 import yt_dlp as youtube_dl
-from googleapiclient.discovery import build
 from core.logger import logger
 from core.config import env
 from mcp_server.context import global_context
+from services.audio_cache import audio_cache, parse_video_id
+from services.youtube_search import SEARCH_COST, youtube_search_cache
+from services.tts_service import tts_service
+
+# yt-dlp 다운로드/변환 전용 워커 풀 (재생 중 다음 곡 미리 받기에 사용)
+_ytdl_executor = ThreadPoolExecutor(max_workers=env.MUSIC_PREFETCH_WORKERS, thread_name_prefix="ytdl")
+# 곡 정보 조회 전용 워커 풀 (대기열에 여러 곡을 한 번에 넣을 때 동시에 조회)
+_resolve_executor = ThreadPoolExecutor(max_workers=env.MUSIC_RESOLVE_CONCURRENCY, thread_name_prefix="ytdl-resolve")
+# 오디오 캐시 채우기 전용 워커 (재생/미리 받기를 방해하지 않도록 하나만 사용)
+_cache_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-cache")
+
+# 스트리밍 재생 시 연결이 끊기면 다시 붙도록 하는 FFmpeg 입력 옵션
+FFMPEG_STREAM_BEFORE_OPTIONS = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin"
+# 스트림 주소에 만료 시각이 없을 때 유효하다고 보는 시간 (초)
+STREAM_URL_TTL = 5 * 3600
+# 재생이 끝나기 전에 스트림 주소가 만료되지 않도록 두는 여유 (초)
+STREAM_EXPIRY_MARGIN = 300
+_STREAM_FORMAT = 'bestaudio[acodec=opus]/bestaudio/best'
+
+
+def format_duration(seconds) -> str:
+    if not seconds:
+        return "?:??"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def _stream_expiry(stream_url: str) -> float:
+    """유튜브 스트림 주소의 expire 값을 읽습니다. 없으면 STREAM_URL_TTL 뒤로 봅니다."""
+    try:
+        return float(parse_qs(urlparse(stream_url).query)["expire"][0])
+    except (KeyError, IndexError, ValueError):
+        return time.time() + STREAM_URL_TTL
+
+
+def _is_playlist_url(url: str) -> bool:
+    """재생목록 주소인지 확인합니다. 재생목록 안의 한 곡 주소(watch?v=...&list=...)는 그 곡만 재생합니다."""
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    if "list" not in query:
+        return False
+    return parsed.path.rstrip("/").endswith("/playlist") or "v" not in query
+
+
+class Track:
+    """대기열의 곡 하나. 곡 정보와 조회해 둔 스트림 주소(만료 시각 포함)를 함께 보관합니다."""
+    __slots__ = ("url", "video_id", "title", "duration", "requester", "stream_url", "codec", "bitrate", "expires_at")
+
+    def __init__(self, url, video_id=None, title=None, duration=None, requester=None):
+        self.url = url
+        self.video_id = video_id or parse_video_id(url)
+        self.title = title
+        self.duration = duration
+        self.requester = requester
+        self.stream_url = None
+        self.codec = None
+        self.bitrate = None
+        self.expires_at = 0.0
+
+    @property
+    def display_title(self) -> str:
+        return self.title or self.url
+
+    @property
+    def display_duration(self) -> str:
+        return format_duration(self.duration)
+
+    def stream_valid(self) -> bool:
+        # 곡을 끝까지 재생할 동안 주소가 살아 있어야 함
+        if not self.stream_url:
+            return False
+        return time.time() + (self.duration or 0) + STREAM_EXPIRY_MARGIN < self.expires_at
+
+    def update_from_info(self, info: dict):
+        """yt-dlp extract_info 결과로 곡 정보와 스트림 주소를 채웁니다."""
+        self.video_id = info.get('id') or self.video_id
+        self.title = info.get('title') or self.title
+        self.duration = info.get('duration') or self.duration
+        if info.get('url'):
+            self.stream_url = info['url']
+            self.codec = info.get('acodec')
+            self.bitrate = info.get('abr')
+            self.expires_at = _stream_expiry(self.stream_url)
+
+
+class PreparedAudio:
+    """
+    재생 준비가 끝난 곡. 스트리밍이면 url, 디스크 파일이면 path가 채워집니다.
+    temporary는 재생 후 지워야 하는 임시 파일, cached는 오디오 캐시의 Opus 파일입니다.
+    """
+    __slots__ = ("url", "path", "codec", "bitrate", "video_id", "temporary", "cached")
+
+    def __init__(self, url=None, path=None, codec=None, bitrate=None, video_id=None, temporary=False, cached=False):
+        self.url = url
+        self.path = path
+        self.codec = codec
+        self.bitrate = bitrate
+        self.video_id = video_id
+        self.temporary = temporary
+        self.cached = cached
+
+
+def _resolve_track(track):
+    """다운로드 없이 곡 정보와 가장 좋은 오디오 스트림 주소를 얻어 track에 채웁니다. Opus 스트림을 우선합니다."""
+    ydl_opts = {
+        'format': _STREAM_FORMAT,
+        'noplaylist': 'True',
+        'quiet': True
+    }
+    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(track.url, download=False)
+    track.update_from_info(info)
+    return track
+
+
+def _expand_playlist(playlist_url, limit):
+    """재생목록의 곡 ID, 제목, 길이를 한 번의 요청으로 가져옵니다. 곡별 페이지는 열지 않습니다."""
+    ydl_opts = {
+        'extract_flat': 'in_playlist',
+        'playlistend': limit,
+        'quiet': True
+    }
+    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(playlist_url, download=False)
+    tracks = []
+    for entry in info.get('entries') or []:
+        video_id = entry.get('id')
+        # 비공개/삭제된 곡은 길이가 없으므로 건너뜀
+        if not video_id or entry.get('duration') is None:
+            continue
+        tracks.append(Track(
+            f"https://www.youtube.com/watch?v={video_id}",
+            video_id=video_id,
+            title=entry.get('title'),
+            duration=entry.get('duration'),
+        ))
+    return info.get('title'), tracks
+
+
+def _download_opus(video_url):
+    """오디오 캐시에 넣을 Opus 파일을 받습니다. 원본이 Opus면 재인코딩 없이 컨테이너만 바꿉니다."""
+    ydl_opts = {
+        'format': _STREAM_FORMAT,
+        'noplaylist': 'True',
+        'outtmpl': f'downloads/{uuid.uuid4().hex}-%(id)s.%(ext)s',
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'opus',
+        }],
+        'quiet': True
+    }
+    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(video_url, download=True)
+        filename = ydl.prepare_filename(info)
+    return os.path.splitext(filename)[0] + ".opus"
+
+
+def _fill_audio_cache(video_url, video_id):
+    path = None
+    try:
+        path = _download_opus(video_url)
+        audio_cache.put(video_id, path)
+    except Exception as e:
+        logger.log(f"오디오 캐시 저장 실패: {video_url} - {e}", logger.WARNING)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def _build_youtube_client():
+    # googleapiclient 임포트와 discovery 문서 로드가 느려 처음 검색할 때 워커 스레드에서 만듭니다.
+    from googleapiclient.discovery import build
+    return build('youtube', 'v3', developerKey=env.GOOGLE_API_KEY, cache_discovery=False)
+
+
+def _is_quota_error(error) -> bool:
+    resp = getattr(error, 'resp', None)
+    if resp is None or getattr(resp, 'status', None) != 403:
+        return False
+    content = getattr(error, 'content', b'') or b''
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='ignore')
+    return 'quotaExceeded' in content or 'dailyLimitExceeded' in content
+
+
+def _ytsearch_video_id(query):
+    """yt-dlp의 ytsearch1: 검색으로 첫 번째 영상 ID를 얻습니다. API 할당량을 쓰지 않습니다."""
+    ydl_opts = {
+        'extract_flat': True,
+        'noplaylist': 'True',
+        'quiet': True
+    }
+    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(f"ytsearch1:{query}", download=False)
+    entries = info.get('entries') or []
+    return entries[0].get('id') if entries else None
+
+
+def _prepare_audio(track, cancel_event, mode):
+    """
+    워커 스레드에서 곡을 재생할 수 있게 준비합니다.
+    오디오 캐시에 있으면 네트워크 없이 바로 쓰고, 대기열에 넣을 때 얻은 스트림 주소가 살아 있으면 다시 조회하지 않습니다.
+    스트리밍 주소를 얻지 못하면 디스크로 받습니다.
+    """
+    cached = audio_cache.get(track.video_id)
+    if cached:
+        return PreparedAudio(path=cached, codec="opus", video_id=track.video_id, cached=True)
+    if mode == "stream":
+        try:
+            if not track.stream_valid():
+                _resolve_track(track)
+            return PreparedAudio(url=track.stream_url, codec=track.codec, bitrate=track.bitrate, video_id=track.video_id)
+        except Exception as e:
+            if cancel_event.is_set():
+                raise
+            logger.log(f"스트림 주소를 얻지 못해 다운로드로 재생합니다: {track.url} - {e}", logger.WARNING)
+    return PreparedAudio(path=_download_audio(track.url, cancel_event), video_id=track.video_id, temporary=True)
+
+
+def _download_audio(video_url, cancel_event):
+    """
+    워커 스레드에서 곡을 받아 mp3로 변환하고 파일 경로를 반환합니다.
+    YoutubeDL 객체는 이 함수 안에서만 만들고 쓰며, cancel_event가 설정되면 진행 중인 다운로드를 중단합니다.
+    """
+    def check_cancel(_):
+        if cancel_event.is_set():
+            raise youtube_dl.utils.DownloadCancelled()
+
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'noplaylist': 'True',
+        # 같은 곡이 대기열에 여러 번 있어도 파일이 겹치지 않도록 요청마다 고유한 이름 사용
+        'outtmpl': f'downloads/{uuid.uuid4().hex}-%(id)s.%(ext)s',
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '192',
+        }],
+        'progress_hooks': [check_cancel],
+        'quiet': True
+    }
+    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(video_url, download=True)
+        filename = ydl.prepare_filename(info)
+    base, _ = os.path.splitext(filename)
+    mp3_filename = base + ".mp3"
+    if not os.path.exists(mp3_filename) and os.path.exists(filename):
+        mp3_filename = filename
+    return mp3_filename
+
 
 class MusicQueue:
     def __init__(self):
-        self.queue = []
+        self.queue = deque()
         self.playing_file_path = ""
+        # 지금 재생 중인 곡 (Track)
+        self.current = None
+        # Track -> (다운로드 future, 취소 이벤트). 같은 곡이 여러 번 있어도 항목별로 구분
+        self.prefetched = {}
+        # 지금 재생하려고 받는 중인 곡 (future, 취소 이벤트)
+        self.loading = None
+
+    def add(self, track):
+        self.queue.append(track)
 
-    def add(self, item):
-        self.queue.append(item)
+    def extend(self, tracks):
+        self.queue.extend(tracks)
 
     def pop(self):
         if not self.is_empty():
-            return self.queue.pop(0)
+            return self.queue.popleft()
         return None
 
+    def push_front(self, track):
+        self.queue.appendleft(track)
+
     def remove_at(self, index):
         if 0 <= index < len(self.queue):
-            self.queue.pop(index)
+            del self.queue[index]
             return True
         return False
 
@@ -34,7 +301,16 @@ class MusicQueue:
         return len(self.queue) == 0
 
     def get_list(self):
-        return self.queue
+        return list(self.queue)
+
+    def peek(self, count):
+        return list(islice(self.queue, count))
+
+    def total_duration(self):
+        return sum(track.duration or 0 for track in self.queue)
+
+    def clear(self):
+        self.queue.clear()
     
     def set_playing_file(self, filepath):
         self.playing_file_path = filepath
@@ -50,18 +326,36 @@ class MusicService:
             cls._instance = super(MusicService, cls).__new__(cls)
             cls._instance.queues = {} # guild_id -> MusicQueue
             cls._instance.youtube = None
-            cls._instance._init_youtube()
+            cls._instance._youtube_init_done = False
+            cls._instance._youtube_lock = None
+            cls._instance._resolve_semaphore = None
+            cls._instance._cache_filling = set()  # 오디오 캐시에 받는 중인 영상 ID
+            # 곡 사이에 끼어든 TTS를 다 읽으면 대기열을 이어서 재생
+            tts_service.add_idle_listener(cls._instance.play_next)
+            # 다음 곡을 준비하는 동안에는 TTS가 재생을 시작하지 않도록 함
+            tts_service.add_hold_check(lambda guild_id: cls._instance.get_queue(guild_id).loading is not None)
         return cls._instance
 
-    def _init_youtube(self):
-        if env.GOOGLE_API_KEY:
+    async def _get_youtube(self):
+        """YouTube Data API 클라이언트를 처음 필요할 때 한 번만 만듭니다. 쓸 수 없으면 None."""
+        if self._youtube_init_done:
+            return self.youtube
+        if self._youtube_lock is None:
+            self._youtube_lock = asyncio.Lock()
+        async with self._youtube_lock:
+            if self._youtube_init_done:
+                return self.youtube
+            self._youtube_init_done = True
+            if not env.GOOGLE_API_KEY:
+                logger.log("GOOGLE_API_KEY가 설정되지 않아 yt-dlp 검색만 사용합니다.", logger.WARNING)
+                return None
             try:
-                self.youtube = build('youtube', 'v3', developerKey=env.GOOGLE_API_KEY)
+                loop = asyncio.get_running_loop()
+                self.youtube = await loop.run_in_executor(None, _build_youtube_client)
                 logger.log("YouTube Data API 클라이언트 초기화 완료", logger.INFO)
             except Exception as e:
-                logger.log(f"YouTube 클라이언트 초기화 실패: {e}", logger.ERROR)
-        else:
-            logger.log("GOOGLE_API_KEY가 설정되지 않아 YouTube 검색을 사용할 수 없습니다.", logger.WARNING)
+                logger.log(f"YouTube 클라이언트 초기화 실패, yt-dlp 검색만 사용합니다: {e}", logger.ERROR)
+        return self.youtube
 
     def get_queue(self, guild_id):
         if guild_id not in self.queues:
@@ -79,6 +373,8 @@ class MusicService:
         return voice_client
 
     async def leave_voice(self, guild):
+        self._cancel_all_prefetch(self.get_queue(guild.id))
+        tts_service.cancel(guild.id)
         if guild.voice_client:
             await guild.voice_client.disconnect()
             return True
@@ -87,35 +383,147 @@ class MusicService:
     async def search_video(self, query):
         if query.startswith("http"):
             return query
-        
-        if not self.youtube:
-            logger.log("YouTube 클라이언트가 초기화되지 않았습니다.", logger.ERROR)
-            return None
 
-        try:
-            # YouTube Data API v3 검색
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.youtube.search().list(
-                    q=query,
-                    part='id,snippet',
-                    maxResults=1,
-                    type='video'
-                ).execute()
-            )
-
-            if response.get('items'):
-                video_id = response['items'][0]['id']['videoId']
-                return f"https://www.youtube.com/watch?v={video_id}"
-                
-        except Exception as e:
-            logger.log(f"유튜브 검색 실패: {e}", logger.ERROR)
+        # 같은 검색어는 API 할당량을 쓰지 않고 바로 응답
+        video_id = youtube_search_cache.get(query)
+        if video_id:
+            return f"https://www.youtube.com/watch?v={video_id}"
+
+        loop = asyncio.get_running_loop()
+        youtube = await self._get_youtube() if youtube_search_cache.can_spend(SEARCH_COST) else None
+        if youtube is not None:
+            try:
+                # YouTube Data API v3 검색 (호출당 할당량 100)
+                response = await loop.run_in_executor(
+                    None,
+                    lambda: youtube.search().list(
+                        q=query,
+                        part='id',
+                        maxResults=1,
+                        type='video'
+                    ).execute()
+                )
+                youtube_search_cache.charge(SEARCH_COST)
+                if response.get('items'):
+                    video_id = response['items'][0]['id']['videoId']
+            except Exception as e:
+                if _is_quota_error(e):
+                    youtube_search_cache.exhaust()
+                    logger.log("YouTube API 할당량 소진, 오늘은 yt-dlp 검색을 사용합니다.", logger.WARNING)
+                else:
+                    logger.log(f"유튜브 검색 실패: {e}", logger.ERROR)
+
+        if not video_id:
+            # 할당량이 없거나 API 검색이 실패하면 yt-dlp 검색으로 대체
+            try:
+                video_id = await loop.run_in_executor(_ytdl_executor, _ytsearch_video_id, query)
+                youtube_search_cache.stats["fallback_searches"] += 1
+            except Exception as e:
+                logger.log(f"yt-dlp 검색 실패: {e}", logger.ERROR)
+
+        if video_id:
+            youtube_search_cache.set(query, video_id)
+            return f"https://www.youtube.com/watch?v={video_id}"
         return None
 
-    async def add_to_queue(self, guild_id, url):
+    async def resolve_tracks(self, query, requester=None) -> List[Track]:
+        """
+        검색어나 주소 하나를 대기열에 넣을 곡 목록으로 바꿉니다.
+        재생목록 주소는 한 번에 펼치고, 한 곡이면 검색 후 곡 정보와 스트림 주소를 함께 조회합니다.
+        찾지 못하면 빈 목록을 반환합니다.
+        """
+        if self._resolve_semaphore is None:
+            self._resolve_semaphore = asyncio.Semaphore(env.MUSIC_RESOLVE_CONCURRENCY)
+        loop = asyncio.get_running_loop()
+        async with self._resolve_semaphore:
+            if query.startswith("http") and _is_playlist_url(query):
+                try:
+                    title, tracks = await loop.run_in_executor(
+                        _resolve_executor, _expand_playlist, query, env.MUSIC_PLAYLIST_LIMIT
+                    )
+                except Exception as e:
+                    logger.log(f"재생목록 조회 실패: {query} - {e}", logger.ERROR)
+                    return []
+                for track in tracks:
+                    track.requester = requester
+                logger.log(f"재생목록 '{title}'에서 {len(tracks)}곡을 가져왔습니다.", logger.INFO)
+                return tracks
+
+            video_url = await self.search_video(query)
+            if not video_url:
+                return []
+            track = Track(video_url, requester=requester)
+            try:
+                await loop.run_in_executor(_resolve_executor, _resolve_track, track)
+            except Exception as e:
+                # 곡 정보 없이도 재생 단계에서 다시 시도할 수 있으므로 대기열에는 넣음
+                logger.log(f"곡 정보 조회 실패: {video_url} - {e}", logger.WARNING)
+            return [track]
+
+    async def enqueue(self, guild_id, queries, requester=None) -> List[Track]:
+        """여러 검색어/주소를 동시에(MUSIC_RESOLVE_CONCURRENCY개까지) 조회해 요청 순서대로 대기열에 넣습니다."""
+        results = await asyncio.gather(
+            *(self.resolve_tracks(query, requester) for query in queries),
+            return_exceptions=True,
+        )
+        tracks = []
+        for query, result in zip(queries, results):
+            if isinstance(result, BaseException):
+                logger.log(f"곡 조회 실패: {query} - {result}", logger.ERROR)
+                continue
+            tracks.extend(result)
+        if tracks:
+            self.get_queue(guild_id).extend(tracks)
+            self._schedule_prefetch(guild_id)
+        return tracks
+
+    async def add_to_queue(self, guild_id, track, requester=None):
+        if not isinstance(track, Track):
+            track = Track(track, requester=requester)
+        queue = self.get_queue(guild_id)
+        queue.add(track)
+        self._schedule_prefetch(guild_id)
+        return track
+
+    def _start_fetch(self, queue, track):
+        cancel_event = threading.Event()
+        future = asyncio.get_running_loop().run_in_executor(
+            _ytdl_executor, _prepare_audio, track, cancel_event, env.MUSIC_PLAYBACK_MODE
+        )
+        queue.prefetched[track] = (future, cancel_event)
+        return future
+
+    def _cancel_fetch(self, queue, track):
+        self._cancel_entry(queue.prefetched.pop(track, None))
+
+    def _cancel_entry(self, entry):
+        if entry is None:
+            return
+        future, cancel_event = entry
+        cancel_event.set()
+
+        # 이미 받은 파일이나 중단 직전에 끝난 파일은 정리
+        def cleanup(f):
+            if not f.cancelled() and f.exception() is None and f.result().temporary:
+                self._safe_remove(f.result().path)
+        future.add_done_callback(cleanup)
+
+    def _cancel_all_prefetch(self, queue):
+        for track in list(queue.prefetched):
+            self._cancel_fetch(queue, track)
+        if queue.loading is not None:
+            queue.loading[1].set()
+
+    def _schedule_prefetch(self, guild_id):
+        """대기열 앞쪽 곡들을 미리 받고, 대기열에서 빠지거나 멀어진 곡의 미리 받기는 취소합니다."""
         queue = self.get_queue(guild_id)
-        queue.add(url)
+        upcoming = queue.peek(env.MUSIC_PREFETCH_AHEAD)
+        for track in list(queue.prefetched):
+            if track not in upcoming:
+                self._cancel_fetch(queue, track)
+        for track in upcoming:
+            if track not in queue.prefetched:
+                self._start_fetch(queue, track)
 
     async def play_next(self, guild):
         queue = self.get_queue(guild.id)
@@ -126,57 +534,142 @@ class MusicService:
         if not voice_client or not voice_client.is_connected():
             return
 
-        if voice_client.is_playing():
+        # 재생 중이거나 다음 곡을 받는 중이면 그 곡이 끝난 뒤 이어서 재생됨
+        if voice_client.is_playing() or queue.loading is not None:
             return
-
-        video_url = queue.pop()
-        if not video_url:
+        # 읽을 TTS가 남아 있으면 다 읽은 뒤 tts_service가 다시 호출함
+        if tts_service.is_busy(guild.id):
             return
 
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'noplaylist': 'True',
-            'outtmpl': 'downloads/%(title)s.%(ext)s',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-            'quiet': True
-        }
+        track = queue.pop()
+        if not track:
+            return
 
         try:
-            loop = asyncio.get_event_loop()
-            with youtube_dl.YoutubeDL(ydl_opts) as ydl:
-                info = await loop.run_in_executor(None, lambda: ydl.extract_info(video_url, download=True))
-                filename = ydl.prepare_filename(info)
-                base, _ = os.path.splitext(filename)
-                mp3_filename = base + ".mp3"
-                if not os.path.exists(mp3_filename) and os.path.exists(filename):
-                       mp3_filename = filename
-
-            queue.set_playing_file(mp3_filename)
+            # 미리 받아 둔 곡이면 바로 재생하고, 아니면 지금 받음
+            entry = queue.prefetched.pop(track, None)
+            if entry is None:
+                self._start_fetch(queue, track)
+                entry = queue.prefetched.pop(track)
+            queue.loading = entry
+            # 재생하는 동안 다음 곡들을 미리 받음
+            self._schedule_prefetch(guild.id)
+            try:
+                prepared = await entry[0]
+                if prepared.url and not track.stream_valid():
+                    # 미리 받은 뒤 오래 기다려 스트림 주소가 만료된 경우 다시 조회
+                    prepared = await asyncio.get_running_loop().run_in_executor(
+                        _ytdl_executor, _prepare_audio, track, entry[1], env.MUSIC_PLAYBACK_MODE
+                    )
+                # 받는 동안 정지되었거나 연결이 끊긴 경우
+                if entry[1].is_set() or not voice_client.is_connected():
+                    if prepared.temporary:
+                        self._safe_remove(prepared.path)
+                    return
+                source, prepared = await self._create_source(track, prepared)
+            finally:
+                queue.loading = None
+
+            # 준비하는 동안 다른 소리가 재생을 시작했거나 TTS가 기다리고 있으면
+            # 곡을 버리지 않고 대기열 맨 앞에 되돌림 (TTS가 끝나면 idle 리스너가 다시 재생)
+            if voice_client.is_playing() or tts_service.is_busy(guild.id):
+                source.cleanup()
+                self._requeue(queue, track, prepared, entry[1])
+                return
+
+            queue.current = track
+            queue.set_playing_file(prepared.path or prepared.url)
+            if not prepared.cached:
+                self._schedule_cache_fill(track.url, prepared.video_id)
             
             client = global_context.get_client()
             
             def after_playing(e):
                 if e:
                     logger.log(f"재생 오류: {e}", logger.ERROR)
+                queue.current = None
                 future = asyncio.run_coroutine_threadsafe(self.play_next(guild), client.loop)
                 try:
                     future.result()
                 except Exception as exc:
                     logger.log(f"다음 곡 재생 실패: {exc}", logger.ERROR)
                 
-                self._safe_remove(mp3_filename)
-
-            voice_client.play(FFmpegPCMAudio(executable="ffmpeg", source=mp3_filename), after=after_playing)
+                if prepared.temporary:
+                    self._safe_remove(prepared.path)
+                if prepared.cached:
+                    audio_cache.unpin(prepared.video_id)
+
+            if prepared.cached:
+                # 재생하는 동안 캐시 정리로 파일이 지워지지 않도록 고정
+                audio_cache.pin(prepared.video_id)
+            try:
+                voice_client.play(source, after=after_playing)
+            except Exception:
+                if prepared.cached:
+                    audio_cache.unpin(prepared.video_id)
+                raise
             
         except Exception as e:
             logger.log(f"음악 재생 실패: {str(e)}", logger.ERROR)
             await self.play_next(guild)
 
+    def _requeue(self, queue, track, prepared, cancel_event):
+        """준비가 끝난 곡을 대기열 맨 앞에 되돌리고, 준비 결과는 미리 받은 곡으로 보관해 다시 받지 않도록 합니다."""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(prepared)
+        queue.push_front(track)
+        queue.prefetched[track] = (future, cancel_event)
+
+    async def _create_source(self, track, prepared):
+        """
+        준비된 곡으로 재생 소스를 만듭니다.
+        스트림이 Opus면 재인코딩 없이 그대로 보내고, 코덱을 모르면 ffprobe로 확인합니다.
+        스트림 소스를 만들지 못하면 디스크로 받아 재생합니다.
+        """
+        if prepared.cached:
+            # 캐시 파일은 이미 Ogg Opus이므로 디코딩/인코딩 없이 그대로 보냄
+            return FFmpegOpusAudio(prepared.path, codec="copy"), prepared
+        if prepared.path:
+            return FFmpegPCMAudio(executable="ffmpeg", source=prepared.path), prepared
+        try:
+            if prepared.codec == "opus":
+                source = FFmpegOpusAudio(
+                    prepared.url,
+                    bitrate=int(prepared.bitrate or 128),
+                    codec="copy",
+                    before_options=FFMPEG_STREAM_BEFORE_OPTIONS,
+                    options="-vn",
+                )
+            else:
+                source = await FFmpegOpusAudio.from_probe(
+                    prepared.url,
+                    before_options=FFMPEG_STREAM_BEFORE_OPTIONS,
+                    options="-vn",
+                )
+            return source, prepared
+        except Exception as e:
+            logger.log(f"스트림 재생 준비 실패, 다운로드로 재생합니다: {e}", logger.WARNING)
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(_ytdl_executor, _download_audio, track.url, threading.Event())
+        prepared = PreparedAudio(path=path, video_id=prepared.video_id, temporary=True)
+        return FFmpegPCMAudio(executable="ffmpeg", source=path), prepared
+
+    def _schedule_cache_fill(self, video_url, video_id):
+        """캐시에 없는 곡을 백그라운드에서 Opus로 받아 다음 재생부터 바로 쓰도록 합니다."""
+        if not audio_cache.enabled or not video_id or video_id in audio_cache or video_id in self._cache_filling:
+            return
+        # 다시 요청된 곡만 받음 (처음 듣는 곡은 스트리밍으로 충분)
+        if not audio_cache.admit(video_id):
+            return
+        self._cache_filling.add(video_id)
+        future = asyncio.get_running_loop().run_in_executor(_cache_executor, _fill_audio_cache, video_url, video_id)
+        future.add_done_callback(lambda _: self._cache_filling.discard(video_id))
+
     async def stop_music(self, guild):
+        # 대기열과 미리 받기를 비운 뒤 멈춰야 다음 곡으로 넘어가지 않음
+        queue = self.get_queue(guild.id)
+        queue.clear()
+        self._cancel_all_prefetch(queue)
         if guild.voice_client and guild.voice_client.is_playing():
             guild.voice_client.stop()
             return True
@@ -189,57 +682,8 @@ class MusicService:
         return False
 
     async def tts(self, guild, text):
-        # Google Cloud TTS REST API 사용 (API Key 인증)
-        api_key = env.GOOGLE_API_KEY
-        if not api_key:
-            logger.log("TTS 실패: GOOGLE_API_KEY가 설정되지 않았습니다.", logger.WARNING)
-            return
-            
-        voice_client = guild.voice_client
-        if not voice_client or not voice_client.is_connected():
-            return
-
-        if voice_client.is_playing():
-            return
-
-        url = f"https://texttospeech.googleapis.com/v1/text:synthesize?key={api_key}"
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "input": {"text": text},
-            "voice": {"languageCode": "ko-KR", "ssmlGender": "NEUTRAL"},
-            "audioConfig": {"audioEncoding": "MP3"}
-        }
-
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, 
-                lambda: requests.post(url, headers=headers, json=data)
-            )
-            
-            if response.status_code != 200:
-                logger.log(f"TTS API 오류 ({response.status_code}): {response.text}", logger.ERROR)
-                return
-
-            response_json = response.json()
-            audio_content = response_json.get("audioContent")
-            
-            if not audio_content:
-                logger.log("TTS 응답에 오디오 컨텐츠가 없습니다.", logger.ERROR)
-                return
-
-            audio_data = base64.b64decode(audio_content)
-            
-            filename = f"downloads/tts_{guild.id}_{int(loop.time())}.mp3"
-            with open(filename, "wb") as out:
-                out.write(audio_data)
-
-            voice_client.play(
-                FFmpegPCMAudio(filename),
-                after=lambda e: self._safe_remove(filename)
-            )
-        except Exception as e:
-            logger.log(f"TTS 오류: {e}", logger.ERROR)
+        # 문장 단위 합성/재생은 tts_service가 담당 (음악이 재생 중이면 곡이 끝난 뒤 읽음)
+        await tts_service.speak(guild, text)
 
     def _safe_remove(self, path):
         try:
@@ -1,18 +1,23 @@
+import asyncio
 import datetime
 import json
 import traceback
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import discord
 
 from core.config import env
 from core.logger import logger
-from mcp_server import call_tool, get_openai_mcp_tools, set_current_message
-from services.prompts import system_prompts, assistant_prompts_start
-from services.database import get_setting
+from mcp_server import call_tool, get_openai_mcp_tools, is_read_only_tool, request_scope
+from mcp_server.tool_selector import MORE_TOOLS_NAME, expand_tool_groups, more_tools_schema, select_tool_groups
+from services.prompts import static_prompt_prefix
+from services.database import get_int_setting
 from services.ai_service import ai_service
 from services.discord_service import discord_service
-from services.music_service import music_service
+from services.tts_service import tts_service
+from services.history_cache import history_cache
+from services.usage_metrics import usage_tracker
+from services.token_budget import TokenLedger, token_budget
 
 async def image_generate(prompt: str, size: int, reply_message: discord.Message):
     """DALL·E 이미지를 생성하고 응답 메시지를 업데이트합니다."""
@@ -88,12 +93,95 @@ async def execute_tool(tool_name: str, tool_input: Dict[str, Any], message_id: O
         return {"type": "error", "message": str(exc)}
 
 
+def _parse_tool_arguments(raw_arguments: str) -> Dict[str, Any]:
+    try:
+        tool_args = json.loads(raw_arguments)
+    except json.JSONDecodeError:
+        return {}
+    return tool_args if isinstance(tool_args, dict) else {}
+
+
+async def _run_tool_call(tool_name: str, tool_args: Dict[str, Any], message: discord.Message, reply_message: discord.Message) -> str:
+    tool_result = await execute_tool(tool_name, tool_args, message.id)
+
+    # 이미지 생성 등 특수 툴 처리
+    if tool_result["type"] == "image_generation":
+        await image_generate(tool_result["prompt"], tool_result["size"], reply_message)
+        return f"이미지 생성 완료: '{tool_result['prompt']}'"
+    if tool_result["type"] == "error":
+        return f"툴 실행 오류: {tool_result['message']}"
+    return tool_result["content"]
+
+
+async def _execute_tool_calls(
+    tool_calls_list: List[Dict[str, Any]],
+    message: discord.Message,
+    reply_message: discord.Message,
+    local_tools: Optional[Dict[str, Callable[[Dict[str, Any]], str]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    한 라운드의 툴 호출을 동시에 실행합니다.
+    local_tools에 있는 툴(request_more_tools 등)은 MCP를 거치지 않고 바로 처리합니다.
+    읽기 전용 툴은 서로 겹쳐 실행하고, 부작용이 있는 툴은 모두 한 줄로 원래 순서대로 실행합니다.
+    (같은 채널을 server_id/channel_id 중 어느 것으로 가리키는지 알 수 없으므로 자원별로 나누지 않음)
+    동시 실행 수는 TOOL_CONCURRENCY로 제한하며, 결과는 tool_call 순서대로 반환합니다.
+    """
+    semaphore = asyncio.Semaphore(max(1, env.TOOL_CONCURRENCY))
+    results: List[Optional[str]] = [None] * len(tool_calls_list)
+    parsed = [
+        (tc["function"]["name"], _parse_tool_arguments(tc["function"]["arguments"]))
+        for tc in tool_calls_list
+    ]
+
+    async def run(index: int):
+        tool_name, tool_args = parsed[index]
+        if local_tools and tool_name in local_tools:
+            results[index] = local_tools[tool_name](tool_args)
+            return
+        async with semaphore:
+            try:
+                results[index] = await _run_tool_call(tool_name, tool_args, message, reply_message)
+            except Exception as exc:
+                logger.log(f"툴 실행 오류 ({tool_name}): {str(exc)}", logger.ERROR)
+                results[index] = f"툴 실행 오류: {str(exc)}"
+
+    async def run_in_order(indices: List[int]):
+        for index in indices:
+            await run(index)
+
+    independent = []
+    mutating = []
+    for index, (tool_name, _) in enumerate(parsed):
+        is_local = bool(local_tools) and tool_name in local_tools
+        (independent if is_local or is_read_only_tool(tool_name) else mutating).append(index)
+
+    await asyncio.gather(
+        *(run(index) for index in independent),
+        run_in_order(mutating),
+    )
+
+    return [
+        {"role": "tool", "tool_call_id": tc["id"], "content": results[index]}
+        for index, tc in enumerate(tool_calls_list)
+    ]
+
+
+async def _round_tools(tool_groups: Optional[Set[str]]) -> List[Dict[str, Any]]:
+    """이번 라운드에 전달할 툴 목록. 그룹을 골랐으면 나머지 그룹을 요청할 수 있는 툴을 덧붙입니다."""
+    tools = await get_openai_mcp_tools(tool_groups)
+    if tool_groups is None:
+        return tools
+    more_tools = more_tools_schema(tool_groups)
+    return [*tools, more_tools] if more_tools else tools
+
+
 async def _build_initial_conversation(
     message: discord.Message,
     username: str,
     prompt: str,
     img_mode: bool,
     img_url: Optional[str],
+    ledger: Optional[TokenLedger] = None,
 ) -> List[Dict[str, Any]]:
     if img_mode and img_url:
         return [
@@ -105,32 +193,25 @@ async def _build_initial_conversation(
                 ],
             }
         ]
-    return await prompt_to_chat(message, username, prompt)
-
+    return await prompt_to_chat(message, username, prompt, ledger)
 
-def _build_system_prompts(message: discord.Message) -> List[Dict[str, Any]]:
-    base_prompts = [prompt_block.copy() for prompt_block in system_prompts]
-    if not base_prompts or base_prompts[0].get("role") != "system":
-        return base_prompts
-
-    base_prompts[0] = base_prompts[0].copy()
-    base_prompts[0]["content"] += f"\nToday is {datetime.datetime.now().strftime('%Y-%m-%d')} A.D."
 
+def _build_context_prompt(message: discord.Message) -> Dict[str, Any]:
+    """요청마다 달라지는 정보만 담은 작은 시스템 블록 (공통 프리픽스 뒤에 붙음)."""
     server_id = str(message.guild.id) if message.guild else "DM"
     server_name = message.guild.name if message.guild else "DM"
     channel_id = str(message.channel.id)
     channel_name = message.channel.name if hasattr(message.channel, "name") else "Direct Message"
-    user_id = str(message.author.id)
-    message_id = str(message.id)
-
-    base_prompts[0]["content"] += f"\n현재 서버: {server_name}, 채널: {channel_name}"
-    base_prompts[0]["content"] += f"\ncurrent_server_id: {server_id}"
-    base_prompts[0]["content"] += f"\ncurrent_channel_id: {channel_id}"
-    base_prompts[0]["content"] += f"\ncurrent_user_id: {user_id}"
-    base_prompts[0]["content"] += f"\ncurrent_message_id: {message_id}"
 
-    set_current_message(message)
-    return base_prompts
+    content = (
+        f"Today is {datetime.datetime.now().strftime('%Y-%m-%d')} A.D."
+        f"\n현재 서버: {server_name}, 채널: {channel_name}"
+        f"\ncurrent_server_id: {server_id}"
+        f"\ncurrent_channel_id: {channel_id}"
+        f"\ncurrent_user_id: {message.author.id}"
+        f"\ncurrent_message_id: {message.id}"
+    )
+    return {"role": "system", "content": content}
 
 
 async def _prepare_conversation_messages(
@@ -139,16 +220,15 @@ async def _prepare_conversation_messages(
     prompt: str,
     img_mode: bool,
     img_url: Optional[str],
+    ledger: Optional[TokenLedger] = None,
 ) -> List[Dict[str, Any]]:
-    base_prompts = _build_system_prompts(message)
     initial_conversation = await _build_initial_conversation(
-        message, username, prompt, img_mode, img_url
+        message, username, prompt, img_mode, img_url, ledger
     )
 
-    # 과거에 이미 이런 식으로 대화를 시작했다는 느낌의 초기 어시스턴트 메시지를 붙임
-    starter_prompts = assistant_prompts_start or []
-
-    return [*base_prompts, *starter_prompts, *initial_conversation]
+    # 고정 프리픽스(시스템 프롬프트 + 시작 인사)를 그대로 앞에 두어 프롬프트 캐시가 적중하게 하고,
+    # 요청별 정보는 그 뒤에 붙임
+    return [*static_prompt_prefix, _build_context_prompt(message), *initial_conversation]
 
 
 async def chat_with_openai_mcp(
@@ -160,8 +240,26 @@ async def chat_with_openai_mcp(
     message_object: Optional[discord.Message] = None,
 ):
     """OpenAI Chat Completions + MCP 툴 루프 (스트리밍 지원)."""
-    messages = await _prepare_conversation_messages(message, username, prompt, img_mode, img_url)
+    # 툴들이 보는 현재 메시지를 이 요청 범위로 한정 (동시 대화 간 격리)
+    with request_scope(message):
+        await _run_chat(message, username, prompt, img_mode, img_url, message_object)
+
+
+async def _run_chat(
+    message: discord.Message,
+    username: str,
+    prompt: str,
+    img_mode: bool,
+    img_url: Optional[str],
+    message_object: Optional[discord.Message],
+):
+    ledger = TokenLedger()
+    messages = await _prepare_conversation_messages(message, username, prompt, img_mode, img_url, ledger)
     reply_message = await discord_service.ensure_reply_message(message, message_object)
+    # 스트림은 렌더러에 텍스트만 넘기고, 메시지 편집은 렌더 태스크가 간격을 조절하며 수행
+    renderer = discord_service.open_stream(reply_message)
+    # 음성 채널에 있으면 응답이 스트리밍되는 동안 문장 단위로 읽음
+    speech = tts_service.open_session(message.guild)
 
     try:
         max_tool_rounds = 50
@@ -169,14 +267,33 @@ async def chat_with_openai_mcp(
         
         # 디스코드에 표시된 최종 텍스트 (툴 메시지 제외)
         display_text = ""
-        last_update_length = 0
 
-        openai_tools = await get_openai_mcp_tools()
+        # 메시지 의도에 맞는 툴 그룹만 전달 (판단할 수 없으면 전체)
+        tool_groups = select_tool_groups(prompt) if env.TOOL_SUBSETTING else None
+        logger.log(f"툴 그룹: {sorted(tool_groups) if tool_groups else '전체'}", logger.DEBUG)
         client = ai_service.client
 
+        def request_more_tools(arguments: Dict[str, Any]) -> str:
+            # 툴 결과를 보고 다른 그룹이 필요해진 경우 (예: 검색 후 음악 재생) 다음 라운드부터 추가
+            nonlocal tool_groups
+            if tool_groups is None:
+                return "이미 모든 툴을 사용할 수 있습니다."
+            before = tool_groups
+            tool_groups = expand_tool_groups(tool_groups, arguments)
+            added = sorted(tool_groups - before)
+            logger.log(f"툴 그룹 추가: {added}", logger.DEBUG)
+            return f"추가된 툴 그룹: {', '.join(added)}" if added else "추가할 수 있는 툴 그룹이 없습니다."
+
+        local_tools = {MORE_TOOLS_NAME: request_more_tools}
+
         while current_round < max_tool_rounds:
             current_round += 1
 
+            # 이전 라운드 툴 결과를 줄여 컨텍스트를 토큰 예산 안에 유지
+            estimated_tokens = token_budget.compact(messages, ledger)
+            round_usage = None
+            openai_tools = await _round_tools(tool_groups)
+
             response = await client.chat.completions.create(
                 model=env.OPENAI_MODEL,
                 messages=messages,
@@ -184,6 +301,7 @@ async def chat_with_openai_mcp(
                 tools=openai_tools,
                 tool_choice="auto",
                 stream=True, # 스트리밍 활성화
+                stream_options={"include_usage": True}, # 마지막 청크에 usage(캐시 토큰 포함) 수신
             )
             
             # 현재 라운드에서 생성된 텍스트와 툴 호출
@@ -191,6 +309,10 @@ async def chat_with_openai_mcp(
             tool_calls_buffer = {} # index -> ToolCall 조각
             
             async for chunk in response:
+                if getattr(chunk, "usage", None):
+                    round_usage = usage_tracker.record(chunk.usage, model=env.OPENAI_MODEL)
+                if not chunk.choices:
+                    continue
                 delta = chunk.choices[0].delta
                 
                 # 1. 텍스트 처리
@@ -198,12 +320,10 @@ async def chat_with_openai_mcp(
                     current_round_text += delta.content
                     display_text += delta.content
                     
-                    # 40자 단위 업데이트 (텍스트만 표시)
-                    last_update_length = await discord_service.update_message(
-                        reply_message,
-                        display_text,
-                        last_update_length=last_update_length
-                    )
+                    # 편집을 기다리지 않고 최신 텍스트만 넘김 (텍스트만 표시)
+                    renderer.set_text(display_text)
+                    if speech:
+                        speech.feed(delta.content)
                 
                 # 2. 툴 호출 처리 (조각 모으기)
                 if delta.tool_calls:
@@ -224,6 +344,10 @@ async def chat_with_openai_mcp(
                                 tool_calls_buffer[index]["function"]["arguments"] += tc.function.arguments
             
             # 스트리밍 종료 후 처리
+            ledger.add_round(estimated_tokens, round_usage)
+            if speech:
+                # 툴을 실행하는 동안 이번 라운드의 마지막 문장까지 읽음
+                speech.flush()
             
             # 완성된 텍스트를 메시지 기록에 추가
             assistant_msg = {"role": "assistant", "content": current_round_text}
@@ -250,41 +374,18 @@ async def chat_with_openai_mcp(
                 
                 logger.log(f"{len(tool_calls_list)}개 툴 호출 감지됨. 실행 시작.", logger.INFO)
                 
-                # 툴 실행 및 UI 표시
-                tool_responses = []
-                
                 # 툴 사용 중 메시지 표시 (기존 텍스트 유지 + 툴 알림 추가)
                 tool_names = ", ".join([tc["function"]["name"] for tc in tool_calls_list])
                 temp_display_text = f"{display_text}\n\n🛠️ `{tool_names}` 도구 사용 중..."
-                await discord_service.update_message(reply_message, temp_display_text, force=True)
+                renderer.set_text(temp_display_text)
+                await renderer.flush()
                 
-                for tc in tool_calls_list:
-                    # 툴 실행
-                    try:
-                        tool_args = json.loads(tc["function"]["arguments"])
-                    except json.JSONDecodeError:
-                        tool_args = {}
-                        
-                    tool_result = await execute_tool(tc["function"]["name"], tool_args, message.id)
-                    
-                    # 이미지 생성 등 특수 툴 처리
-                    if tool_result["type"] == "image_generation":
-                        await image_generate(tool_result["prompt"], tool_result["size"], reply_message)
-                        tool_content = f"이미지 생성 완료: '{tool_result['prompt']}'"
-                    elif tool_result["type"] == "error":
-                        tool_content = f"툴 실행 오류: {tool_result['message']}"
-                    else:
-                        tool_content = tool_result["content"]
-                        
-                    tool_responses.append({
-                        "role": "tool",
-                        "tool_call_id": tc["id"],
-                        "content": tool_content
-                    })
+                # 툴 실행 (독립적인 호출은 동시에, 결과는 원래 순서대로)
+                tool_responses = await _execute_tool_calls(tool_calls_list, message, reply_message, local_tools)
                 
                 messages.extend(tool_responses)
                 
-                await discord_service.update_message(reply_message, display_text, force=True)
+                renderer.set_text(display_text)
                 
                 # 최대 툴 호출 체크
                 if current_round == max_tool_rounds:
@@ -292,47 +393,17 @@ async def chat_with_openai_mcp(
                     warning_msg = "\n\n[최대 툴 호출 횟수에 도달했습니다.]"
                     display_text += warning_msg
                     
-                    if len(display_text) > 2000:
-                         # 2000자 초과 시 분할 전송
-                        await discord_service.update_message(reply_message, display_text[:2000], force=True)
-                        remaining = display_text[2000:]
-                        while remaining:
-                            chunk = remaining[:2000]
-                            remaining = remaining[2000:]
-                            await reply_message.channel.send(chunk)
-                    else:
-                        await discord_service.update_message(reply_message, display_text, force=True)
+                    renderer.set_text(display_text)
+                    await renderer.close()
                     break
                     
             else:
                 # 툴 호출이 없으면 대화 종료
                 messages.append(assistant_msg)
                 
-                # 최종 업데이트
-                if len(display_text) > 2000:
-                    # 첫 2000자는 기존 메시지 수정
-                    await discord_service.update_message(reply_message, display_text[:2000], force=True)
-                    
-                    # 나머지는 2000자 단위로 나누어 새 메시지로 전송
-                    remaining_text = display_text[2000:]
-                    while remaining_text:
-                        chunk = remaining_text[:2000]
-                        remaining_text = remaining_text[2000:]
-                        try:
-                            await reply_message.channel.send(chunk)
-                        except Exception as e:
-                            logger.log(f"메시지 분할 전송 실패: {str(e)}", logger.ERROR)
-                            break
-                else:
-                    # 2000자 이하면 그냥 업데이트
-                    await discord_service.update_message(reply_message, display_text, force=True)
-                
-                # TTS 읽기 (음성 채널에 있는 경우)
-                if message.guild and message.guild.voice_client and message.guild.voice_client.is_connected():
-                    # 코드 블록 등은 읽기에 불편하므로 제거하
-                    # 여기서는 전체 텍스트를 넘기되, 너무 길면 music_service.tts 내부에서 끊길 수도 있음
-                    # music_service.tts는 비동기(run_in_executor)로 동작하므로 블로킹하지 않음
-                    await music_service.tts(message.guild, display_text)
+                # 최종 업데이트 (2000자를 넘는 부분은 스트리밍 중 이미 다음 페이지로 이어 보내짐)
+                renderer.set_text(display_text)
+                await renderer.close()
 
                 logger.log("툴 호출 없음, 루프 종료.", logger.INFO)
                 break
@@ -340,7 +411,12 @@ async def chat_with_openai_mcp(
     except Exception as exc:
         logger.log(f"OpenAI MCP 응답 처리 오류: {str(exc)}", logger.ERROR)
         traceback.print_exc()
+        # 렌더러가 오류 메시지를 덮어쓰지 않도록 먼저 종료
+        await renderer.close()
         await _handle_chat_failure(message, reply_message, exc)
+    finally:
+        await renderer.close()
+        token_budget.finish(ledger)
 
 
 async def _handle_chat_failure(message: discord.Message, reply_message: discord.Message, exc: Exception):
@@ -350,38 +426,28 @@ async def _handle_chat_failure(message: discord.Message, reply_message: discord.
         await message.reply(f"오류가 발생했습니다: {str(exc)}")
 
 
-async def prompt_to_chat(message, username, prompt):
+async def prompt_to_chat(message, username, prompt, ledger: Optional[TokenLedger] = None):
     conversation = []
 
-    history_num_str = get_setting("history_num")
-    if history_num_str and history_num_str.isdigit():
-        history_num = int(history_num_str)
-    else:
-        history_num = env.HISTORY_NUM
+    history_num = get_int_setting("history_num", env.HISTORY_NUM, guild_id=message.guild.id if message.guild else None)
     
-    # 채널의 이전 메시지를 가져옴
-    async for chat in message.channel.history(limit=history_num):
-        # 현재 메시지는 제외
-        if chat.id == message.id:
-            continue
-            
-        user = chat.author
-        server_name = user.nick
-        if server_name is None:
-            server_name = user.name
-            
+    # 채널의 이전 메시지를 가져옴 (게이트웨이 이벤트로 채워진 캐시 사용, 현재 메시지 제외)
+    records = await history_cache.get_recent(message.channel, history_num, exclude_id=message.id)
+    bot_id = message.guild.me.id if message.guild else None
+    for chat in records:
         # 봇 메시지와 사용자 메시지를 프롬프트 형식으로 변환
-        if user.bot and message.guild and user.id == message.guild.me.id:
+        if chat.is_bot and chat.author_id == bot_id:
             conversation.append({"role": "assistant", "content": f"{chat.content}"})
         else:
             # 이미지가 있는 경우 별도 표시
-            if chat.attachments:
-                conversation.append({"role": "user", "content": f"{server_name}: [사진] {chat.content}"})
+            if chat.has_attachments:
+                conversation.append({"role": "user", "content": f"{chat.author_name}: [사진] {chat.content}"})
             else:
-                conversation.append({"role": "user", "content": f"{server_name}: {chat.content}"})
+                conversation.append({"role": "user", "content": f"{chat.author_name}: {chat.content}"})
+
+    # 메시지 개수(history_num) 안에서도 토큰 예산을 넘는 오래된 메시지는 제외 (최신 메시지 우선)
+    conversation = token_budget.pack_history(conversation, ledger)
                 
-    # 최신 메시지가 먼저 오도록 순서 반전
-    conversation = conversation[::-1]
     # 현재 메시지 추가
     conversation.append({"role": "user", "content": f"{username}: {prompt}"})
     
@@ -389,4 +455,109 @@ async def prompt_to_chat(message, username, prompt):
 
 # Re-export is_message_for_bot for backward compatibility
 async def is_message_for_bot(message_content: str, username: str, bot_name: str, recent_messages: List[dict] = None) -> Tuple[bool, float]:
-    return await ai_service.is_message_for_bot(message_content, username, bot_name, recent_messages)
\ No newline at end of file
+    return await ai_service.is_message_for_bot(message_content, username, bot_name, recent_messages)
+
+# 예제: 겹쳐 실행되는 chat_with_openai_mcp 호출의 툴들이 각자 자신의 메시지만 보는지 확인
+# 가짜 OpenAI 클라이언트가 컨텍스트 프롬프트의 메시지/채널 ID로 툴을 호출하고,
+# 가짜 툴은 그 ID를 global_context의 현재 메시지와 비교합니다.
+#   python -m services.openai_mcp [대화 수]
+if __name__ == "__main__":
+    import random
+    import re
+    import sys
+    from types import SimpleNamespace
+    from mcp_server.context import global_context
+    from mcp_server.registry import tool_registry
+
+    conversations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    mismatches = []
+    tool_calls = {"count": 0}
+
+    def _check_scope(arguments: dict) -> str:
+        tool_calls["count"] += 1
+        current = global_context.get_current_message()
+        seen = (current.id, current.channel.id) if current else None
+        expected = (int(arguments["message_id"]), int(arguments["channel_id"]))
+        if seen != expected:
+            mismatches.append((expected, seen))
+        return f"message {seen}"
+
+    scope_schema = {
+        "type": "object",
+        "properties": {"channel_id": {"type": "string"}, "message_id": {"type": "string"}},
+        "required": ["channel_id", "message_id"],
+    }
+
+    @tool_registry.register("check_scope_read", "현재 메시지 확인 (읽기 전용)", scope_schema, read_only=True)
+    async def _check_scope_read(arguments: dict):
+        await asyncio.sleep(random.random() * 0.01)
+        return _check_scope(arguments)
+
+    @tool_registry.register("check_scope_write", "현재 메시지 확인 (부작용 있음)", scope_schema)
+    async def _check_scope_write(arguments: dict):
+        await asyncio.sleep(random.random() * 0.01)
+        return _check_scope(arguments)
+
+    def _chunk(content: Optional[str] = None, tool_calls_delta: Optional[list] = None):
+        delta = SimpleNamespace(content=content, tool_calls=tool_calls_delta)
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+
+    def _tool_call_delta(index: int, name: str, arguments: str):
+        function = SimpleNamespace(name=name, arguments=arguments)
+        return SimpleNamespace(index=index, id=f"call_{index}", type="function", function=function)
+
+    class _FakeCompletions:
+        """첫 라운드에 툴 세 개를 부르고, 툴 결과를 받으면 텍스트로 끝내는 가짜 모델."""
+        async def create(self, messages, **kwargs):
+            context = next(m["content"] for m in messages if m["role"] == "system" and "current_message_id" in m["content"])
+            arguments = json.dumps({
+                "channel_id": re.search(r"current_channel_id: (\d+)", context).group(1),
+                "message_id": re.search(r"current_message_id: (\d+)", context).group(1),
+            })
+            finished = messages[-1]["role"] == "tool"
+
+            async def stream():
+                await asyncio.sleep(random.random() * 0.01)
+                if finished:
+                    yield _chunk("완료")
+                    return
+                names = ["check_scope_read", "check_scope_write", "check_scope_read"]
+                for index, name in enumerate(names):
+                    # 인자를 두 조각으로 나눠 스트리밍 조립도 함께 확인
+                    yield _chunk(tool_calls_delta=[_tool_call_delta(index, name, arguments[:10])])
+                    await asyncio.sleep(0)
+                    yield _chunk(tool_calls_delta=[_tool_call_delta(index, None, arguments[10:])])
+            return stream()
+
+    class _FakeRenderer:
+        def set_text(self, text: str):
+            pass
+
+        async def flush(self):
+            pass
+
+        async def close(self):
+            pass
+
+    async def _no_history(channel, limit, exclude_id=None):
+        return []
+
+    ai_service._client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions()))
+    discord_service.open_stream = lambda message: _FakeRenderer()
+    history_cache.get_recent = _no_history
+
+    def _fake_message(index: int):
+        guild = SimpleNamespace(id=1000 + index % 7, name="test", me=SimpleNamespace(id=1), voice_client=None)
+        channel = SimpleNamespace(id=2000 + index, name=f"ch{index}")
+        return SimpleNamespace(id=3000 + index, guild=guild, channel=channel, author=SimpleNamespace(id=4000 + index))
+
+    async def main():
+        messages = [_fake_message(i) for i in range(conversations)]
+        await asyncio.gather(*(
+            chat_with_openai_mcp(message, f"user{i}", "확인해줘", message_object=SimpleNamespace())
+            for i, message in enumerate(messages)
+        ))
+        print(f"{conversations}개 대화, 툴 호출 {tool_calls['count']}개 중 다른 요청의 메시지를 본 호출: {len(mismatches)}개")
+        return len(mismatches) or tool_calls["count"] != conversations * 3
+
+    sys.exit(1 if asyncio.run(main()) else 0)
@@ -0,0 +1,79 @@
+from typing import List, Optional
+
+DISCORD_MESSAGE_LIMIT = 2000
+FENCE = "```"
+FENCE_CLOSE = "\n```"
+
+# 문장 끝으로 보는 구분자 (한국어 종결 포함)
+SENTENCE_ENDS = (". ", "! ", "? ", "다. ", "요. ", "。", "…")
+
+
+def _fence_state(chunk: str, open_fence: Optional[str]) -> Optional[str]:
+    """chunk 끝에서 열려 있는 코드 펜스의 여는 줄(예: ```python)을 반환합니다. 닫혀 있으면 None."""
+    for line in chunk.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith(FENCE):
+            open_fence = None if open_fence else stripped
+    return open_fence
+
+
+def _choose_cut(window: str, open_fence: Optional[str]) -> int:
+    """
+    window 안에서 페이지를 나눌 위치(다음 페이지 시작 위치)를 고릅니다.
+    코드 블록 경계 > 빈 줄 > 줄바꿈 > 문장 끝 > 공백 순으로, 페이지 절반 이후의 가장 뒤 위치를 택합니다.
+    window만 보고 결정하므로 뒤에 텍스트가 더 붙어도 결과가 바뀌지 않습니다.
+    """
+    floor = len(window) // 2
+
+    # 코드 블록 경계: 여는 펜스 줄 앞, 또는 닫는 펜스 줄 뒤
+    idx = window.rfind("\n" + FENCE)
+    if idx >= floor:
+        if _fence_state(window[:idx], open_fence) is None:
+            return idx + 1
+        line_end = window.find("\n", idx + 1)
+        if line_end != -1:
+            return line_end + 1
+
+    for sep in ("\n\n", "\n"):
+        idx = window.rfind(sep)
+        if idx >= floor:
+            return idx + len(sep)
+
+    best = max((window.rfind(sep) + len(sep) for sep in SENTENCE_ENDS if window.rfind(sep) >= floor), default=-1)
+    if best > 0:
+        return best
+
+    idx = window.rfind(" ")
+    if idx >= floor:
+        return idx + 1
+    return len(window)
+
+
+def paginate(text: str, limit: int = DISCORD_MESSAGE_LIMIT) -> List[str]:
+    """
+    text를 limit 이하의 페이지로 나눕니다. 페이지가 코드 블록 중간에서 끝나면
+    펜스를 닫고 다음 페이지에서 같은 언어로 다시 엽니다.
+    스트리밍 중 text 뒤에만 글자가 붙는다면 마지막 페이지를 제외한 앞 페이지들은 바뀌지 않습니다.
+    """
+    pages = []
+    pos = 0
+    open_fence = None
+    while True:
+        prefix = open_fence + "\n" if open_fence else ""
+        rest = text[pos:]
+        closing = FENCE_CLOSE if _fence_state(rest, open_fence) else ""
+        if len(prefix) + len(rest) + len(closing) <= limit:
+            pages.append(prefix + rest + closing)
+            return pages
+
+        # 펜스를 닫을 자리를 항상 남겨 둔 범위 안에서만 나눔
+        budget = limit - len(prefix) - len(FENCE_CLOSE)
+        cut = _choose_cut(rest[:budget], open_fence)
+        chunk = rest[:cut]
+        chunk_fence = _fence_state(chunk, open_fence)
+        page = prefix + chunk
+        if chunk_fence:
+            page = page.rstrip("\n") + FENCE_CLOSE
+        pages.append(page)
+        pos += cut
+        open_fence = chunk_fence
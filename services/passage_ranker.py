@@ -0,0 +1,132 @@
+import math
+import re
+from collections import Counter
+from typing import List, Sequence, Tuple
+from services.token_budget import token_counter
+
+# BM25 매개변수
+K1 = 1.5
+B = 0.75
+
+_WORD = re.compile(r'\w+')
+_SENTENCE_END = re.compile(r'(?<=[.!?。])\s+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    단어 단위로 나누되, 한글처럼 조사가 붙는 비ASCII 단어는 글자 2-gram도 함께 넣어
+    '검색을'과 '검색' 같은 활용형끼리도 맞도록 합니다.
+    """
+    terms = []
+    for word in _WORD.findall(text.casefold()):
+        terms.append(word)
+        if len(word) > 2 and not word.isascii():
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def split_passages(text: str, target_chars: int) -> List[str]:
+    """
+    추출된 텍스트를 target_chars 안팎의 문단 묶음으로 나눕니다.
+    줄(블록) 경계를 우선하고, 너무 긴 블록은 문장 경계, 그래도 길면 글자 수로 자릅니다.
+    """
+    pieces = []
+    for block in text.split('\n'):
+        block = block.strip()
+        if not block:
+            continue
+        if len(block) <= target_chars:
+            pieces.append(block)
+            continue
+        for sentence in _SENTENCE_END.split(block):
+            sentence = sentence.strip()
+            while len(sentence) > target_chars * 2:
+                cut = sentence.rfind(' ', 0, target_chars)
+                cut = cut if cut > target_chars // 2 else target_chars
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:].strip()
+            if sentence:
+                pieces.append(sentence)
+
+    passages = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > target_chars:
+            passages.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+class BM25Index:
+    """여러 페이지의 문단을 한꺼번에 담는 작은 메모리 BM25 색인입니다."""
+    def __init__(self, documents: Sequence[str]):
+        self._terms = [Counter(tokenize(doc)) for doc in documents]
+        self._lengths = [sum(terms.values()) for terms in self._terms]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        document_frequency = Counter()
+        for terms in self._terms:
+            document_frequency.update(terms.keys())
+        total = len(documents)
+        self._idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        query_terms = set(tokenize(query))
+        results = []
+        for terms, length in zip(self._terms, self._lengths):
+            norm = K1 * (1 - B + B * length / self._avg_length) if self._avg_length else K1
+            score = 0.0
+            for term in query_terms:
+                tf = terms.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (K1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def rank_passages(
+    query: str,
+    pages: Sequence[str],
+    token_budget: int,
+    target_chars: int,
+) -> List[Tuple[int, List[str]]]:
+    """
+    모든 페이지의 문단을 검색어에 대한 BM25 점수로 정렬해 token_budget 안에서 고릅니다.
+    고른 문단은 페이지별로 원래 순서대로 묶고, 페이지는 가장 높은 문단 점수 순으로 돌려줍니다.
+    점수가 같으면(검색어와 겹치지 않으면) 페이지마다 앞 문단부터 번갈아 고릅니다.
+    """
+    passages = []  # (페이지 번호, 페이지 안 위치, 문단)
+    for page_index, text in enumerate(pages):
+        for position, passage in enumerate(split_passages(text, target_chars)):
+            passages.append((page_index, position, passage))
+    if not passages:
+        return []
+
+    scores = BM25Index([passage for _, _, passage in passages]).scores(query)
+    order = sorted(range(len(passages)), key=lambda i: (-scores[i], passages[i][1], passages[i][0]))
+
+    chosen = []
+    used = 0
+    for i in order:
+        tokens = token_counter.count(passages[i][2])
+        if used + tokens > token_budget:
+            continue
+        chosen.append(i)
+        used += tokens
+        if used >= token_budget:
+            break
+
+    best = {}
+    by_page = {}
+    for i in chosen:
+        page_index, position, passage = passages[i]
+        by_page.setdefault(page_index, []).append((position, passage))
+        best[page_index] = max(best.get(page_index, 0.0), scores[i])
+    ranked_pages = sorted(by_page, key=lambda page_index: (-best[page_index], page_index))
+    return [(page_index, [passage for _, passage in sorted(by_page[page_index])]) for page_index in ranked_pages]
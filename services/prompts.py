@@ -55,4 +55,8 @@ system_prompts = [
 
 assistant_prompts_start = [
     {"role": "assistant", "content": env.BOT_START_MESSAGE}
-]
\ No newline at end of file
+]
+# 요청마다 바뀌지 않는 공통 프리픽스 (정체성 + 툴 가이드 + 시작 인사)
+# 제공자 측 프롬프트 캐시가 적중하도록 임포트 시 한 번만 만들고 절대 수정하지 않습니다.
+# 날짜, 서버/채널/사용자 ID 같은 요청별 정보는 이 뒤의 동적 블록에만 넣습니다.
+static_prompt_prefix = tuple(system_prompts + assistant_prompts_start)
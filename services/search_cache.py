@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from collections import Counter, OrderedDict
+from typing import List, Optional
+from core.cache import TTLCache
+from core.config import env
+from core.logger import logger
+
+# 색인 변경 사항을 모아서 저장하기까지 기다리는 시간 (초)
+INDEX_FLUSH_DELAY = 2.0
+
+
+def normalize_query(query: str) -> str:
+    """대소문자와 공백 차이만 있는 검색어를 같은 키로 취급합니다."""
+    return re.sub(r"\s+", " ", str(query)).strip().casefold()
+
+
+class PageEntry:
+    """URL 하나의 캐시 항목. 본문은 내용 해시(sha256) 이름의 파일에 따로 저장됩니다."""
+    __slots__ = ("digest", "size", "etag", "last_modified", "fetched_at")
+
+    def __init__(self, digest: str, size: int, etag: Optional[str], last_modified: Optional[str], fetched_at: float):
+        self.digest = digest
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageEntry":
+        return cls(data["digest"], data["size"], data.get("etag"), data.get("last_modified"), data["fetched_at"])
+
+
+class PageCache:
+    """
+    URL -> 추출 텍스트를 디스크에 보관하는 캐시입니다.
+    - 본문은 내용 주소(sha256) 파일로 저장해 같은 내용의 페이지(미러, 리다이렉트)는 한 번만 저장합니다.
+    - fresh_seconds 안의 항목은 네트워크 없이 바로 쓰고, 그 뒤에는 ETag/Last-Modified로 재검증합니다.
+    - 전체 본문 크기가 max_bytes를 넘으면 가장 오래 쓰지 않은 URL부터 지웁니다.
+    색인은 메모리에 두고 변경 시 모아서 index.json에 저장합니다.
+    """
+    def __init__(self, directory: str, max_bytes: int, fresh_seconds: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self._index_path = os.path.join(directory, "index.json")
+        self._entries: "OrderedDict[str, PageEntry]" = OrderedDict()
+        self._refs: Counter = Counter()  # digest -> 참조하는 URL 수
+        self._blob_sizes = {}            # digest -> 바이트 수
+        self._bytes = 0
+        self._loaded = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # 본문 파일 쓰기/삭제와 크기 계산을 한 번에 하나씩 (같은 URL/본문을 동시에 저장해도 크기를 두 번 더하지 않음)
+        self._io_lock: Optional[asyncio.Lock] = None
+        self.stats = Counter()
+
+    # ---- 색인 ----
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + ".txt")
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            logger.log(f"페이지 캐시 색인 로드 실패, 비우고 시작합니다: {e}", logger.WARNING)
+            return
+        for url, raw in data.get("entries", []):
+            try:
+                entry = PageEntry.from_dict(raw)
+            except (KeyError, TypeError):
+                continue
+            if not os.path.exists(self._blob_path(entry.digest)):
+                continue
+            self._entries[url] = entry
+            self._refs[entry.digest] += 1
+            if entry.digest not in self._blob_sizes:
+                self._blob_sizes[entry.digest] = entry.size
+                self._bytes += entry.size
+
+    def _write_index(self, snapshot: list):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".index-", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"entries": snapshot}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(INDEX_FLUSH_DELAY, lambda: asyncio.ensure_future(self.flush()))
+
+    async def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # 한 번도 읽지 않았으면 디스크의 색인을 빈 색인으로 덮어쓰지 않음
+        if not self._loaded:
+            return
+        snapshot = [(url, entry.to_dict()) for url, entry in self._entries.items()]
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_index, snapshot)
+        except OSError as e:
+            logger.log(f"페이지 캐시 색인 저장 실패: {e}", logger.ERROR)
+
+    # ---- 조회/저장 ----
+
+    def lookup(self, url: str) -> Optional[PageEntry]:
+        self._ensure_loaded()
+        entry = self._entries.get(url)
+        if entry is None:
+            self.stats["misses"] += 1
+        else:
+            self._entries.move_to_end(url)
+        return entry
+
+    def is_fresh(self, entry: PageEntry) -> bool:
+        return time.time() - entry.fetched_at < self.fresh_seconds
+
+    @staticmethod
+    def conditional_headers(entry: Optional[PageEntry]) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    async def read(self, url: str, entry: PageEntry) -> Optional[str]:
+        """캐시된 본문을 읽습니다. 파일이 사라졌으면 항목을 지우고 None을 반환합니다."""
+        path = self._blob_path(entry.digest)
+        try:
+            text = await asyncio.get_running_loop().run_in_executor(None, _read_text, path)
+        except OSError:
+            # 파일은 이미 없으므로 색인에서만 지움
+            if self._entries.get(url) is entry:
+                self._drop(url)
+            self.stats["missing_blobs"] += 1
+            return None
+        self.stats["hits"] += 1
+        return text
+
+    def touch(self, url: str, entry: PageEntry, etag: Optional[str], last_modified: Optional[str]):
+        """304 응답으로 재검증된 항목의 신선도를 갱신합니다."""
+        entry.fetched_at = time.time()
+        entry.etag = etag or entry.etag
+        entry.last_modified = last_modified or entry.last_modified
+        self.stats["revalidated"] += 1
+        self._schedule_flush()
+
+    async def store(self, url: str, text: str, etag: Optional[str], last_modified: Optional[str]):
+        self._ensure_loaded()
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if self._io_lock is None:
+            self._io_lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+
+        async with self._io_lock:
+            # 기다리는 동안 다른 저장이 같은 URL/본문을 넣었을 수 있으므로 잠근 뒤에 확인
+            old = self._entries.get(url)
+            if old is not None and old.digest == digest:
+                self.touch(url, old, etag, last_modified)
+                return
+
+            if digest not in self._blob_sizes:
+                try:
+                    await loop.run_in_executor(None, _write_bytes, self._blob_path(digest), data)
+                except OSError as e:
+                    logger.log(f"페이지 캐시 저장 실패: {url} - {e}", logger.ERROR)
+                    return
+                self._blob_sizes[digest] = len(data)
+                self._bytes += len(data)
+            else:
+                self.stats["deduplicated"] += 1
+
+            removed = []
+            if old is not None:
+                removed.extend(self._drop(url))
+            self._entries[url] = PageEntry(digest, len(data), etag, last_modified, time.time())
+            self._refs[digest] += 1
+            self.stats["stores"] += 1
+            removed.extend(self._evict())
+            if removed:
+                await loop.run_in_executor(None, _remove_all, removed)
+        self._schedule_flush()
+
+    def _drop(self, url: str) -> List[str]:
+        """색인에서 URL을 지우고, 더 이상 참조하지 않는 본문 파일 경로를 반환합니다 (삭제는 호출한 쪽에서)."""
+        entry = self._entries.pop(url, None)
+        if entry is None:
+            return []
+        self._refs[entry.digest] -= 1
+        if self._refs[entry.digest] > 0:
+            return []
+        del self._refs[entry.digest]
+        self._bytes -= self._blob_sizes.pop(entry.digest, 0)
+        return [self._blob_path(entry.digest)]
+
+    def _evict(self) -> List[str]:
+        removed = []
+        while self._entries and self._bytes > self.max_bytes:
+            url = next(iter(self._entries))
+            removed.extend(self._drop(url))
+            self.stats["evictions"] += 1
+        return removed
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "urls": len(self._entries), "blobs": len(self._blob_sizes), "bytes": self._bytes}
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _write_bytes(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _remove_all(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# 검색어 -> 검색 결과 항목 목록 (짧은 TTL)
+query_cache = TTLCache(maxsize=env.SEARCH_CACHE_SIZE, ttl=env.SEARCH_CACHE_TTL)
+
+page_cache = PageCache(
+    directory=env.PAGE_CACHE_DIR,
+    max_bytes=env.PAGE_CACHE_MAX_BYTES,
+    fresh_seconds=env.PAGE_CACHE_FRESH_SECONDS,
+)
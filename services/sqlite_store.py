@@ -0,0 +1,196 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+from core.logger import logger
+
+# guild_id가 없는(전역) 설정은 0번 길드로 저장합니다.
+GLOBAL_GUILD = 0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_channels (
+    channel_id INTEGER PRIMARY KEY,
+    guild_id   INTEGER NOT NULL DEFAULT 0,
+    name       TEXT,
+    created_at REAL NOT NULL DEFAULT (strftime('%s', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_chat_channels_guild ON chat_channels (guild_id);
+
+CREATE TABLE IF NOT EXISTS settings (
+    guild_id INTEGER NOT NULL DEFAULT 0,
+    name     TEXT NOT NULL,
+    value    TEXT,
+    PRIMARY KEY (guild_id, name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteStore:
+    """
+    채널/설정을 SQLite(WAL 모드)에 저장하는 백엔드입니다.
+    DataStore와 같은 메서드를 제공하며, 설정은 길드별로 분리됩니다.
+    메시지마다 호출되는 조회가 이벤트 루프에서 쿼리를 실행하지 않도록 두 테이블을 메모리에 두고,
+    쓰기는 SQLite에 바로 반영한 뒤 메모리도 함께 갱신합니다.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self.stats = {"reads": 0, "writes": 0, "queries": 0}
+        self._channels = {}  # channel_id -> guild_id (등록 순서 유지)
+        self._settings = {}  # (guild_id, name) -> 값
+        self._load_cache()
+
+    def _load_cache(self):
+        """두 테이블을 메모리로 읽어 옵니다. 시작할 때와 마이그레이션 후에만 호출합니다."""
+        channels = self._query("SELECT channel_id, guild_id FROM chat_channels ORDER BY created_at, rowid")
+        settings = self._query("SELECT guild_id, name, value FROM settings")
+        with self._lock:
+            self._channels = {channel_id: guild_id for channel_id, guild_id in channels}
+            self._settings = {(guild_id, name): json.loads(value) for guild_id, name, value in settings}
+
+    def _query(self, sql: str, params=()):
+        with self._lock:
+            self.stats["queries"] += 1
+            return self._conn.execute(sql, params).fetchall()
+
+    def _write(self, sql: str, params=()) -> int:
+        with self._lock:
+            self.stats["writes"] += 1
+            return self._conn.execute(sql, params).rowcount
+
+    # ---- 조회 ----
+
+    def get_chat_channels(self, guild_id: Optional[int] = None) -> List[int]:
+        with self._lock:
+            self.stats["reads"] += 1
+            if guild_id is None:
+                return list(self._channels)
+            return [channel_id for channel_id, guild in self._channels.items() if guild == guild_id]
+
+    def is_chat_channel(self, channel_id) -> bool:
+        with self._lock:
+            self.stats["reads"] += 1
+            return channel_id in self._channels
+
+    def get_setting(self, name, default=None, guild_id: Optional[int] = None):
+        """길드 설정이 없으면 전역 설정을 반환합니다."""
+        with self._lock:
+            self.stats["reads"] += 1
+            if guild_id is not None and (guild_id, name) in self._settings:
+                return self._settings[(guild_id, name)]
+            return self._settings.get((GLOBAL_GUILD, name), default)
+
+    # ---- 변경 ----
+
+    def add_chat_channel(self, channel_id, guild_id: Optional[int] = None, name: Optional[str] = None) -> bool:
+        with self._lock:
+            added = self._write(
+                "INSERT OR IGNORE INTO chat_channels (channel_id, guild_id, name) VALUES (?, ?, ?)",
+                (channel_id, guild_id or GLOBAL_GUILD, name)
+            ) > 0
+            if added:
+                self._channels[channel_id] = guild_id or GLOBAL_GUILD
+            return added
+
+    def delete_chat_channel(self, channel_id) -> bool:
+        with self._lock:
+            deleted = self._write("DELETE FROM chat_channels WHERE channel_id = ?", (channel_id,)) > 0
+            self._channels.pop(channel_id, None)
+            return deleted
+
+    def set_setting(self, name, value, guild_id: Optional[int] = None):
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._write(
+                "INSERT INTO settings (guild_id, name, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (guild_id, name) DO UPDATE SET value = excluded.value",
+                (guild_id or GLOBAL_GUILD, name, encoded)
+            )
+            # 저장된 JSON과 같은 값이 되도록 다시 읽은 값을 보관 (튜플 → 리스트 등)
+            self._settings[(guild_id or GLOBAL_GUILD, name)] = json.loads(encoded)
+
+    def flush(self):
+        """SQLite는 즉시 커밋되므로 WAL 체크포인트만 수행합니다."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---- 마이그레이션 ----
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def migrate_from_json(self, json_path: str, force: bool = False) -> bool:
+        """
+        data.json 내용을 한 번만 가져옵니다.
+        이미 가져온 적이 있으면(meta.migrated_from_json) 건너뜁니다.
+        """
+        if not force and self._get_meta("migrated_from_json"):
+            return False
+        if not os.path.exists(json_path):
+            return False
+
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.log(f"마이그레이션할 데이터 로드 실패 ({json_path}): {e}", logger.ERROR)
+            return False
+
+        channel_guilds = data.get("channel_guilds", {})
+        channels = [
+            (int(channel_id), int(channel_guilds.get(str(channel_id), GLOBAL_GUILD)), None)
+            for channel_id in data.get("chat_channels", [])
+        ]
+        settings = [
+            (GLOBAL_GUILD, name, json.dumps(value, ensure_ascii=False))
+            for name, value in data.get("settings", {}).items()
+        ]
+        for guild_id, guild_settings in data.get("guild_settings", {}).items():
+            settings.extend(
+                (int(guild_id), name, json.dumps(value, ensure_ascii=False))
+                for name, value in guild_settings.items()
+            )
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO chat_channels (channel_id, guild_id, name) VALUES (?, ?, ?)",
+                    channels
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO settings (guild_id, name, value) VALUES (?, ?, ?)",
+                    settings
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_json', ?)",
+                    (os.path.abspath(json_path),)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._load_cache()
+
+        logger.log(f"{json_path} → {self.path} 마이그레이션 완료: 채널 {len(channels)}개, 설정 {len(settings)}개", logger.INFO)
+        return True
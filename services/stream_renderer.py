@@ -0,0 +1,274 @@
+import asyncio
+import time
+from typing import List, Optional
+from core.config import env
+from core.logger import logger
+from services.paginator import DISCORD_MESSAGE_LIMIT, paginate
+
+
+class StreamRenderer:
+    """
+    스트리밍 응답을 디스코드 메시지에 반영하는 응답별 렌더 태스크입니다.
+    스트림 쪽은 set_text로 최신 텍스트만 넘기고 기다리지 않으며,
+    렌더 태스크가 일정 간격으로 변경분을 모아 한 번에 편집합니다.
+    편집 지연이나 429 응답이 관찰되면 간격을 늘리고, 원활하면 다시 줄입니다.
+    텍스트가 2000자를 넘으면 paginate로 나눠 새 메시지(페이지)를 바로 이어 보냅니다.
+    """
+    def __init__(self, message, min_interval: Optional[float] = None, max_interval: Optional[float] = None):
+        self.message = message
+        # 이 응답을 이루는 메시지들 (첫 페이지는 원래 답장 메시지)과 각 페이지에 반영된 내용
+        self.pages: List = [message]
+        self._page_contents: List[Optional[str]] = [None]
+        self.min_interval = min_interval if min_interval is not None else env.STREAM_EDIT_MIN_INTERVAL
+        self.max_interval = max_interval if max_interval is not None else env.STREAM_EDIT_MAX_INTERVAL
+        self.interval = self.min_interval
+
+        self._text = ""
+        self._rendered: Optional[str] = None
+        self._dirty = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closed = False
+        self._last_edit = 0.0
+        self._retry_at = 0.0
+        self._flush_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {"updates": 0, "edits": 0, "sends": 0, "rate_limited": 0, "errors": 0, "edit_latency": 0.0}
+
+    def start(self) -> "StreamRenderer":
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    def set_text(self, text: str):
+        """최신 텍스트를 기록합니다. 편집은 렌더 태스크가 맡으므로 바로 반환합니다."""
+        self._text = text
+        self.stats["updates"] += 1
+        self._idle.clear()
+        self._dirty.set()
+
+    async def flush(self):
+        """간격을 기다리지 않고 현재 텍스트를 반영한 뒤 반환합니다."""
+        if self._text == self._rendered:
+            return
+        if self._task is None or self._task.done():
+            await self._render()
+            return
+        self._idle.clear()
+        self._flush_requested.set()
+        self._dirty.set()
+        await self._idle.wait()
+
+    async def close(self):
+        """남은 변경분을 반드시 반영하고 렌더 태스크를 종료합니다."""
+        self._closed = True
+        self._flush_requested.set()
+        self._dirty.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception as e:
+                logger.log(f"렌더 태스크 오류: {e}", logger.WARNING)
+        # 태스크가 마지막 반영 전에 실패했더라도 최종 상태는 한 번 더 시도
+        if self._text != self._rendered:
+            await self._render()
+
+    async def _run(self):
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+
+            # 직전 편집 이후 interval이 지날 때까지 기다리며 그동안의 변경분을 모음 (flush/close 요청 시 생략)
+            wait = self._last_edit + self.interval - time.monotonic()
+            if wait > 0 and not self._flush_requested.is_set():
+                try:
+                    await asyncio.wait_for(self._flush_requested.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+            # 429를 받은 뒤에는 flush/close여도 재시도 가능 시각까지 기다림
+            wait = self._retry_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._flush_requested.clear()
+
+            if self._text != self._rendered:
+                await self._render()
+            if self._text == self._rendered:
+                self._idle.set()
+                if self._closed:
+                    return
+            else:
+                self._dirty.set()
+
+    async def _sync_pages(self, contents: List[str]) -> int:
+        """페이지별로 바뀐 것만 편집하고, 새 페이지는 보내고, 줄어든 페이지는 지웁니다. 호출한 API 수를 반환합니다."""
+        calls = 0
+        for index, content in enumerate(contents):
+            if index < len(self.pages):
+                if self._page_contents[index] == content:
+                    continue
+                await self.pages[index].edit(content=content)
+                self._page_contents[index] = content
+                self.stats["edits"] += 1
+            else:
+                if not content.strip():
+                    break
+                page = await self.message.channel.send(content)
+                self.pages.append(page)
+                self._page_contents.append(content)
+                self.stats["sends"] += 1
+            calls += 1
+
+        # 툴 안내 문구처럼 잠시 붙었다 사라진 텍스트로 생긴 페이지 정리
+        while len(self.pages) > max(1, len(contents)):
+            page = self.pages.pop()
+            self._page_contents.pop()
+            try:
+                await page.delete()
+            except Exception as e:
+                logger.log(f"남은 페이지 삭제 실패: {str(e)}", logger.WARNING)
+            calls += 1
+        return calls
+
+    async def _render(self):
+        text = self._text
+        started = time.monotonic()
+        try:
+            calls = await self._sync_pages(paginate(text) if text.strip() else [". . ."])
+            self._rendered = text
+            if calls:
+                latency = (time.monotonic() - started) / calls
+                self.stats["edit_latency"] += latency
+                self._adapt(latency)
+        except Exception as e:
+            if getattr(e, "status", None) == 429:
+                self.stats["rate_limited"] += 1
+                retry_after = getattr(e, "retry_after", 0) or 0
+                self._retry_at = time.monotonic() + retry_after
+                self.interval = min(self.max_interval, max(self.interval * 2, retry_after))
+                logger.log(f"메시지 편집 속도 제한, 간격을 {self.interval:.1f}초로 늘립니다.", logger.DEBUG)
+            else:
+                self.stats["errors"] += 1
+                # 실패한 상태를 다시 시도하지 않도록 반영된 것으로 간주
+                self._rendered = text
+                logger.log(f"메시지 업데이트 실패: {str(e)}", logger.WARNING)
+        finally:
+            self._last_edit = time.monotonic()
+
+    def _adapt(self, latency: float):
+        # 편집이 간격의 절반 이상 걸리면 간격을 늘리고, 빠르면 조금씩 최소 간격으로 되돌림
+        if latency > self.interval / 2:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        else:
+            self.interval = max(self.min_interval, self.interval * 0.9)
+
+
+if __name__ == "__main__":
+    import sys
+
+    class _RateLimited(Exception):
+        status = 429
+
+        def __init__(self, retry_after: float):
+            super().__init__("429 Too Many Requests")
+            self.retry_after = retry_after
+
+    class _FakeChannel:
+        """편집 지연과 채널 편집 제한(5초에 5회)을 흉내 내는 가짜 채널. 메시지들이 제한을 공유합니다."""
+        def __init__(self, latency: float):
+            self.latency = latency
+            self.edits = 0
+            self.sends = 0
+            self.rate_limited = 0
+            self.first_page_at = None
+            self._window = []
+
+        async def _call(self):
+            now = time.monotonic()
+            self._window = [t for t in self._window if now - t < 5.0]
+            if len(self._window) >= 5:
+                self.rate_limited += 1
+                raise _RateLimited(5.0 - (now - self._window[0]))
+            self._window.append(now)
+            await asyncio.sleep(self.latency)
+
+        async def send(self, content: str):
+            await self._call()
+            self.sends += 1
+            if self.first_page_at is None:
+                self.first_page_at = time.monotonic()
+            return _FakeMessage(self, content)
+
+    class _FakeMessage:
+        def __init__(self, channel: _FakeChannel, content: str = ""):
+            self.channel = channel
+            self.content = content
+
+        async def edit(self, content: str):
+            assert len(content) <= DISCORD_MESSAGE_LIMIT
+            await self.channel._call()
+            self.channel.edits += 1
+            self.content = content
+
+        async def delete(self):
+            await self.channel._call()
+
+    async def _stream(tokens: int, token_delay: float):
+        for i in range(tokens):
+            await asyncio.sleep(token_delay)
+            yield f"토큰{i % 10} " if i % 40 else "\n\n"
+
+    async def _waiting(call, *args):
+        # discord.py처럼 429를 받으면 retry_after만큼 기다렸다가 다시 호출
+        while True:
+            try:
+                return await call(*args)
+            except _RateLimited as e:
+                await asyncio.sleep(e.retry_after)
+
+    async def _inline(tokens: int, token_delay: float, latency: float):
+        # 기존 방식: 200자마다 스트림 루프 안에서 편집을 기다리고, 2000자 초과분은 마지막에 한꺼번에 전송
+        channel = _FakeChannel(latency)
+        message = _FakeMessage(channel)
+        text, last = "", 0
+        started = time.monotonic()
+        async for piece in _stream(tokens, token_delay):
+            text += piece
+            if len(text) - last >= 200:
+                last = len(text)
+                await _waiting(message.edit, text[:DISCORD_MESSAGE_LIMIT])
+        stream_done = time.monotonic() - started
+        await _waiting(message.edit, text[:DISCORD_MESSAGE_LIMIT])
+        remaining = text[DISCORD_MESSAGE_LIMIT:]
+        while remaining:
+            await _waiting(channel.send, remaining[:DISCORD_MESSAGE_LIMIT])
+            remaining = remaining[DISCORD_MESSAGE_LIMIT:]
+        return channel, started, stream_done, time.monotonic() - started
+
+    async def _rendered(tokens: int, token_delay: float, latency: float):
+        channel = _FakeChannel(latency)
+        renderer = StreamRenderer(_FakeMessage(channel), min_interval=1.0, max_interval=5.0).start()
+        text = ""
+        started = time.monotonic()
+        async for piece in _stream(tokens, token_delay):
+            text += piece
+            renderer.set_text(text)
+        stream_done = time.monotonic() - started
+        await renderer.close()
+        return channel, started, stream_done, time.monotonic() - started
+
+    async def _bench():
+        tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 1200
+        token_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.005
+        latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.25
+        print(f"토큰 {tokens}개, 토큰 간격 {token_delay * 1000:.1f}ms, 편집 지연 {latency * 1000:.0f}ms")
+        for name, run in (("inline", _inline), ("renderer", _rendered)):
+            channel, started, stream_done, total = await run(tokens, token_delay, latency)
+            first_page = f"{channel.first_page_at - started:.2f}s" if channel.first_page_at else "-"
+            print(
+                f"{name:>8}: 편집 {channel.edits}회, 새 페이지 {channel.sends}개 (첫 페이지 {first_page}), 429 {channel.rate_limited}회, "
+                f"스트림 소비 {stream_done:.2f}s ({tokens / stream_done:.0f} tok/s), 최종 반영 {total:.2f}s"
+            )
+
+    asyncio.run(_bench())
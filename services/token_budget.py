@@ -0,0 +1,235 @@
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+from core.config import env
+from core.logger import logger
+
+# 메시지 한 개당 붙는 역할/구분자 토큰 (OpenAI 채팅 포맷 기준 근사값)
+MESSAGE_OVERHEAD = 4
+# detail=high 이미지 한 장의 대략적인 입력 토큰
+IMAGE_TOKENS = 765
+# 축약한 툴 결과 끝에 붙이는 생략 안내 문구용 여유분
+TRUNCATION_NOTE_TOKENS = 16
+
+
+class TokenCounter:
+    """
+    tokenizers 패키지로 토큰 수를 셉니다.
+    토크나이저는 봇 시작 시 load()로 워커 스레드에서 한 번만 불러옵니다(다운로드가 필요할 수 있음).
+    불러오기 전이나 불러올 수 없으면 문자 수 기반 근사치를 사용하므로 이벤트 루프를 막지 않습니다.
+    """
+    def __init__(self, name: str, path: Optional[str] = None):
+        self.name = name
+        self.path = path
+        self._tokenizer = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """토크나이저를 불러옵니다. 블로킹 호출이므로 run_in_executor로 실행합니다."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                from tokenizers import Tokenizer
+                if self.path:
+                    self._tokenizer = Tokenizer.from_file(self.path)
+                else:
+                    self._tokenizer = Tokenizer.from_pretrained(self.name)
+                logger.log(f"토크나이저 로드 완료: {self.path or self.name}", logger.INFO)
+            except Exception as e:
+                logger.log(f"토크나이저 로드 실패, 근사치로 계산합니다: {e}", logger.WARNING)
+
+    @property
+    def tokenizer(self):
+        # 아직 불러오지 않았으면 None (근사치 사용)
+        return self._tokenizer
+
+    @staticmethod
+    def _estimate(text: str) -> int:
+        # ASCII는 약 4자당 1토큰, 한글 등 그 외 문자는 약 1자당 1토큰
+        ascii_chars = sum(1 for c in text if ord(c) < 128)
+        return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        tokenizer = self.tokenizer
+        if tokenizer is None:
+            return self._estimate(text)
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """텍스트를 앞에서부터 max_tokens 토큰까지만 남깁니다."""
+        if max_tokens <= 0 or not text:
+            return ""
+        tokenizer = self.tokenizer
+        if tokenizer is None:
+            total = self._estimate(text)
+            if total <= max_tokens:
+                return text
+            return text[:max(1, len(text) * max_tokens // total)]
+        encoding = tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= max_tokens:
+            return text
+        return text[:encoding.offsets[max_tokens - 1][1]]
+
+    def message_tokens(self, message: Dict[str, Any]) -> int:
+        """채팅 메시지 한 개의 토큰 수 (텍스트, 이미지, 툴 호출 인자 포함)."""
+        tokens = MESSAGE_OVERHEAD
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += self.count(content)
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    tokens += self.count(part.get("text", ""))
+                elif part.get("type") == "image_url":
+                    tokens += IMAGE_TOKENS
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function", {})
+            tokens += self.count(function.get("name", "")) + self.count(function.get("arguments", ""))
+        return tokens
+
+    def messages_tokens(self, messages: Sequence[Dict[str, Any]]) -> int:
+        return sum(self.message_tokens(m) for m in messages)
+
+
+class TokenLedger:
+    """요청 하나의 토큰 사용 내역 (대화 기록, 라운드별 프롬프트, 축약된 툴 결과)."""
+    def __init__(self):
+        self.history_included = 0
+        self.history_dropped = 0
+        self.history_tokens = 0
+        self.tool_outputs_compacted = 0
+        self.tool_tokens_saved = 0
+        self.rounds: List[Dict[str, Any]] = []
+        # 이미 축약한 툴 결과의 tool_call_id
+        self.compacted_ids = set()
+
+    def add_round(self, estimated_prompt_tokens: int, usage: Optional[Dict[str, Any]] = None):
+        entry = {"estimated_prompt_tokens": estimated_prompt_tokens}
+        if usage:
+            entry["prompt_tokens"] = usage.get("prompt_tokens", 0)
+            entry["cached_tokens"] = usage.get("cached_tokens", 0)
+            entry["completion_tokens"] = usage.get("completion_tokens", 0)
+        self.rounds.append(entry)
+
+    def summary(self) -> dict:
+        return {
+            "rounds": len(self.rounds),
+            "history_included": self.history_included,
+            "history_dropped": self.history_dropped,
+            "history_tokens": self.history_tokens,
+            "tool_outputs_compacted": self.tool_outputs_compacted,
+            "tool_tokens_saved": self.tool_tokens_saved,
+            "prompt_tokens": sum(r.get("prompt_tokens", r["estimated_prompt_tokens"]) for r in self.rounds),
+            "completion_tokens": sum(r.get("completion_tokens", 0) for r in self.rounds),
+        }
+
+
+class TokenBudget:
+    """
+    대화 컨텍스트를 토큰 예산 안에 맞춥니다.
+    - 대화 기록은 최신 메시지부터 history_budget까지만 담습니다.
+    - 이전 라운드의 툴 결과는 stale_tool_tokens로 줄여 둡니다.
+    - 그래도 context_budget을 넘으면 최신 라운드의 툴 결과까지 줄입니다.
+    """
+    def __init__(self, counter: TokenCounter, context_budget: int, history_budget: int, stale_tool_tokens: int):
+        self.counter = counter
+        self.context_budget = context_budget
+        self.history_budget = history_budget
+        self.stale_tool_tokens = stale_tool_tokens
+        self.totals = Counter()
+
+    def pack_history(self, history: List[Dict[str, Any]], ledger: Optional[TokenLedger] = None) -> List[Dict[str, Any]]:
+        """오래된 것부터 정렬된 대화 기록에서 예산 안에 드는 최신 메시지들만 남깁니다."""
+        packed = []
+        used = 0
+        for msg in reversed(history):
+            tokens = self.counter.message_tokens(msg)
+            if used + tokens > self.history_budget:
+                break
+            packed.append(msg)
+            used += tokens
+        packed.reverse()
+
+        dropped = len(history) - len(packed)
+        self.totals["history_included"] += len(packed)
+        self.totals["history_dropped"] += dropped
+        if ledger:
+            ledger.history_included += len(packed)
+            ledger.history_dropped += dropped
+            ledger.history_tokens += used
+        return packed
+
+    def _compact_tool_message(self, msg: Dict[str, Any], max_tokens: int, ledger: Optional[TokenLedger]) -> int:
+        content = msg.get("content") or ""
+        tokens = self.counter.count(content)
+        if tokens <= max_tokens:
+            return 0
+        keep = max(0, max_tokens - TRUNCATION_NOTE_TOKENS)
+        msg["content"] = (
+            self.counter.truncate(content, keep)
+            + f"\n...[이전 툴 결과 {tokens - keep}토큰 생략]"
+        )
+        saved = tokens - self.counter.count(msg["content"])
+        self.totals["tool_outputs_compacted"] += 1
+        self.totals["tool_tokens_saved"] += saved
+        if ledger:
+            ledger.tool_outputs_compacted += 1
+            ledger.tool_tokens_saved += saved
+        return saved
+
+    def compact(self, messages: List[Dict[str, Any]], ledger: Optional[TokenLedger] = None) -> int:
+        """
+        다음 라운드 요청 전에 messages를 제자리에서 줄이고, 예상 프롬프트 토큰 수를 반환합니다.
+        마지막 어시스턴트 툴 호출 이후의 툴 결과는 최신 결과로 보고 예산을 넘을 때만 줄입니다.
+        """
+        last_call = max((i for i, m in enumerate(messages) if m.get("tool_calls")), default=len(messages))
+        compacted_ids = ledger.compacted_ids if ledger else set()
+
+        for i, msg in enumerate(messages[:last_call]):
+            if msg.get("role") != "tool" or msg.get("tool_call_id") in compacted_ids:
+                continue
+            self._compact_tool_message(msg, self.stale_tool_tokens, ledger)
+            compacted_ids.add(msg.get("tool_call_id"))
+
+        total = self.counter.messages_tokens(messages)
+        if total > self.context_budget:
+            recent = [m for m in messages[last_call:] if m.get("role") == "tool"]
+            if recent:
+                # 최신 툴 결과들이 남은 예산을 나눠 갖도록 줄임
+                fixed = total - sum(self.counter.count(m.get("content") or "") for m in recent)
+                share = max(self.stale_tool_tokens, (self.context_budget - fixed) // len(recent))
+                for msg in recent:
+                    self._compact_tool_message(msg, share, ledger)
+                total = self.counter.messages_tokens(messages)
+            if total > self.context_budget:
+                logger.log(f"컨텍스트가 토큰 예산을 초과합니다: {total} > {self.context_budget}", logger.WARNING)
+        return total
+
+    def finish(self, ledger: TokenLedger):
+        summary = ledger.summary()
+        self.totals["requests"] += 1
+        self.totals["prompt_tokens"] += summary["prompt_tokens"]
+        self.totals["completion_tokens"] += summary["completion_tokens"]
+        logger.log(
+            f"토큰 내역: 라운드 {summary['rounds']}, 프롬프트 {summary['prompt_tokens']}, 응답 {summary['completion_tokens']}, "
+            f"기록 {summary['history_included']}개/{summary['history_tokens']}토큰 (제외 {summary['history_dropped']}), "
+            f"툴 결과 축약 {summary['tool_outputs_compacted']}개/{summary['tool_tokens_saved']}토큰",
+            logger.DEBUG
+        )
+
+    def get_stats(self) -> dict:
+        return dict(self.totals)
+
+
+token_counter = TokenCounter(env.TOKENIZER_NAME, env.TOKENIZER_PATH)
+token_budget = TokenBudget(
+    token_counter,
+    context_budget=env.CONTEXT_TOKEN_BUDGET,
+    history_budget=env.HISTORY_TOKEN_BUDGET,
+    stale_tool_tokens=env.STALE_TOOL_OUTPUT_TOKENS,
+)
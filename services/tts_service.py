@@ -0,0 +1,296 @@
+import asyncio
+import base64
+import io
+import re
+from collections import Counter, deque
+from typing import Callable, List, Optional
+import discord
+from discord import FFmpegOpusAudio
+from core.cache import TTLCache
+from core.config import env
+from core.logger import logger
+from services.http_client import http_client
+
+TTS_URL = "https://texttospeech.googleapis.com/v1/text:synthesize"
+TTS_VOICE = {"languageCode": "ko-KR", "ssmlGender": "NEUTRAL"}
+# Ogg Opus로 받으면 mp3보다 작고, 디스코드 전송 형식(Opus)과 같아 변환 부담이 적음
+TTS_AUDIO_CONFIG = {"audioEncoding": "OGG_OPUS"}
+
+# 이보다 짧은 문장은 다음 문장과 합쳐서 한 번에 합성
+MIN_SENTENCE_CHARS = 12
+# 문장 끝이 나오지 않아도 이 길이를 넘으면 공백에서 끊어 합성
+MAX_SENTENCE_CHARS = 300
+# 음악이 끝나기를 기다리는 동안 확인하는 간격 (초)
+IDLE_POLL_SECONDS = 0.25
+
+_FENCE = "```"
+_SENTENCE_END = re.compile(r'[.!?。！？…]+["\'”’)\]]*(?=\s)|\n+')
+_MARKDOWN_LINK = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_URL = re.compile(r'https?://\S+')
+_MARKDOWN_SYMBOLS = re.compile(r'[`*_~#>|]+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def clean_for_speech(text: str) -> str:
+    """링크 주소와 마크다운 기호처럼 읽기 어색한 부분을 지웁니다."""
+    text = _MARKDOWN_LINK.sub(r'\1', text)
+    text = _URL.sub(' ', text)
+    text = _MARKDOWN_SYMBOLS.sub(' ', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class SentenceSplitter:
+    """
+    스트리밍으로 들어오는 응답 텍스트에서 완성된 문장을 꺼냅니다.
+    코드 블록(```)은 읽지 않고 건너뛰며, 조각 경계에 걸친 ``` 도 처리합니다.
+    """
+    def __init__(self):
+        self._pending = ""       # 코드 블록 여부를 아직 판단하지 못한 원문
+        self._text = ""          # 문장 경계를 기다리는 읽을 텍스트
+        self._sentence = ""      # 너무 짧아 다음 문장과 합칠 문장
+        self._in_code = False
+
+    def feed(self, text: str) -> List[str]:
+        self._pending += text
+        while True:
+            index = self._pending.find(_FENCE)
+            if index < 0:
+                break
+            if not self._in_code:
+                self._text += self._pending[:index] + "\n"
+            self._pending = self._pending[index + len(_FENCE):]
+            self._in_code = not self._in_code
+        # 다음 조각과 합쳐 ``` 가 될 수 있는 끝부분은 남겨 둠
+        keep = len(self._pending) - len(self._pending.rstrip("`"))
+        ready, self._pending = self._pending[:len(self._pending) - keep], self._pending[len(self._pending) - keep:]
+        if not self._in_code:
+            self._text += ready
+        return self._split()
+
+    def _split(self) -> List[str]:
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._text):
+            self._add(self._text[start:match.end()], sentences)
+            start = match.end()
+        self._text = self._text[start:]
+        while len(self._text) > MAX_SENTENCE_CHARS:
+            cut = self._text.rfind(" ", 0, MAX_SENTENCE_CHARS)
+            cut = cut if cut > MAX_SENTENCE_CHARS // 2 else MAX_SENTENCE_CHARS
+            self._add(self._text[:cut], sentences, force=True)
+            self._text = self._text[cut:]
+        return sentences
+
+    def _add(self, piece: str, sentences: List[str], force: bool = False):
+        self._sentence = f"{self._sentence} {clean_for_speech(piece)}".strip()
+        if self._sentence and (force or len(self._sentence) >= MIN_SENTENCE_CHARS):
+            sentences.append(self._sentence)
+            self._sentence = ""
+
+    def flush(self) -> List[str]:
+        """남은 텍스트를 모두 문장으로 내보냅니다. 코드 블록 안이면 버립니다."""
+        if not self._in_code:
+            self._text += self._pending
+        self._pending = ""
+        sentences = self._split()
+        self._add(self._text, sentences, force=True)
+        self._text = ""
+        return sentences
+
+
+class _GuildSpeech:
+    """서버 하나의 재생 대기 중인 음성 조각 (합성 태스크를 말할 순서대로 보관)."""
+    __slots__ = ("clips", "player")
+
+    def __init__(self):
+        self.clips: "deque[asyncio.Task]" = deque()
+        self.player: Optional[asyncio.Task] = None
+
+
+class SpeechSession:
+    """응답 하나를 스트리밍되는 대로 문장 단위로 읽는 세션입니다."""
+    def __init__(self, service: "TTSService", guild: discord.Guild):
+        self._service = service
+        self._guild = guild
+        self._splitter = SentenceSplitter()
+
+    def feed(self, text: str):
+        for sentence in self._splitter.feed(text):
+            self._service.enqueue(self._guild, sentence)
+
+    def flush(self):
+        for sentence in self._splitter.flush():
+            self._service.enqueue(self._guild, sentence)
+
+
+class TTSService:
+    """
+    Google Cloud TTS로 문장을 합성해 음성 채널에서 읽습니다.
+    - 문장은 동시에(TTS_CONCURRENCY개까지) 합성하되 들어온 순서대로 재생합니다.
+    - 오디오는 파일로 쓰지 않고 메모리 버퍼에서 바로 FFmpeg로 넘깁니다.
+    - 음악이 재생 중이면 그 곡이 끝난 뒤 읽고, 다 읽으면 idle 리스너(음악 대기열)를 이어서 실행합니다.
+    - 같은 문장은 구문 캐시에서 바로 재생합니다.
+    """
+    def __init__(self, concurrency: int, cache_size: int, cache_ttl: float, max_pending: int):
+        self.concurrency = max(1, concurrency)
+        self.max_pending = max_pending
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._guilds = {}  # guild_id -> _GuildSpeech
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._idle_listeners: List[Callable] = []
+        self._hold_checks: List[Callable] = []
+        self.stats = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(env.GOOGLE_API_KEY)
+
+    def add_idle_listener(self, callback: Callable):
+        """서버에서 읽을 문장을 모두 읽었을 때 호출할 코루틴 함수(guild를 받음)를 등록합니다."""
+        self._idle_listeners.append(callback)
+
+    def add_hold_check(self, check: Callable):
+        """
+        재생을 미뤄야 하는지 알려 주는 함수(guild_id를 받아 bool 반환)를 등록합니다.
+        음악 대기열이 다음 곡을 준비하는 동안 TTS가 먼저 재생을 시작하지 않도록 합니다.
+        """
+        self._hold_checks.append(check)
+
+    def _should_wait(self, guild_id: int, voice_client) -> bool:
+        return voice_client.is_playing() or any(check(guild_id) for check in self._hold_checks)
+
+    def is_busy(self, guild_id: int) -> bool:
+        speech = self._guilds.get(guild_id)
+        return speech is not None and speech.player is not None and not speech.player.done()
+
+    def open_session(self, guild: Optional[discord.Guild]) -> Optional[SpeechSession]:
+        """음성 채널에 연결되어 있으면 응답을 읽을 세션을 엽니다. 읽을 수 없으면 None."""
+        if not guild or not self.enabled:
+            return None
+        voice_client = guild.voice_client
+        if not voice_client or not voice_client.is_connected():
+            return None
+        return SpeechSession(self, guild)
+
+    async def speak(self, guild: discord.Guild, text: str):
+        """완성된 텍스트 전체를 문장 단위로 나눠 읽습니다."""
+        session = self.open_session(guild)
+        if session is None:
+            if not self.enabled:
+                logger.log("TTS 실패: GOOGLE_API_KEY가 설정되지 않았습니다.", logger.WARNING)
+            return
+        session.feed(text)
+        session.flush()
+
+    def enqueue(self, guild: discord.Guild, sentence: str):
+        speech = self._guilds.setdefault(guild.id, _GuildSpeech())
+        if len(speech.clips) >= self.max_pending:
+            # 긴 곡 뒤에 너무 많이 밀리면 새 문장은 읽지 않음
+            self.stats["dropped"] += 1
+            return
+        speech.clips.append(asyncio.ensure_future(self.synthesize(sentence)))
+        if speech.player is None or speech.player.done():
+            speech.player = asyncio.ensure_future(self._play_loop(guild, speech))
+
+    def cancel(self, guild_id: int):
+        """읽으려고 기다리던 문장을 모두 버립니다."""
+        speech = self._guilds.pop(guild_id, None)
+        if speech is None:
+            return
+        for task in speech.clips:
+            task.cancel()
+        speech.clips.clear()
+        if speech.player is not None:
+            speech.player.cancel()
+
+    async def synthesize(self, text: str) -> Optional[bytes]:
+        """문장을 Ogg Opus 오디오로 합성합니다. 실패하면 None."""
+        cached = self.cache.get(text)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        payload = {"input": {"text": text}, "voice": TTS_VOICE, "audioConfig": TTS_AUDIO_CONFIG}
+        async with self._semaphore:
+            try:
+                async with http_client.session.post(
+                    TTS_URL, params={"key": env.GOOGLE_API_KEY}, json=payload
+                ) as response:
+                    if response.status != 200:
+                        logger.log(f"TTS API 오류 ({response.status}): {await response.text()}", logger.ERROR)
+                        self.stats["errors"] += 1
+                        return None
+                    response_json = await response.json()
+            except Exception as e:
+                logger.log(f"TTS 요청 실패: {e}", logger.ERROR)
+                self.stats["errors"] += 1
+                return None
+        audio_content = response_json.get("audioContent")
+        if not audio_content:
+            logger.log("TTS 응답에 오디오 컨텐츠가 없습니다.", logger.ERROR)
+            self.stats["errors"] += 1
+            return None
+        audio = base64.b64decode(audio_content)
+        self.cache.set(text, audio)
+        self.stats["synthesized"] += 1
+        return audio
+
+    async def _play_loop(self, guild: discord.Guild, speech: _GuildSpeech):
+        try:
+            while speech.clips:
+                audio = await speech.clips[0]
+                speech.clips.popleft()
+                if not audio:
+                    continue
+                voice_client = guild.voice_client
+                if not voice_client or not voice_client.is_connected():
+                    break
+                # 음악(또는 다른 소리)이 끝나고 다음 곡 준비도 없을 때까지 기다렸다가 읽음
+                while self._should_wait(guild.id, voice_client):
+                    await asyncio.sleep(IDLE_POLL_SECONDS)
+                    if not voice_client.is_connected():
+                        return
+                # 확인과 재생 사이에 await가 없어야 음악과 동시에 play()를 호출하지 않음
+                await self._play_clip(voice_client, audio)
+                self.stats["played"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.log(f"TTS 재생 오류: {e}", logger.ERROR)
+        finally:
+            for task in speech.clips:
+                task.cancel()
+            speech.clips.clear()
+            if self._guilds.get(guild.id) is speech:
+                del self._guilds[guild.id]
+        for callback in self._idle_listeners:
+            try:
+                await callback(guild)
+            except Exception as e:
+                logger.log(f"TTS 종료 후 처리 실패: {e}", logger.ERROR)
+
+    @staticmethod
+    async def _play_clip(voice_client, audio: bytes):
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+
+        def after(error):
+            if error:
+                logger.log(f"TTS 재생 오류: {error}", logger.ERROR)
+            loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(None))
+
+        # 메모리 버퍼를 FFmpeg 표준 입력으로 넘김 (임시 파일 없음)
+        voice_client.play(FFmpegOpusAudio(io.BytesIO(audio), pipe=True), after=after)
+        await finished
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "cache": self.cache.stats()}
+
+
+tts_service = TTSService(
+    concurrency=env.TTS_CONCURRENCY,
+    cache_size=env.TTS_CACHE_SIZE,
+    cache_ttl=env.TTS_CACHE_TTL,
+    max_pending=env.TTS_MAX_PENDING,
+)
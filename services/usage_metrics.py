@@ -0,0 +1,69 @@
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+from core.logger import logger
+
+
+def _field(obj: Any, name: str, default: Any = 0) -> Any:
+    """SDK 객체와 dict 모두에서 필드를 읽습니다 (구버전 SDK는 추가 필드를 dict로 둠)."""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+class UsageTracker:
+    """
+    OpenAI 응답의 usage 필드를 모아 프롬프트 캐시 적중량을 추적합니다.
+    add_hook으로 등록한 콜백은 요청마다 집계 항목(dict)을 받습니다.
+    """
+    def __init__(self):
+        self.totals = Counter()
+        self._hooks: List[Callable[[Dict[str, Any]], None]] = []
+
+    def add_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def record(self, usage: Any, model: Optional[str] = None, label: str = "chat") -> Optional[Dict[str, Any]]:
+        if usage is None:
+            return None
+
+        prompt_tokens = _field(usage, "prompt_tokens") or 0
+        details = _field(usage, "prompt_tokens_details", None)
+        cached_tokens = _field(details, "cached_tokens") or 0
+        entry = {
+            "label": label,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "uncached_tokens": prompt_tokens - cached_tokens,
+            "completion_tokens": _field(usage, "completion_tokens") or 0,
+        }
+
+        self.totals["requests"] += 1
+        for key in ("prompt_tokens", "cached_tokens", "uncached_tokens", "completion_tokens"):
+            self.totals[key] += entry[key]
+
+        logger.log(
+            f"토큰 사용량({label}): 프롬프트 {prompt_tokens} (캐시 {cached_tokens}), 응답 {entry['completion_tokens']}",
+            logger.DEBUG
+        )
+        for hook in list(self._hooks):
+            try:
+                hook(entry)
+            except Exception as e:
+                logger.log(f"사용량 훅 실행 오류: {e}", logger.WARNING)
+        return entry
+
+    def get_stats(self) -> dict:
+        stats = dict(self.totals)
+        prompt_tokens = stats.get("prompt_tokens", 0)
+        stats["cache_hit_ratio"] = stats.get("cached_tokens", 0) / prompt_tokens if prompt_tokens else 0.0
+        return stats
+
+
+usage_tracker = UsageTracker()
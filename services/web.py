@@ -1,33 +1,53 @@
-from concurrent.futures import ThreadPoolExecutor
-import aiohttp
 import asyncio
 import json
 import urllib.parse
-import re
-from bs4 import BeautifulSoup
-from chardet import detect
 from core.logger import logger
 from core.config import env
+from services.http_client import http_client, ACCEPT_ENCODING
+from services.extract_pool import extraction_pool
+from services.html_extract import CHUNK_BYTES, StreamingTextExtractor
+from services.passage_ranker import rank_passages
+from services.search_cache import normalize_query, page_cache, query_cache
 
-# 스레드 풀 설정
-executor = ThreadPoolExecutor(max_workers=2)
+# 페이지 하나에서 읽을 최대 바이트 수와 추출할 최대 글자 수
+MAX_PAGE_BYTES = env.CRAWL_MAX_BYTES
+MAX_TEXT_CHARS = env.CRAWL_MAX_TEXT_CHARS
+# 모델에 돌려줄 검색 결과 문단의 토큰 예산과 문단 크기
+SEARCH_TOKEN_BUDGET = env.SEARCH_TOKEN_BUDGET
+PASSAGE_CHARS = env.SEARCH_PASSAGE_CHARS
+
+# 검색 결과 중 크롤링할 후보 수, 모델에 돌려줄 페이지 수, 전체 크롤링 마감 시간(초)
+SEARCH_RESULT_COUNT = env.SEARCH_RESULT_COUNT
+CRAWL_RESULT_COUNT = env.CRAWL_RESULT_COUNT
+CRAWL_DEADLINE_SECONDS = env.CRAWL_DEADLINE_SECONDS
+CRAWL_MODE = env.CRAWL_MODE
 
 # 크롤링용 헤더 설정
 DEFAULT_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
     'Accept-Language': 'ko-KR,ko;q=0.8,en-US;q=0.5,en;q=0.3',
-    'Accept-Encoding': 'gzip, deflate',
+    'Accept-Encoding': ACCEPT_ENCODING,
     'Connection': 'keep-alive',
     'Upgrade-Insecure-Requests': '1',
 }
+# 조건부 요청에 304로 응답한 경우를 나타내는 표식
+NOT_MODIFIED = object()
+
 custom_search_engine_id = env.CUSTOM_SEARCH_ENGINE_ID
 google_api_key = env.GOOGLE_API_KEY
 
 async def search_google(query):
+    # 같은 검색어는 TTL 동안 API를 다시 호출하지 않음
+    cache_key = normalize_query(query)
+    cached = query_cache.get(cache_key)
+    if cached is not None:
+        logger.log(f"검색 캐시 적중: {query}", logger.INFO)
+        return cached
+
     query_list = []
 
-    search_num = 2
+    search_num = SEARCH_RESULT_COUNT
 
     encoded_query = urllib.parse.quote(str(query))
     query_list.append(encoded_query)
@@ -39,9 +59,8 @@ async def search_google(query):
         url = f"https://www.googleapis.com/customsearch/v1?cx={custom_search_engine_id}&key={google_api_key}&q={q}&num={search_num}"
         logger.log(f"검색 쿼리: {url}", logger.INFO)
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                result = await response.text()
+        async with http_client.session.get(url) as response:
+            result = await response.text()
         
         try:
             result = json.loads(result)
@@ -51,65 +70,33 @@ async def search_google(query):
         except Exception as e:
             logger.log(f"검색 결과 파싱 실패: {str(e)}", logger.ERROR)
             return None
-            
-    return return_result
-
-
-def extract_text_from_soup(soup):
-    """BeautifulSoup 객체에서 텍스트를 효율적으로 추출"""
-    # 불필요한 태그 제거
-    for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'noscript']):
-        tag.decompose()
-    
-    # 메인 콘텐츠 영역 우선 탐색
-    main_content = None
-    content_selectors = [
-        'main', 'article', '[role="main"]', '.content', '.main-content', 
-        '.post-content', '.entry-content', '.article-content', '#content',
-        '.container .row', '.content-wrapper'
-    ]
-    
-    for selector in content_selectors:
-        main_content = soup.select_one(selector)
-        if main_content:
-            break
-    
-    # 메인 콘텐츠가 없으면 body 사용
-    if not main_content:
-        main_content = soup.find('body') or soup
     
-    # 텍스트 추출 - 다양한 태그에서 추출
-    text_elements = main_content.find_all([
-        'p', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-        'li', 'td', 'th', 'blockquote', 'pre', 'code'
-    ])
-    
-    texts = []
-    for element in text_elements:
-        element_text = element.get_text(strip=True)
-        if element_text and len(element_text) > 10:  # 너무 짧은 텍스트 제외
-            texts.append(element_text)
-    
-    # 중복 제거 및 정리
-    unique_texts = []
-    seen = set()
-    for text in texts:
-        if text not in seen and len(text) > 20:  # 중복 및 너무 짧은 텍스트 제거
-            unique_texts.append(text)
-            seen.add(text)
-    
-    final_text = ' '.join(unique_texts)
-    # 공백 정리
-    final_text = re.sub(r'\s+', ' ', final_text).strip()
-    
-    return final_text
+    if return_result:
+        query_cache.set(cache_key, return_result)
+    return return_result
 
 
 async def crawl_website(session, url, timeout_seconds=15):
+    url = str(url)
+    # 신선한 캐시는 네트워크 없이 사용하고, 오래된 캐시는 조건부 요청으로 재검증
+    cached = page_cache.lookup(url)
+    if cached is not None and page_cache.is_fresh(cached):
+        text = await page_cache.read(url, cached)
+        if text is not None:
+            return text
+        cached = None
+    
+    validators = {}
     try:
         # 웹 페이지 내용 가져오기
         async def fetch_content():
-            async with session.get(str(url), headers=DEFAULT_HEADERS, allow_redirects=True) as response:
+            headers = {**DEFAULT_HEADERS, **page_cache.conditional_headers(cached)}
+            async with session.get(url, headers=headers, allow_redirects=True) as response:
+                validators['etag'] = response.headers.get('ETag')
+                validators['last_modified'] = response.headers.get('Last-Modified')
+                if response.status == 304:
+                    return NOT_MODIFIED
+                
                 # 상태 코드 확인
                 if response.status >= 400:
                     logger.log(f"HTTP 오류 {response.status}: {url}", logger.WARNING)
@@ -121,50 +108,53 @@ async def crawl_website(session, url, timeout_seconds=15):
                     logger.log(f"HTML이 아닌 콘텐츠: {content_type} - {url}", logger.WARNING)
                     return None
                 
-                raw_response = await response.read()
-                
-                # 인코딩 감지 및 디코딩
-                encoding = None
-                charset = response.charset
-                if charset:
-                    encoding = charset
-                else:
-                    detected = detect(raw_response)
-                    if detected and detected['confidence'] > 0.7:
-                        encoding = detected['encoding']
+                # 작은 페이지는 조각 단위로 읽으면서 바로 파싱하고, 충분한 텍스트가 모이면 중단합니다.
+                # 큰 페이지(Content-Length 또는 읽는 도중 기준 초과)는 바이트만 모아 프로세스 풀에서 추출합니다.
+                extractor = None
+                if not extraction_pool.should_offload(response.content_length or 0):
+                    extractor = StreamingTextExtractor(response.charset, max_chars=MAX_TEXT_CHARS)
+                raw = bytearray() if extraction_pool.enabled else None
+                received = 0
+                async for chunk in response.content.iter_chunked(CHUNK_BYTES):
+                    received += len(chunk)
+                    if raw is not None:
+                        raw += chunk
+                    if extractor is not None:
+                        extractor.feed(chunk)
+                        if extractor.done:
+                            break
+                        if extraction_pool.should_offload(received):
+                            extractor = None
+                    if received >= MAX_PAGE_BYTES:
+                        logger.log(f"페이지 크기 상한 도달 ({received}바이트): {url}", logger.INFO)
+                        break
                 
-                if encoding is None:
-                    encoding = 'utf-8'
+                if extractor is not None:
+                    extraction_pool.record_inline(received)
+                    return extractor.close()
+                return await extraction_pool.extract(bytes(raw), response.charset, MAX_TEXT_CHARS)
                 
-                try:
-                    content = raw_response.decode(encoding, errors='ignore')
-                except (UnicodeDecodeError, LookupError):
-                    content = raw_response.decode('utf-8', errors='ignore')
-                
-                return content
-                
-        content = await asyncio.wait_for(fetch_content(), timeout=timeout_seconds)
+        text = await asyncio.wait_for(fetch_content(), timeout=timeout_seconds)
         
-        if not content:
-            return None
+        if text is NOT_MODIFIED:
+            if cached is None:
+                return None
+            page_cache.touch(url, cached, validators['etag'], validators['last_modified'])
+            return await page_cache.read(url, cached)
         
-        # BeautifulSoup으로 HTML 파싱
-        loop = asyncio.get_event_loop()
-        soup = await loop.run_in_executor(executor, BeautifulSoup, content, 'html.parser')
-        
-        # 효율적인 텍스트 추출
-        text = await loop.run_in_executor(executor, extract_text_from_soup, soup)
+        if text is None:
+            return None
         
         # 최소 길이 확인
         if len(text) < 200:
             logger.log(f"추출된 텍스트가 너무 짧음 ({len(text)}자): {url}", logger.WARNING)
             return None
         
-        max_len = 20000
         # 최대 길이 제한 (너무 긴 텍스트 방지)
-        if len(text) > max_len:
-            text = text[:max_len] + "..."
-            
+        if len(text) > MAX_TEXT_CHARS:
+            text = text[:MAX_TEXT_CHARS] + "..."
+        
+        await page_cache.store(url, text, validators['etag'], validators['last_modified'])
         return text
         
     except asyncio.TimeoutError:
@@ -175,34 +165,66 @@ async def crawl_website(session, url, timeout_seconds=15):
         return None
 
 
-async def search_and_crawl(keyword):
-    tasks = []
+async def search_and_crawl(keyword, mode=None):
+    """
+    검색 결과 페이지를 동시에 크롤링합니다.
+    as_completed 모드는 먼저 끝난 페이지부터 모아 CRAWL_RESULT_COUNT개가 되거나 마감 시간이 지나면
+    남은 크롤링을 취소합니다. gather 모드는 모든 페이지가 끝날 때까지 기다립니다.
+    모은 페이지는 문단으로 나눠 검색어와 관련 높은 문단만 SEARCH_TOKEN_BUDGET 안에서 골라 돌려줍니다.
+    """
+    mode = mode or CRAWL_MODE
     
     # 검색 실행
-    search_urls = await search_google(keyword)
-    if search_urls:
-        search_result = ""
-        
-        # 검색 결과 각 페이지 크롤링
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=3)
-        timeout = aiohttp.ClientTimeout(total=30, connect=10)
-        
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            for search_item in search_urls:
-                logger.log(f"검색 결과 크롤링: {search_item['link']}", logger.INFO)
-                task = asyncio.ensure_future(crawl_website(session, search_item['link']))
-                tasks.append(task)
-                
-            responses = await asyncio.gather(*tasks)
-            
-            # 크롤링 결과 정리
-            i = 1
-            for response in responses:
-                if response:
-                    search_result += f"{i}. {response}\n"
-                    i += 1
-                    
-        logger.log(f"크롤링 완료: {len(search_result)}자 추출", logger.INFO)
-        return search_result
+    search_items = await search_google(keyword)
+    if not search_items:
+        return None
+    
+    if mode == "gather":
+        wanted, deadline = len(search_items), None
     else:
-        return None
\ No newline at end of file
+        wanted, deadline = CRAWL_RESULT_COUNT, CRAWL_DEADLINE_SECONDS
+    
+    # 검색 결과 각 페이지 크롤링 (공용 세션의 커넥션 풀 사용)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    session = http_client.session
+    tasks = {}
+    for rank, search_item in enumerate(search_items):
+        logger.log(f"검색 결과 크롤링: {search_item['link']}", logger.INFO)
+        task = asyncio.ensure_future(crawl_website(session, search_item['link']))
+        tasks[task] = rank
+    
+    collected = []
+    pending = set(tasks)
+    try:
+        while pending and len(collected) < wanted:
+            timeout = None
+            if deadline is not None:
+                timeout = started + deadline - loop.time()
+                if timeout <= 0:
+                    break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                text = task.result()
+                if text:
+                    collected.append((tasks[task], text))
+    finally:
+        # 마감 시간을 넘겼거나 충분히 모았으면 나머지 크롤링은 취소
+        for task in pending:
+            task.cancel()
+    
+    if pending:
+        logger.log(f"느린 크롤링 {len(pending)}개 취소", logger.INFO)
+    
+    # 검색 순위 순으로 정리한 뒤 페이지 앞부분이 아니라 검색어와 관련 높은 문단을 고름
+    collected.sort()
+    collected = collected[:wanted]
+    ranked = rank_passages(keyword, [text for _, text in collected], SEARCH_TOKEN_BUDGET, PASSAGE_CHARS)
+    search_result = ""
+    for i, (page_index, passages) in enumerate(ranked, start=1):
+        item = search_items[collected[page_index][0]]
+        passage_text = "\n".join(passages)
+        search_result += f"{i}. {item.get('title', '')} ({item['link']})\n{passage_text}\n\n"
+    
+    logger.log(f"크롤링 완료: {len(collected)}개 페이지, {len(search_result)}자 추출 ({loop.time() - started:.2f}초)", logger.INFO)
+    return search_result
@@ -0,0 +1,180 @@
+import asyncio
+import datetime
+import json
+import os
+import re
+import tempfile
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+from core.config import env
+from core.logger import logger
+
+# search().list 한 번에 드는 YouTube Data API 할당량
+SEARCH_COST = 100
+# 변경 사항을 모아서 저장하기까지 기다리는 시간 (초)
+FLUSH_DELAY = 5.0
+
+try:
+    from zoneinfo import ZoneInfo
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # tzdata가 없는 환경에서는 태평양 표준시로 근사
+    _QUOTA_TZ = datetime.timezone(datetime.timedelta(hours=-8))
+
+
+def normalize_query(query: str) -> str:
+    """대소문자, 공백, 문장 부호 차이만 있는 검색어를 같은 키로 취급합니다."""
+    text = re.sub(r"[^\w\s]", " ", str(query).casefold())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _quota_day() -> str:
+    # YouTube Data API 할당량은 태평양 시간 자정에 초기화됩니다.
+    return datetime.datetime.now(_QUOTA_TZ).date().isoformat()
+
+
+class YouTubeSearchCache:
+    """
+    음악 검색어 -> 영상 ID 캐시와 YouTube Data API 일일 할당량 계측기입니다.
+    둘 다 한 JSON 파일에 모아 두었다가 변경 시 지연 저장하므로 재시작 후에도 유지됩니다.
+    asyncio 이벤트 루프 한 곳에서만 사용한다고 가정합니다.
+    """
+    def __init__(self, path: str, ttl: float, maxsize: int, daily_quota: int):
+        self.path = path
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.daily_quota = daily_quota
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (만료 시각, video_id)
+        self._quota_day = _quota_day()
+        self._quota_used = 0
+        self._loaded = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.stats = Counter()
+
+    # ---- 저장 ----
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            logger.log(f"유튜브 검색 캐시 로드 실패, 비우고 시작합니다: {e}", logger.WARNING)
+            return
+        now = time.time()
+        for key, expires_at, video_id in data.get("entries", []):
+            if expires_at > now:
+                self._entries[key] = (expires_at, video_id)
+        quota = data.get("quota", {})
+        if quota.get("day") == self._quota_day:
+            self._quota_used = int(quota.get("used", 0))
+
+    def _snapshot(self) -> dict:
+        return {
+            "entries": [(key, expires_at, video_id) for key, (expires_at, video_id) in self._entries.items()],
+            "quota": {"day": self._quota_day, "used": self._quota_used},
+        }
+
+    def _write(self, data: dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".youtube-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(FLUSH_DELAY, lambda: asyncio.ensure_future(self.flush()))
+
+    async def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._loaded:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, self._snapshot())
+        except OSError as e:
+            logger.log(f"유튜브 검색 캐시 저장 실패: {e}", logger.ERROR)
+
+    # ---- 검색어 캐시 ----
+
+    def get(self, query: str) -> Optional[str]:
+        self._ensure_loaded()
+        key = normalize_query(query)
+        item = self._entries.get(key)
+        if item is None or item[0] < time.time():
+            if item is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return item[1]
+
+    def set(self, query: str, video_id: str):
+        self._ensure_loaded()
+        key = normalize_query(query)
+        self._entries[key] = (time.time() + self.ttl, video_id)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self._schedule_flush()
+
+    # ---- 할당량 ----
+
+    def _roll_quota_day(self):
+        today = _quota_day()
+        if today != self._quota_day:
+            self._quota_day = today
+            self._quota_used = 0
+
+    def quota_remaining(self) -> int:
+        self._ensure_loaded()
+        self._roll_quota_day()
+        return max(0, self.daily_quota - self._quota_used)
+
+    def can_spend(self, units: int) -> bool:
+        return self.quota_remaining() >= units
+
+    def charge(self, units: int):
+        self._roll_quota_day()
+        self._quota_used += units
+        self.stats["api_calls"] += 1
+        self._schedule_flush()
+
+    def exhaust(self):
+        """API가 할당량 초과로 응답하면 오늘 남은 할당량을 0으로 봅니다."""
+        self._roll_quota_day()
+        self._quota_used = max(self._quota_used, self.daily_quota)
+        self.stats["quota_exceeded"] += 1
+        self._schedule_flush()
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "quota_used": self._quota_used,
+            "quota_remaining": self.quota_remaining(),
+        }
+
+
+youtube_search_cache = YouTubeSearchCache(
+    path=env.YOUTUBE_SEARCH_CACHE_PATH,
+    ttl=env.YOUTUBE_SEARCH_CACHE_TTL,
+    maxsize=env.YOUTUBE_SEARCH_CACHE_SIZE,
+    daily_quota=env.YOUTUBE_DAILY_QUOTA,
+)